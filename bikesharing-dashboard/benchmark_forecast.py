@@ -0,0 +1,62 @@
+'''
+Benchmark of the hourly demand forecast (forecast.py): fit time on hour.csv,
+load time of the memory-mapped artifact and predict time of batches of hourly
+scenarios (a day, a month, a year...), plus the error on a holdout period
+(training on the rows before --holdout-start).
+Est. 2024
+@arthad
+
+Usage: python bikesharing-dashboard/benchmark_forecast.py [--repeat 50] [--holdout-start 2012-10-01]
+'''
+import argparse
+import tempfile
+import time
+import pandas as pd
+from data_layer import HOUR_CSV
+from forecast import ALPHA, evaluate, fit, load_model
+
+BATCH_SIZES = [24, 24 * 30, 24 * 365, 1_000_000]
+
+
+def best_time(function, repeat):
+  # Waktu terbaik dari beberapa percobaan (paling sedikit gangguan dari proses lain)
+  times = []
+  for _ in range(repeat):
+    start_time = time.perf_counter()
+    function()
+    times.append(time.perf_counter() - start_time)
+  return min(times)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark fit & predict time of the demand forecast")
+  parser.add_argument('--repeat', type=int, default=50)
+  parser.add_argument('--alpha', type=float, default=ALPHA)
+  parser.add_argument('--holdout-start', default='2012-10-01')
+  args = parser.parse_args()
+
+  df = pd.read_csv(HOUR_CSV, parse_dates=['dteday'])
+  fit_time = best_time(lambda: fit(df, args.alpha), max(args.repeat // 10, 1))
+  print(f"fit    : {len(df)} rows in {fit_time * 1000:7.1f} ms")
+
+  with tempfile.TemporaryDirectory() as model_dir:
+    fit(df, args.alpha).save(model_dir)
+    load_time = best_time(lambda: load_model(model_dir), args.repeat)
+    print(f"load   : {load_time * 1000:7.3f} ms (memory-mapped)")
+    model = load_model(model_dir)
+    for size in BATCH_SIZES:
+      # Skenario diambil (dengan pengulangan) dari baris hour.csv
+      frame = df.sample(size, replace=True, random_state=0).reset_index(drop=True)
+      model.predict(frame)
+      predict_time = best_time(lambda: model.predict(frame), max(args.repeat // max(size // 10_000, 1), 3))
+      print(f"predict: {size:>9,} rows in {predict_time * 1000:8.3f} ms ({size / predict_time:12,.0f} rows/s)")
+
+  train_df = df[df['dteday'] < args.holdout_start]
+  test_df = df[df['dteday'] >= args.holdout_start]
+  metrics = evaluate(fit(train_df, args.alpha), test_df)
+  print(f"holdout: {len(test_df)} rows from {args.holdout_start}, MAE {metrics['mae']:.1f}, "
+        f"RMSE {metrics['rmse']:.1f}, R2 {metrics['r2']:.3f}")
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,141 @@
+'''
+Prefix-sum cube of the bike-sharing data: date x season x weathersit x holiday
+x workingday over cnt, casual & registered. The total of any date range is
+P[end + 1] - P[start], so a range + group-by costs O(groups) whatever the
+number of rows. Min/max of the daily totals come from sparse tables (O(1) per
+query) and the correlation matrix from prefix sums of the moments.
+Est. 2024
+@arthad
+'''
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['season', 'weathersit', 'holiday', 'workingday']
+MEASURES = ['cnt', 'casual', 'registered']
+CORR_COLUMNS = ['temp', 'atemp', 'hum', 'windspeed', 'cnt']
+
+
+class SparseTable:
+  '''Min atau max dari range values[i:j] dalam O(1) (tabel log2(n) x n).'''
+  def __init__(self, values, function):
+    self.function = function
+    self.levels = [np.asarray(values)]
+    width = 1
+    while 2 * width <= len(values):
+      previous = self.levels[-1]
+      self.levels.append(function(previous[:-width], previous[width:]))
+      width *= 2
+
+  def query(self, i, j):
+    level = (j - i).bit_length() - 1
+    table = self.levels[level]
+    return self.function(table[i], table[j - (1 << level)])
+
+
+class DailyCube:
+  '''
+  df: dataset harian atau perjam dari data_layer (kolom dimensi bertipe Categorical).
+  Tanggal tanpa data dilewati oleh min/max/avg.
+  '''
+  def __init__(self, df, dimensions=DIMENSIONS, measures=MEASURES):
+    self.dimensions = list(dimensions)
+    self.measures = list(measures)
+    self.categories = [list(df[dimension].cat.categories) for dimension in self.dimensions]
+    dates = df['dteday'].to_numpy().astype('datetime64[D]')
+    self.first_date = dates.min()
+    self.days = int((dates.max() - self.first_date).astype(int)) + 1
+    day = (dates - self.first_date).astype(np.int64)
+
+    # Index datar setiap baris pada cube (day, season, weathersit, holiday, workingday)
+    shape = [self.days] + [len(categories) for categories in self.categories]
+    cell = day
+    for dimension, size in zip(self.dimensions, shape[1:]):
+      cell = cell * size + df[dimension].cat.codes.to_numpy().astype(np.int64)
+    cells = int(np.prod(shape))
+
+    # P[d] = total dari semua hari sebelum hari d (P[0] = 0)
+    self.prefix = np.zeros([self.days + 1] + shape[1:] + [len(self.measures) + 1], dtype=np.int64)
+    for k, measure in enumerate(self.measures):
+      totals = np.bincount(cell, weights=df[measure].to_numpy(), minlength=cells)
+      self.prefix[1:, ..., k] = np.cumsum(totals.reshape(shape), axis=0).round().astype(np.int64)
+    # Kolom terakhir: jumlah baris (untuk kategori yang teramati & rata-rata)
+    rows = np.bincount(cell, minlength=cells).reshape(shape)
+    self.prefix[1:, ..., -1] = np.cumsum(rows, axis=0)
+
+    # Total per hari untuk metrik min/max (hari tanpa data tidak ikut)
+    day_rows = np.bincount(day, minlength=self.days)
+    self.day_prefix = np.concatenate([[0], np.cumsum(day_rows > 0)])
+    self.min_tables = {}
+    self.max_tables = {}
+    for measure in self.measures:
+      day_totals = np.bincount(day, weights=df[measure].to_numpy(), minlength=self.days)
+      self.min_tables[measure] = SparseTable(np.where(day_rows > 0, day_totals, np.inf), np.minimum)
+      self.max_tables[measure] = SparseTable(np.where(day_rows > 0, day_totals, -np.inf), np.maximum)
+
+    # Momen (dipusatkan pada rata-rata global agar presisi terjaga) untuk korelasi
+    values = df[CORR_COLUMNS].to_numpy(dtype=np.float64)
+    self.corr_center = values.mean(axis=0)
+    values = values - self.corr_center
+    self.sum_prefix = np.zeros((self.days + 1, len(CORR_COLUMNS)))
+    self.product_prefix = np.zeros((self.days + 1, len(CORR_COLUMNS), len(CORR_COLUMNS)))
+    for i in range(len(CORR_COLUMNS)):
+      self.sum_prefix[1:, i] = np.cumsum(np.bincount(day, weights=values[:, i], minlength=self.days))
+      for j in range(i, len(CORR_COLUMNS)):
+        products = np.bincount(day, weights=values[:, i] * values[:, j], minlength=self.days)
+        self.product_prefix[1:, i, j] = self.product_prefix[1:, j, i] = np.cumsum(products)
+    self.rows_prefix = np.concatenate([[0], np.cumsum(day_rows)])
+
+  def day_range(self, start_date, end_date):
+    '''Rentang hari [i, j) untuk start_date..end_date (inklusif), dibatasi pada data yang ada.'''
+    i = int((np.datetime64(start_date, 'D') - self.first_date).astype(int))
+    j = int((np.datetime64(end_date, 'D') - self.first_date).astype(int)) + 1
+    return min(max(i, 0), self.days), min(max(j, 0), self.days)
+
+  def range_cube(self, start_date, end_date):
+    i, j = self.day_range(start_date, end_date)
+    return self.prefix[j] - self.prefix[i]
+
+  def totals(self, start_date, end_date, by, measure='cnt'):
+    '''
+    Total measure per kategori `by` pada rentang tanggal, terurut dari yang terbesar
+    (hanya kategori yang teramati, sama seperti data_layer.total_by).
+    '''
+    axis = self.dimensions.index(by)
+    other_axes = tuple(k for k in range(len(self.dimensions)) if k != axis)
+    grouped = self.range_cube(start_date, end_date).sum(axis=other_axes)
+    observed = grouped[:, -1] > 0
+    total_df = pd.DataFrame({
+        by: np.array(self.categories[axis], dtype=object)[observed],
+        measure: grouped[observed, self.measures.index(measure)],
+    })
+    return total_df.sort_values(measure, ascending=False, kind='stable').reset_index(drop=True)
+
+  def total(self, start_date, end_date, measure='cnt'):
+    cube = self.range_cube(start_date, end_date)
+    return int(cube[..., self.measures.index(measure)].sum())
+
+  def metrics(self, start_date, end_date, measure='cnt'):
+    '''Min, max, rata-rata & total harian dari measure (None jika rentang kosong).'''
+    i, j = self.day_range(start_date, end_date)
+    days = int(self.day_prefix[j] - self.day_prefix[i])
+    if days == 0:
+      return None
+    total = self.total(start_date, end_date, measure)
+    return {
+        'min': int(self.min_tables[measure].query(i, j)),
+        'max': int(self.max_tables[measure].query(i, j)),
+        'mean': total / days,
+        'sum': total,
+    }
+
+  def corr(self, start_date, end_date):
+    '''Matriks korelasi Pearson CORR_COLUMNS pada rentang tanggal (seperti DataFrame.corr()).'''
+    i, j = self.day_range(start_date, end_date)
+    n = self.rows_prefix[j] - self.rows_prefix[i]
+    sums = self.sum_prefix[j] - self.sum_prefix[i]
+    products = self.product_prefix[j] - self.product_prefix[i]
+    with np.errstate(invalid='ignore', divide='ignore'):
+      covariance = products - np.outer(sums, sums) / n
+      std = np.sqrt(np.diag(covariance))
+      corr = covariance / np.outer(std, std)
+    return pd.DataFrame(corr, index=CORR_COLUMNS, columns=CORR_COLUMNS)
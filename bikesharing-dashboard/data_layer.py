@@ -0,0 +1,207 @@
+'''
+Data layer of the bike-sharing dashboard: the datasets are read, typed and
+mapped once per process instead of on every rerun of main.py.
+Est. 2024
+@arthad
+'''
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from cube import DailyCube
+
+# Streamlit is optional, without it (ex: scripts & benchmarks) the cache is lru_cache
+try:
+    import streamlit as st
+    STREAMLIT_AVAILABLE = True
+except ImportError:
+    STREAMLIT_AVAILABLE = False
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Bike-sharing-dataset')
+DAY_CSV = os.path.join(DATA_DIR, 'day.csv')
+HOUR_CSV = os.path.join(DATA_DIR, 'hour.csv')
+
+# ============= Value Mapping =============
+season_mapping = {
+    1: 'Semi',
+    2: 'Panas',
+    3: 'Gugur',
+    4: 'Dingin'
+}
+weathersit_mapping = {
+    1: 'Cerah',
+    2: 'Mendung',
+    3: 'Hujan Ringan',
+    4: 'Badai Petir'
+}
+holiday_mapping = {
+    0: 'Bukan Hari Libur',
+    1: 'Hari Libur',
+}
+workingday_mapping = {
+    0: 'Bukan Hari Kerja',
+    1: 'Hari Kerja',
+}
+mnth_mapping = {
+    1: 'Jan',
+    2: 'Feb',
+    3: 'Mar',
+    4: 'Apr',
+    5: 'Mei',
+    6: 'Jun',
+    7: 'Jul',
+    8: 'Agu',
+    9: 'Sep',
+    10: 'Okt',
+    11: 'Nov',
+    12: 'Des'
+}
+yr_mapping = {
+    0: 2011,
+    1: 2012,
+}
+weekday_mapping = {
+    0: 'Senin',
+    1: 'Selasa',
+    2: 'Rabu',
+    3: 'Kamis',
+    4: 'Jumat',
+    5: 'Sabtu',
+    6: 'Minggu'
+}
+# Kolom yang dipetakan pada setiap dataset
+DAILY_MAPPINGS = {
+    'season': season_mapping,
+    'weathersit': weathersit_mapping,
+    'holiday': holiday_mapping,
+    'workingday': workingday_mapping,
+    'mnth': mnth_mapping,
+    'weekday': weekday_mapping,
+}
+HOURLY_MAPPINGS = {
+    'season': season_mapping,
+    'weathersit': weathersit_mapping,
+    'holiday': holiday_mapping,
+    'workingday': workingday_mapping,
+}
+DTYPES = {
+    'instant': 'int32',
+    'yr': 'int8',
+    'hr': 'int8',
+    'casual': 'int32',
+    'registered': 'int32',
+    'cnt': 'int32',
+}
+
+
+def to_categorical(codes, mapping):
+  # Kategori berurutan sesuai kode aslinya (contoh: Semi < Panas < Gugur < Dingin)
+  return pd.Categorical.from_codes(
+      codes.map({code: i for i, code in enumerate(mapping)}).fillna(-1).astype('int8'),
+      categories=list(mapping.values()),
+      ordered=True
+  )
+
+
+def read_dataset(path, mappings):
+  df = pd.read_csv(
+      path,
+      dtype={column: dtype for column, dtype in DTYPES.items()},
+      parse_dates=['dteday'],
+      date_format='%Y-%m-%d'
+  )
+  # Sama seperti main.py sebelumnya: index dari file csv menjadi kolom 'index'
+  df.reset_index(inplace=True)
+  for column, mapping in mappings.items():
+    df[column] = to_categorical(df[column], mapping)
+  return df
+
+
+def file_version(path):
+  # Berubah ketika file diganti/diubah, sehingga cache dimuat ulang
+  stat = os.stat(path)
+  return (stat.st_mtime_ns, stat.st_size)
+
+
+def _load_datasets(day_version, hour_version):
+  return read_dataset(DAY_CSV, DAILY_MAPPINGS), read_dataset(HOUR_CSV, HOURLY_MAPPINGS)
+
+
+def _load_cube(day_version, hour_version):
+  daily_df, _ = load_datasets()
+  return DailyCube(daily_df)
+
+
+if STREAMLIT_AVAILABLE:
+  # cache_resource: satu salinan untuk semua sesi (tidak disalin setiap rerun), jangan diubah in-place
+  _load_datasets = st.cache_resource(max_entries=1, show_spinner="Memuat dataset...")(_load_datasets)
+  _load_cube = st.cache_resource(max_entries=1, show_spinner=False)(_load_cube)
+else:
+  _load_datasets = lru_cache(maxsize=1)(_load_datasets)
+  _load_cube = lru_cache(maxsize=1)(_load_cube)
+
+
+def load_datasets():
+  '''
+  (daily_df, hourly_df) yang sudah bertipe & dipetakan. Dimuat sekali per proses
+  dan dimuat ulang otomatis ketika day.csv/hour.csv berubah.
+  '''
+  return _load_datasets(file_version(DAY_CSV), file_version(HOUR_CSV))
+
+
+def load_cube():
+  '''Prefix-sum cube dari dataset harian (lihat cube.py), dibangun sekali per versi file.'''
+  return _load_cube(file_version(DAY_CSV), file_version(HOUR_CSV))
+
+
+def clear_cache():
+  # Invalidasi manual (contoh: setelah dataset diganti dengan mtime yang sama)
+  if STREAMLIT_AVAILABLE:
+    _load_datasets.clear()
+    _load_cube.clear()
+  else:
+    _load_datasets.cache_clear()
+    _load_cube.cache_clear()
+
+
+def slice_dates(df, start_date, end_date):
+  '''Baris antara start_date & end_date (inklusif). dteday sudah terurut, jadi cukup binary search.'''
+  dates = df['dteday'].to_numpy()
+  start = dates.searchsorted(np.datetime64(start_date, 'D'), side='left')
+  end = dates.searchsorted(np.datetime64(end_date, 'D') + np.timedelta64(1, 'D'), side='left')
+  return df.iloc[start:end]
+
+
+def total_by(df, column):
+  '''Total penyewaan per kategori, terurut dari yang terbesar (hanya kategori yang ada).'''
+  total_df = (df.groupby(column, observed=True)['cnt']
+                .sum()
+                .sort_values(ascending=False)
+                .reset_index()
+  )
+  # Kategori dijadikan string agar urutan plot mengikuti urutan total
+  total_df[column] = total_df[column].astype(str)
+  return total_df
+
+
+def summarize(df):
+  kolom_numerik = ['temp', 'atemp', 'hum', 'windspeed', 'cnt']
+  return {
+      'season': total_by(df, 'season'),
+      'weathersit': total_by(df, 'weathersit'),
+      'holiday': total_by(df, 'holiday'),
+      'workingday': total_by(df, 'workingday'),
+      'corr': df[kolom_numerik].corr(),
+  }
+
+
+def summarize_range(start_date, end_date):
+  '''Sama dengan summarize(slice_dates(daily_df, ...)), dari cube dalam O(kategori).'''
+  cube = load_cube()
+  return {
+      'season': cube.totals(start_date, end_date, 'season'),
+      'weathersit': cube.totals(start_date, end_date, 'weathersit'),
+      'holiday': cube.totals(start_date, end_date, 'holiday'),
+      'workingday': cube.totals(start_date, end_date, 'workingday'),
+      'corr': cube.corr(start_date, end_date),
+  }
@@ -0,0 +1,104 @@
+'''
+Cache of rendered dashboard figures: every matplotlib figure is drawn once per
+(chart id, date range, dataset version), saved as PNG bytes and closed right
+away. The bytes are kept in an LRU cache bounded in bytes and shared by all
+the sessions of the server, so a rerun only sends cached images and the
+memory of the process stays flat.
+Est. 2024
+@arthad
+'''
+import io
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import matplotlib
+# Tanpa GUI: figure hanya dirender ke bytes
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+# Streamlit is optional, without it the cache is a module level instance
+try:
+    import streamlit as st
+    STREAMLIT_AVAILABLE = True
+except ImportError:
+    STREAMLIT_AVAILABLE = False
+
+MAX_BYTES = 64 * 1024**2
+# Figure 20x10 inci pada 80 dpi = 1600x800 px, cukup untuk lebar kolom streamlit
+DPI = 80
+
+
+class FigureCache:
+  '''LRU (chart id, key) -> bytes gambar, total ukuran dibatasi max_bytes. Thread-safe.'''
+  def __init__(self, max_bytes=MAX_BYTES):
+    self.max_bytes = max_bytes
+    self.size = 0
+    self.hits = 0
+    self.misses = 0
+    self._images = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, cache_key):
+    with self._lock:
+      image = self._images.get(cache_key)
+      if image is not None:
+        self._images.move_to_end(cache_key)
+        self.hits += 1
+      return image
+
+  def put(self, cache_key, image):
+    with self._lock:
+      if cache_key in self._images:
+        self.size -= len(self._images.pop(cache_key))
+      self._images[cache_key] = image
+      self.size += len(image)
+      # Buang gambar yang paling lama tidak dipakai
+      while self.size > self.max_bytes and len(self._images) > 1:
+        _, evicted = self._images.popitem(last=False)
+        self.size -= len(evicted)
+
+  def render(self, chart_id, key, draw, format='png'):
+    '''
+    Bytes gambar dari chart_id untuk key (contoh: rentang tanggal). draw() membuat
+    figure matplotlib & hanya dipanggil jika gambar belum ada di cache.
+    '''
+    cache_key = (chart_id, key, format)
+    image = self.get(cache_key)
+    if image is not None:
+      return image
+    with self._lock:
+      self.misses += 1
+    fig = draw()
+    try:
+      buffer = io.BytesIO()
+      fig.savefig(buffer, format=format, dpi=DPI, bbox_inches='tight')
+    finally:
+      # Figure selalu ditutup agar memori tidak terus bertambah
+      plt.close(fig)
+    image = buffer.getvalue()
+    self.put(cache_key, image)
+    return image
+
+  def clear(self):
+    with self._lock:
+      self._images.clear()
+      self.size = 0
+
+  def stats(self):
+    with self._lock:
+      return {'images': len(self._images), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
+
+
+def _create_cache(max_bytes):
+  return FigureCache(max_bytes)
+
+
+if STREAMLIT_AVAILABLE:
+  # Satu cache untuk semua sesi
+  _create_cache = st.cache_resource(show_spinner=False)(_create_cache)
+else:
+  _create_cache = lru_cache(maxsize=None)(_create_cache)
+
+
+def get_figure_cache(max_bytes=MAX_BYTES):
+  return _create_cache(max_bytes)
@@ -0,0 +1,255 @@
+'''
+Hourly demand forecast of the bike-sharing dashboard: a ridge regression (numpy
+only, closed form) of log(1 + cnt) on the weather (temp, atemp, hum, windspeed
+and their squares), hour-of-day x weekday, season & weathersit of hour.csv.
+Categorical features are one-hot encoded for training only: predict() looks
+the weights up by index, so a month of hourly scenarios (720 rows) is scored
+in under a millisecond. The weights are saved as .npy next to a small JSON
+file and memory-mapped once per process (retrained automatically when hour.csv
+changes).
+Est. 2024
+@arthad
+
+Usage: python bikesharing-dashboard/forecast.py [--alpha 1.0]
+'''
+import argparse
+import json
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from data_layer import HOUR_CSV, file_version
+
+# Streamlit is optional, without it the model & forecasts are cached with lru_cache
+try:
+    import streamlit as st
+    STREAMLIT_AVAILABLE = True
+except ImportError:
+    STREAMLIT_AVAILABLE = False
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'forecast')
+WEIGHTS_FILE = 'weights.npy'
+META_FILE = 'meta.json'
+NUMERIC = ['temp', 'atemp', 'hum', 'windspeed']
+# Kolom kategori: (jumlah kategori, kode pertama pada hour.csv)
+CATEGORICAL = {
+    'hr': (24, 0),
+    'weekday': (7, 0),
+    'season': (4, 1),
+    'weathersit': (4, 1),
+}
+FEATURES = NUMERIC + list(CATEGORICAL)
+ALPHA = 1.0
+# Pembagi pada hour.csv (lihat Readme.txt) untuk mengubah satuan asli ke nilai ternormalisasi
+TEMP_MAX = 41
+ATEMP_MAX = 50
+HUM_MAX = 100
+WINDSPEED_MAX = 67
+
+
+def category_codes(series, column):
+  '''Kode 0..n-1 dari kolom kategori: kode asli hour.csv atau Categorical dari data_layer.'''
+  size, first = CATEGORICAL[column]
+  if isinstance(series.dtype, pd.CategoricalDtype):
+    codes = series.cat.codes.to_numpy().astype(np.int64)
+  else:
+    codes = series.to_numpy().astype(np.int64) - first
+  if len(codes) and (codes.min() < 0 or codes.max() >= size):
+    raise ValueError(f"{column}: kode di luar rentang {first}..{first + size - 1}")
+  return codes
+
+
+def design_blocks(frame, means, stds):
+  '''(numerik terstandarisasi & kuadratnya, index hr x weekday, index season, index weathersit).'''
+  missing = [column for column in FEATURES if column not in frame]
+  if missing:
+    raise ValueError(f"Kolom tidak ada: {', '.join(missing)}")
+  # Per kolom: jauh lebih murah daripada frame[NUMERIC] untuk batch kecil
+  numeric = (np.column_stack([frame[column].to_numpy(dtype=np.float64) for column in NUMERIC]) - means) / stds
+  hour_weekday = category_codes(frame['hr'], 'hr') * 7 + category_codes(frame['weekday'], 'weekday')
+  return (
+      np.hstack([numeric, numeric**2]),
+      hour_weekday,
+      category_codes(frame['season'], 'season'),
+      category_codes(frame['weathersit'], 'weathersit'),
+  )
+
+
+class ForecastModel:
+  '''
+  Bobot ridge regression dalam satu vektor: [bias | numerik & kuadrat (8) |
+  hr x weekday (168) | season (4) | weathersit (4)].
+  '''
+  def __init__(self, weights, means, stds, meta=None):
+    self.weights = weights
+    self.means = np.asarray(means, dtype=np.float64)
+    self.stds = np.asarray(stds, dtype=np.float64)
+    self.meta = meta or {}
+    # View (bukan salinan) dari setiap blok bobot, tetap di atas memory map
+    sizes = [1, 2 * len(NUMERIC), 24 * 7, CATEGORICAL['season'][0], CATEGORICAL['weathersit'][0]]
+    offsets = np.cumsum([0] + sizes)
+    self.bias, self.numeric, self.hour_weekday, self.season, self.weathersit = (
+        weights[start:end] for start, end in zip(offsets[:-1], offsets[1:])
+    )
+
+  def predict_log(self, frame):
+    numeric, hour_weekday, season, weathersit = design_blocks(frame, self.means, self.stds)
+    return (self.bias[0] + numeric @ self.numeric + self.hour_weekday[hour_weekday] +
+            self.season[season] + self.weathersit[weathersit])
+
+  def predict(self, frame):
+    '''Prakiraan jumlah penyewaan (cnt) untuk setiap baris frame (kolom FEATURES).'''
+    return np.maximum(np.expm1(self.predict_log(frame)), 0)
+
+  def save(self, model_dir=MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    meta = dict(self.meta, means=self.means.tolist(), stds=self.stds.tolist())
+    # Ditulis ke file sementara lalu diganti, agar proses lain tidak membaca file setengah jadi
+    for name, write in [
+        (WEIGHTS_FILE, lambda f: np.save(f, np.asarray(self.weights))),
+        (META_FILE, lambda f: f.write(json.dumps(meta, indent=2).encode('utf-8'))),
+    ]:
+      path = os.path.join(model_dir, name)
+      with open(path + '.tmp', 'wb') as f:
+        write(f)
+      os.replace(path + '.tmp', path)
+
+
+def fit(df, alpha=ALPHA):
+  '''Ridge regression log(1 + cnt) pada df (hour.csv), bias tidak diregularisasi.'''
+  means = df[NUMERIC].to_numpy(dtype=np.float64).mean(axis=0)
+  stds = df[NUMERIC].to_numpy(dtype=np.float64).std(axis=0)
+  stds[stds == 0] = 1
+  numeric, hour_weekday, season, weathersit = design_blocks(df, means, stds)
+  # One-hot hanya untuk training
+  rows = np.arange(len(df))
+  one_hot = []
+  for codes, size in [(hour_weekday, 24 * 7), (season, 4), (weathersit, 4)]:
+    block = np.zeros((len(df), size))
+    block[rows, codes] = 1
+    one_hot.append(block)
+  X = np.hstack([np.ones((len(df), 1)), numeric] + one_hot)
+  y = np.log1p(df['cnt'].to_numpy(dtype=np.float64))
+  penalty = alpha * np.eye(X.shape[1])
+  penalty[0, 0] = 0
+  weights = np.linalg.solve(X.T @ X + penalty, X.T @ y)
+  return ForecastModel(weights, means, stds, {'alpha': alpha, 'rows': len(df)})
+
+
+def evaluate(model, df):
+  '''MAE, RMSE & R2 dari prediksi cnt pada df.'''
+  actual = df['cnt'].to_numpy(dtype=np.float64)
+  error = model.predict(df) - actual
+  return {
+      'mae': float(np.abs(error).mean()),
+      'rmse': float(np.sqrt((error**2).mean())),
+      'r2': float(1 - (error**2).sum() / ((actual - actual.mean())**2).sum()),
+  }
+
+
+def load_model(model_dir=MODEL_DIR):
+  '''Model dari model_dir, bobot di-memory-map (read-only).'''
+  with open(os.path.join(model_dir, META_FILE), encoding='utf-8') as f:
+    meta = json.load(f)
+  weights = np.load(os.path.join(model_dir, WEIGHTS_FILE), mmap_mode='r')
+  return ForecastModel(weights, meta.pop('means'), meta.pop('stds'), meta)
+
+
+def train(model_dir=MODEL_DIR, alpha=ALPHA):
+  '''Latih pada seluruh hour.csv lalu simpan artefak (bersama versi hour.csv yang dipakai).'''
+  df = pd.read_csv(HOUR_CSV)
+  model = fit(df, alpha)
+  model.meta.update(hour_version=list(file_version(HOUR_CSV)), metrics=evaluate(model, df))
+  model.save(model_dir)
+  return model
+
+
+def _load(hour_version, model_dir):
+  try:
+    model = load_model(model_dir)
+    if model.meta.get('hour_version') == list(hour_version):
+      return model
+  except (OSError, ValueError, KeyError):
+    pass
+  # Artefak belum ada atau dilatih dari hour.csv versi lama
+  train(model_dir)
+  return load_model(model_dir)
+
+
+if STREAMLIT_AVAILABLE:
+  # Satu model untuk semua sesi
+  _load = st.cache_resource(max_entries=1, show_spinner="Memuat model prakiraan...")(_load)
+else:
+  _load = lru_cache(maxsize=1)(_load)
+
+
+def get_model(model_dir=MODEL_DIR):
+  '''Model yang dimuat sekali per proses (dilatih ulang otomatis jika hour.csv berubah).'''
+  return _load(file_version(HOUR_CSV), model_dir)
+
+
+def season_of(dates):
+  '''Kode season hour.csv dari tanggal: 1 = 21 Des - 20 Mar, 2 = s.d. 20 Jun, 3 = s.d. 22 Sep, 4 = s.d. 20 Des.'''
+  dates = pd.DatetimeIndex(dates)
+  month_day = dates.month * 100 + dates.day
+  return np.searchsorted([321, 621, 923, 1221], month_day, side='right') % 4 + 1
+
+
+def day_scenarios(date, weathersit, temp_c, hum_percent, windspeed_kmh, atemp_c=None):
+  '''24 skenario perjam untuk satu hari dengan cuaca yang sama (satuan asli, bukan ternormalisasi).'''
+  hours = pd.Timestamp(date) + pd.to_timedelta(np.arange(24), unit='h')
+  # Tanpa input suhu semu, dianggap sama dengan suhu udara
+  atemp_c = temp_c if atemp_c is None else atemp_c
+  return pd.DataFrame({
+      'waktu': hours,
+      'temp': temp_c / TEMP_MAX,
+      'atemp': atemp_c / ATEMP_MAX,
+      'hum': hum_percent / HUM_MAX,
+      'windspeed': windspeed_kmh / WINDSPEED_MAX,
+      'hr': hours.hour,
+      # weekday hour.csv: Minggu = 0
+      'weekday': (hours.weekday + 1) % 7,
+      'season': season_of(hours),
+      'weathersit': weathersit,
+  })
+
+
+def _forecast_day(date, weathersit, temp_c, hum_percent, windspeed_kmh, hour_version):
+  scenarios = day_scenarios(date, weathersit, temp_c, hum_percent, windspeed_kmh)
+  return pd.DataFrame({'jam': scenarios['hr'], 'prakiraan': get_model().predict(scenarios)})
+
+
+if STREAMLIT_AVAILABLE:
+  _forecast_day = st.cache_data(max_entries=256, show_spinner=False)(_forecast_day)
+else:
+  _forecast_day = lru_cache(maxsize=256)(_forecast_day)
+
+
+def forecast_day(date, weathersit, temp_c, hum_percent, windspeed_kmh):
+  '''Prakiraan penyewaan per jam (DataFrame jam, prakiraan) untuk satu hari, di-cache per input.'''
+  return _forecast_day(date, weathersit, temp_c, hum_percent, windspeed_kmh, file_version(HOUR_CSV))
+
+
+def typical_weather(hourly_df, date):
+  '''Rata-rata suhu (C), kelembapan (%) & kecepatan angin (km/jam) pada bulan yang sama di hour.csv.'''
+  month = hourly_df[hourly_df['dteday'].dt.month == pd.Timestamp(date).month]
+  return (
+      float(month['temp'].mean() * TEMP_MAX),
+      float(month['hum'].mean() * HUM_MAX),
+      float(month['windspeed'].mean() * WINDSPEED_MAX),
+  )
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Train the hourly demand forecast on hour.csv")
+  parser.add_argument('--alpha', type=float, default=ALPHA)
+  parser.add_argument('--model-dir', default=MODEL_DIR)
+  args = parser.parse_args()
+  model = train(args.model_dir, args.alpha)
+  metrics = model.meta['metrics']
+  print(f"{model.meta['rows']} rows, MAE {metrics['mae']:.1f}, RMSE {metrics['rmse']:.1f}, "
+        f"R2 {metrics['r2']:.3f} -> {args.model_dir}")
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,289 @@
+'''
+Hourly engine of the bike-sharing dashboard: hour.csv is laid on a regular
+hourly grid (numpy arrays, one slot per hour) so a date range is a slice, the
+hour-of-day x weekday heatmap is a bincount over the slice and rolling demand
+comes from cumulative sums. Line charts are downsampled with LTTB (Largest
+Triangle Three Buckets) so the browser never receives more points than pixels.
+Trip records appended to a live feed (see live_producer.py) are tailed from
+the last byte read and added to the grid, without reloading hour.csv.
+Est. 2024
+@arthad
+'''
+import io
+import os
+import threading
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from data_layer import DATA_DIR, HOUR_CSV, file_version, load_datasets
+
+# Streamlit is optional, without it the store is a module level instance
+try:
+    import streamlit as st
+    STREAMLIT_AVAILABLE = True
+except ImportError:
+    STREAMLIT_AVAILABLE = False
+
+FEED_CSV = os.path.join(DATA_DIR, 'live-feed.csv')
+FEED_COLUMNS = ['started_at', 'user_type']
+USER_TYPES = ['casual', 'registered']
+# Hari dihitung dari tanggal (Senin = 0), bukan dari kolom weekday hour.csv
+WEEKDAYS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+# Lebar grafik dalam piksel: jumlah titik maksimum yang dikirim ke browser
+MAX_POINTS = 1000
+ROLLING_WINDOW = 24
+PEAK_QUANTILE = 0.9
+# Detik antar refresh halaman ketika live feed dipantau
+LIVE_INTERVAL = 5
+
+
+def lttb(x, y, threshold):
+  '''
+  Index titik yang dipilih oleh Largest Triangle Three Buckets (Steinarsson, 2013).
+  Titik pertama & terakhir selalu dipilih, sisanya satu titik per bucket: titik yang
+  membentuk segitiga terbesar dengan titik terpilih sebelumnya & rata-rata bucket berikutnya.
+  '''
+  x = np.asarray(x, dtype=np.float64)
+  y = np.asarray(y, dtype=np.float64)
+  n = len(x)
+  if threshold >= n or threshold < 3:
+    return np.arange(n)
+  # threshold - 2 bucket di antara titik pertama & terakhir
+  edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+  sizes = np.diff(edges)
+  mean_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / sizes
+  mean_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / sizes
+  # Bucket terakhir dibandingkan dengan titik terakhir
+  mean_x = np.append(mean_x[1:], x[-1])
+  mean_y = np.append(mean_y[1:], y[-1])
+
+  selected = np.empty(threshold, dtype=np.int64)
+  selected[0] = 0
+  selected[-1] = n - 1
+  a = 0
+  for b in range(threshold - 2):
+    start, end = edges[b], edges[b + 1]
+    areas = np.abs(
+        (x[a] - mean_x[b]) * (y[start:end] - y[a]) -
+        (x[a] - x[start:end]) * (mean_y[b] - y[a])
+    )
+    a = start + int(np.argmax(areas))
+    selected[b + 1] = a
+  return selected
+
+
+def rolling_sum(values, window):
+  # Jumlah `window` jam terakhir (termasuk jam itu sendiri) untuk setiap jam
+  cumulative = np.concatenate([[0], np.cumsum(values)])
+  start = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+  return cumulative[1:] - cumulative[start]
+
+
+def read_feed_chunk(data):
+  '''Trip records (bytes CSV tanpa header) -> jam mulai (datetime64[h]) & tipe pengguna (0/1).'''
+  trips = pd.read_csv(io.BytesIO(data), names=FEED_COLUMNS, header=None)
+  started_at = pd.to_datetime(trips['started_at'], format='%Y-%m-%d %H:%M:%S')
+  hours = started_at.to_numpy().astype('datetime64[h]')
+  user_type = trips['user_type'].map({user_type: i for i, user_type in enumerate(USER_TYPES)})
+  # Tipe tidak dikenal dihitung sebagai pengguna terdaftar
+  return hours, user_type.fillna(1).to_numpy(dtype=np.int64)
+
+
+class HourlyStore:
+  '''
+  Data perjam pada grid jam yang teratur, bisa ditambah secara inkremental.
+  Jam yang tidak ada di hour.csv ditandai dengan present = 0 dan tidak ikut dirata-rata.
+  Thread-safe: dipakai bersama oleh semua sesi.
+  '''
+  def __init__(self, hourly_df, feed_path=FEED_CSV):
+    self.feed_path = feed_path
+    self._lock = threading.RLock()
+    hours = (hourly_df['dteday'].to_numpy().astype('datetime64[h]') +
+             hourly_df['hr'].to_numpy().astype('timedelta64[h]'))
+    self.first_hour = hours.min()
+    slot = (hours - self.first_hour).astype(np.int64)
+    self.length = int(slot.max()) + 1
+    self._casual = np.zeros(self.length, dtype=np.int64)
+    self._registered = np.zeros(self.length, dtype=np.int64)
+    self._present = np.zeros(self.length, dtype=np.int64)
+    np.add.at(self._casual, slot, hourly_df['casual'].to_numpy())
+    np.add.at(self._registered, slot, hourly_df['registered'].to_numpy())
+    self._present[slot] = 1
+    # Salinan data hour.csv, untuk kembali ke awal jika feed diganti
+    self.base_length = self.length
+    self._base_casual = self._casual.copy()
+    self._base_registered = self._registered.copy()
+    self.feed_offset = 0
+    self.feed_inode = None
+    self.feed_trips = 0
+    # Berubah setiap ada data baru (untuk kunci cache gambar)
+    self.version = 0
+
+  # ============= Incremental Ingest =============
+  def _grow(self, length):
+    # Kapasitas digandakan agar penambahan jam baru amortized O(1)
+    if length > len(self._present):
+      capacity = max(length, 2 * len(self._present))
+      for name in ['_casual', '_registered', '_present']:
+        array = np.zeros(capacity, dtype=np.int64)
+        array[:self.length] = getattr(self, name)[:self.length]
+        setattr(self, name, array)
+    # Jam baru dari feed dianggap ada (0 penyewaan juga merupakan data)
+    if length > self.length:
+      self._present[self.length:length] = 1
+      self.length = length
+
+  def append_trips(self, hours, user_type):
+    '''Tambahkan trip records (jam mulai datetime64[h], tipe 0 = casual / 1 = registered).'''
+    slot = (np.asarray(hours, dtype='datetime64[h]') - self.first_hour).astype(np.int64)
+    # Trip sebelum awal dataset tidak bisa ditempatkan pada grid
+    keep = slot >= 0
+    slot = slot[keep]
+    user_type = np.asarray(user_type)[keep]
+    if len(slot) == 0:
+      return 0
+    with self._lock:
+      self._grow(int(slot.max()) + 1)
+      self._casual[:self.length] += np.bincount(slot[user_type == 0], minlength=self.length)
+      self._registered[:self.length] += np.bincount(slot[user_type == 1], minlength=self.length)
+      self.feed_trips += len(slot)
+      self.version += 1
+    return len(slot)
+
+  def _reset_feed(self):
+    # Feed diganti/dipotong: kembali ke data hour.csv lalu baca ulang dari awal
+    self.length = self.base_length
+    self._casual[:] = 0
+    self._registered[:] = 0
+    self._present[self.base_length:] = 0
+    self._casual[:self.base_length] = self._base_casual
+    self._registered[:self.base_length] = self._base_registered
+    self.feed_offset = 0
+    self.feed_trips = 0
+
+  def refresh(self):
+    '''
+    Baca baris baru dari feed mulai dari byte terakhir yang sudah dibaca (hanya baris
+    lengkap). Mengembalikan jumlah trip yang ditambahkan.
+    '''
+    try:
+      stat = os.stat(self.feed_path)
+    except OSError:
+      stat = None
+    with self._lock:
+      # Feed dihapus, diganti (inode berbeda) atau dipotong
+      if self.feed_offset and (stat is None or stat.st_ino != self.feed_inode or stat.st_size < self.feed_offset):
+        self._reset_feed()
+        self.version += 1
+      if stat is None or stat.st_size == self.feed_offset:
+        return 0
+      self.feed_inode = stat.st_ino
+      with open(self.feed_path, 'rb') as f:
+        f.seek(self.feed_offset)
+        data = f.read(stat.st_size - self.feed_offset)
+      # Baris terakhir yang belum selesai ditulis dibaca pada refresh berikutnya
+      end = data.rfind(b'\n') + 1
+      if end == 0:
+        return 0
+      start = 0
+      if self.feed_offset == 0 and data.startswith(b'started_at'):
+        start = data.find(b'\n') + 1
+      self.feed_offset += end
+      if end == start:
+        return 0
+      hours, user_type = read_feed_chunk(data[start:end])
+      return self.append_trips(hours, user_type)
+
+  # ============= Queries =============
+  @property
+  def last_hour(self):
+    return self.first_hour + np.timedelta64(self.length - 1, 'h')
+
+  def hour_range(self, start_date, end_date=None):
+    '''Slot [i, j) untuk start_date..end_date (inklusif, per hari); end_date None = sampai data terbaru.'''
+    i = int((np.datetime64(start_date, 'D').astype('datetime64[h]') - self.first_hour).astype(int))
+    if end_date is None:
+      j = self.length
+    else:
+      end_hour = (np.datetime64(end_date, 'D') + np.timedelta64(1, 'D')).astype('datetime64[h]')
+      j = int((end_hour - self.first_hour).astype(int))
+    return min(max(i, 0), self.length), min(max(j, 0), self.length)
+
+  def series(self, start_date, end_date=None):
+    '''DataFrame perjam (waktu, casual, registered, cnt, present) pada rentang tanggal.'''
+    with self._lock:
+      i, j = self.hour_range(start_date, end_date)
+      casual = self._casual[i:j].copy()
+      registered = self._registered[i:j].copy()
+      present = self._present[i:j].copy()
+    return pd.DataFrame({
+        'waktu': self.first_hour + np.arange(i, j).astype('timedelta64[h]'),
+        'casual': casual,
+        'registered': registered,
+        'cnt': casual + registered,
+        'present': present,
+    })
+
+  def heatmap(self, start_date, end_date=None, measure='cnt'):
+    '''Rata-rata penyewaan per (hari, jam) pada rentang tanggal: DataFrame 7 x 24.'''
+    hourly = self.series(start_date, end_date)
+    if len(hourly) == 0:
+      return pd.DataFrame(np.nan, index=WEEKDAYS, columns=range(24))
+    slot = (hourly['waktu'].to_numpy().astype('datetime64[h]').astype(np.int64))
+    # 1970-01-01 adalah hari Kamis (Senin = 0 -> Kamis = 3)
+    cell = ((slot // 24 + 3) % 7) * 24 + slot % 24
+    present = hourly['present'].to_numpy()
+    sums = np.bincount(cell, weights=hourly[measure].to_numpy() * present, minlength=7 * 24)
+    counts = np.bincount(cell, weights=present, minlength=7 * 24)
+    with np.errstate(invalid='ignore'):
+      means = sums / counts
+    return pd.DataFrame(means.reshape(7, 24), index=WEEKDAYS, columns=range(24))
+
+  def demand(self, start_date, end_date=None, window=ROLLING_WINDOW, quantile=PEAK_QUANTILE):
+    '''
+    (hourly, peaks): hourly berisi rata-rata bergerak `window` jam (rolling), peaks adalah
+    jam-jam yang merupakan maksimum lokal dalam jendela `window` jam di sekitarnya & berada
+    di atas kuantil `quantile` dari penyewaan perjam pada rentang tersebut.
+    '''
+    hourly = self.series(start_date, end_date)
+    cnt = hourly['cnt'].to_numpy()
+    present = hourly['present'].to_numpy()
+    with np.errstate(invalid='ignore'):
+      hourly['rolling'] = rolling_sum(cnt, window) / rolling_sum(present, window)
+    if len(cnt) == 0:
+      return hourly, hourly.iloc[0:0]
+    # Maksimum lokal: sama dengan nilai maksimum pada jendela yang berpusat di jam tersebut
+    half = window // 2
+    padded = np.pad(cnt, (half, window - half - 1), constant_values=-1)
+    local_max = np.lib.stride_tricks.sliding_window_view(padded, window).max(axis=1)
+    threshold = np.quantile(cnt[present > 0], quantile) if present.any() else np.inf
+    is_peak = (cnt == local_max) & (cnt >= threshold) & (present > 0)
+    return hourly, hourly[is_peak].reset_index(drop=True)
+
+  def downsample(self, hourly, column='cnt', max_points=MAX_POINTS):
+    '''Titik LTTB dari kolom `column` (hanya jam yang ada) untuk grafik garis.'''
+    hourly = hourly[hourly['present'] > 0]
+    x = hourly['waktu'].to_numpy().astype('datetime64[h]').astype(np.float64)
+    selected = lttb(x, hourly[column].to_numpy(), max_points)
+    return hourly.iloc[selected].reset_index(drop=True)
+
+
+def _create_store(hour_version, feed_path):
+  _, hourly_df = load_datasets()
+  store = HourlyStore(hourly_df, feed_path)
+  store.refresh()
+  return store
+
+
+if STREAMLIT_AVAILABLE:
+  # Satu store untuk semua sesi, dibangun ulang hanya jika hour.csv berubah
+  _create_store = st.cache_resource(max_entries=1, show_spinner=False)(_create_store)
+else:
+  _create_store = lru_cache(maxsize=1)(_create_store)
+
+
+def get_hourly_store(feed_path=FEED_CSV):
+  '''HourlyStore bersama yang sudah membaca data terbaru dari feed.'''
+  store = _create_store(file_version(HOUR_CSV), feed_path)
+  store.refresh()
+  return store
@@ -0,0 +1,114 @@
+'''
+Interactive (Vega-Lite through altair) versions of the dashboard charts. The
+browser receives the aggregated data (daily rows, totals per category) and
+draws the charts itself, instead of receiving raster images from the server.
+Est. 2024
+@arthad
+'''
+# altair is optional, without it the dashboard only shows the matplotlib images
+try:
+    import altair as alt
+    ALTAIR_AVAILABLE = True
+except ImportError:
+    ALTAIR_AVAILABLE = False
+
+HIGHLIGHT = '#4FFB55'
+MUTED = '#D3D3D3'
+
+
+def daily_line(df):
+  # Line chart jumlah penyewaan harian
+  return alt.Chart(df[['dteday', 'cnt']]).mark_line(point=True, color='plum').encode(
+      x=alt.X('dteday:T', title=None),
+      y=alt.Y('cnt:Q', title=None),
+      tooltip=['dteday:T', 'cnt:Q']
+  ).interactive()
+
+
+def daily_area(df):
+  # Stacked area chart komposisi penyewaan harian (casual & registered)
+  data = df[['dteday', 'casual', 'registered']].melt('dteday', var_name='tipe', value_name='jumlah')
+  return alt.Chart(data).mark_area().encode(
+      x=alt.X('dteday:T', title=None),
+      y=alt.Y('jumlah:Q', stack=True, title=None),
+      color=alt.Color('tipe:N', legend=alt.Legend(orient='top-left')),
+      tooltip=['dteday:T', 'tipe:N', 'jumlah:Q']
+  ).interactive()
+
+
+def corr_heatmap(corr_df):
+  # Heatmap korelasi antar variabel numerik, dengan angka korelasinya
+  data = corr_df.rename_axis('x').reset_index().melt('x', var_name='y', value_name='korelasi')
+  base = alt.Chart(data).encode(x=alt.X('x:N', title=None, sort=None), y=alt.Y('y:N', title=None, sort=None))
+  heatmap = base.mark_rect().encode(color=alt.Color('korelasi:Q', scale=alt.Scale(scheme='redblue', domain=[-1, 1])))
+  text = base.mark_text().encode(text=alt.Text('korelasi:Q', format='.2f'))
+  return heatmap + text
+
+
+def regression(df, x, title):
+  # Scatter plot dengan garis regresi linier (tanpa bootstrap interval kepercayaan)
+  points = alt.Chart(df[[x, 'cnt']]).mark_circle(opacity=0.6).encode(
+      x=alt.X(f'{x}:Q', title=x),
+      y=alt.Y('cnt:Q', title='cnt')
+  )
+  line = points.transform_regression(x, 'cnt').mark_line(color='orange')
+  return (points + line).properties(title=title)
+
+
+def totals_bar(total_df, column, title):
+  # Bar chart total penyewaan per kategori, kategori terbesar disorot
+  return alt.Chart(total_df).mark_bar().encode(
+      x=alt.X(f'{column}:N', sort=None, title=None),
+      y=alt.Y('cnt:Q', title=None),
+      color=alt.condition(alt.datum.cnt == int(total_df['cnt'].max()), alt.value(HIGHLIGHT), alt.value(MUTED)),
+      tooltip=[f'{column}:N', alt.Tooltip('cnt:Q', format=',')]
+  ).properties(title=title)
+
+
+def totals_pie(total_df, column, title):
+  # Pie chart persentase penyewaan per kategori
+  return alt.Chart(total_df).mark_arc().encode(
+      theta='cnt:Q',
+      color=alt.Color(f'{column}:N', sort=None, title=None),
+      tooltip=[f'{column}:N', alt.Tooltip('cnt:Q', format=',')]
+  ).properties(title=title)
+
+
+def hourly_demand(points_df, rolling_df, peaks_df, rolling_label):
+  # Penyewaan perjam (titik LTTB), rata-rata bergerak & jam puncak
+  line = alt.Chart(points_df[['waktu', 'cnt']]).mark_line(color='plum', strokeWidth=1).encode(
+      x=alt.X('waktu:T', title=None),
+      y=alt.Y('cnt:Q', title=None),
+      tooltip=['waktu:T', 'cnt:Q']
+  )
+  rolling = alt.Chart(rolling_df[['waktu', 'rolling']]).mark_line(color='purple').encode(
+      x='waktu:T',
+      y='rolling:Q',
+      tooltip=['waktu:T', alt.Tooltip('rolling:Q', title=rolling_label, format='.1f')]
+  )
+  peaks = alt.Chart(peaks_df[['waktu', 'cnt']]).mark_point(color='red', filled=True).encode(
+      x='waktu:T',
+      y='cnt:Q',
+      tooltip=['waktu:T', 'cnt:Q']
+  )
+  return (line + rolling + peaks).interactive()
+
+
+def hourly_heatmap(heatmap_df):
+  # Heatmap rata-rata penyewaan per hari & jam
+  data = heatmap_df.rename_axis('hari').reset_index().melt('hari', var_name='jam', value_name='rata-rata')
+  return alt.Chart(data).mark_rect().encode(
+      x=alt.X('jam:O', title='Jam'),
+      y=alt.Y('hari:N', sort=list(heatmap_df.index), title=None),
+      color=alt.Color('rata-rata:Q', scale=alt.Scale(scheme='purples')),
+      tooltip=['hari:N', 'jam:O', alt.Tooltip('rata-rata:Q', format='.1f')]
+  )
+
+
+def forecast_bar(forecast_df):
+  # Bar chart prakiraan penyewaan per jam
+  return alt.Chart(forecast_df).mark_bar(color='plum').encode(
+      x=alt.X('jam:O', title='Jam'),
+      y=alt.Y('prakiraan:Q', title=None),
+      tooltip=['jam:O', alt.Tooltip('prakiraan:Q', format='.0f')]
+  )
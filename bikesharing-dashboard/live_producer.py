@@ -0,0 +1,83 @@
+'''
+Local producer of a live trip feed for the dashboard: simulated trip records
+(started_at, user_type) are appended to Bike-sharing-dataset/live-feed.csv,
+one simulated hour per tick, continuing after the last hour in hour.csv (or
+in the feed). The number of trips of every hour is drawn from a Poisson
+distribution with the mean of the same weekday & hour in hour.csv.
+Est. 2024
+@arthad
+
+Usage: python bikesharing-dashboard/live_producer.py [--interval 1] [--hours 0] [--feed PATH]
+'''
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from hourly import FEED_COLUMNS, FEED_CSV, USER_TYPES
+from data_layer import HOUR_CSV
+
+
+def hourly_profile(path=HOUR_CSV):
+  '''Rata-rata casual & registered per (hari (Senin = 0), jam): array 7 x 24 x 2.'''
+  df = pd.read_csv(path, usecols=['dteday', 'hr', 'casual', 'registered'], parse_dates=['dteday'])
+  weekday = df['dteday'].dt.weekday.to_numpy()
+  profile = df.groupby([weekday, df['hr']])[USER_TYPES].mean()
+  return profile.to_numpy().reshape(7, 24, len(USER_TYPES))
+
+
+def last_hour(feed_path, path=HOUR_CSV):
+  # Lanjutkan dari jam terakhir pada feed, atau dari akhir hour.csv jika feed belum ada
+  if os.path.exists(feed_path) and os.path.getsize(feed_path) > 0:
+    feed = pd.read_csv(feed_path, usecols=['started_at'])
+    if len(feed):
+      return pd.Timestamp(feed['started_at'].iloc[-1]).floor('h')
+  df = pd.read_csv(path, usecols=['dteday', 'hr']).iloc[-1]
+  return pd.Timestamp(df['dteday']) + pd.Timedelta(hours=int(df['hr']))
+
+
+def simulate_hour(hour, profile, rng):
+  '''Trip records untuk satu jam: list baris "started_at,user_type" terurut berdasarkan waktu.'''
+  counts = rng.poisson(profile[hour.weekday(), hour.hour])
+  user_type = np.repeat(np.arange(len(USER_TYPES)), counts)
+  seconds = np.sort(rng.integers(0, 3600, size=len(user_type)))
+  user_type = rng.permutation(user_type)
+  return [
+      f"{(hour + pd.Timedelta(seconds=int(second))).strftime('%Y-%m-%d %H:%M:%S')},{USER_TYPES[k]}"
+      for second, k in zip(seconds, user_type)
+  ]
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Append simulated trip records to the dashboard's live feed")
+  parser.add_argument('--feed', default=FEED_CSV, help="feed CSV (default: %(default)s)")
+  parser.add_argument('--interval', type=float, default=1.0, help="seconds between simulated hours")
+  parser.add_argument('--hours', type=int, default=0, help="number of hours to write (0 = until interrupted)")
+  parser.add_argument('--seed', type=int, default=None)
+  args = parser.parse_args()
+
+  profile = hourly_profile()
+  rng = np.random.default_rng(args.seed)
+  hour = last_hour(args.feed)
+  new_file = not os.path.exists(args.feed) or os.path.getsize(args.feed) == 0
+  written = 0
+  with open(args.feed, 'a', encoding='utf-8', newline='') as f:
+    if new_file:
+      f.write(','.join(FEED_COLUMNS) + '\n')
+    try:
+      while args.hours == 0 or written < args.hours:
+        hour += pd.Timedelta(hours=1)
+        lines = simulate_hour(hour, profile, rng)
+        # Flush setiap jam; baris yang belum lengkap akan dilewati pembaca sampai selesai ditulis
+        f.write(''.join(line + '\n' for line in lines))
+        f.flush()
+        written += 1
+        print(f"{hour:%Y-%m-%d %H:00} {len(lines)} trips")
+        if args.interval > 0:
+          time.sleep(args.interval)
+    except KeyboardInterrupt:
+      pass
+
+
+if __name__ == '__main__':
+  main()
@@ -5,123 +5,24 @@ Est. 2024
 @arthad
 '''
 import os
+import time
+import datetime
 import streamlit as st
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from data_layer import DAY_CSV, HOUR_CSV, file_version, load_cube, load_datasets, slice_dates, summarize_range, weathersit_mapping
+from forecast import forecast_day, typical_weather
+from figure_cache import get_figure_cache
+from hourly import LIVE_INTERVAL, MAX_POINTS, ROLLING_WINDOW, get_hourly_store
+import interactive_charts as charts
 
 sns.set_style("dark")
 st.header('Bike-Sharing Dashboard :bike:', divider="rainbow")
 
-# ============= Helper Function (Creating Dataframes for viz from universal df) =============
-def create_season_df(df):
-  season_df = (df.groupby('season')['cnt']
-                .sum()
-                .sort_values(ascending=False)
-                .reset_index()
-  )
-  return season_df
-
-def create_weather_df(df):
-  weather_df = (df.groupby('weathersit')['cnt']
-                .sum()
-                .sort_values(ascending=False)
-                .reset_index()
-  )
-  return weather_df
-
-def create_holiday_df(df):
-  holiday_df = (df.groupby('holiday')['cnt']
-                .sum()
-                .sort_values(ascending=False)
-                .reset_index()
-  )
-  return holiday_df
-
-def create_workingday_df(df):
-  workingday_df = (df.groupby('workingday')['cnt']
-                .sum()
-                .sort_values(ascending=False)
-                .reset_index()
-  )
-  return workingday_df
-
-def create_corr_df(df):
-  kolom_numerik = ['temp', 'atemp', 'hum', 'windspeed', 'cnt']
-  corr_df = df[kolom_numerik].corr()
-  return corr_df
-
 # ============= Data Import =============
-# Memuat data penyewaan harian
-daily_df = pd.read_csv('bikesharing-dashboard/Bike-sharing-dataset/day.csv')
-# Memuat data penyewaan perjam
-hourly_df = pd.read_csv('bikesharing-dashboard/Bike-sharing-dataset/hour.csv')
-# Melakukan reset index karena data diimport dari file csv
-daily_df.reset_index(inplace=True)
-hourly_df.reset_index(inplace=True)
-# Mengkonversi tipe data kolom dteday menjadi datetime
-daily_df['dteday'] = pd.to_datetime(daily_df['dteday'])
-hourly_df['dteday'] = pd.to_datetime(hourly_df['dteday'])
-
-
-# ============= Value Mapping =============
-season_mapping = {
-    1: 'Semi',
-    2: 'Panas',
-    3: 'Gugur',
-    4: 'Dingin'
-}
-weathersit_mapping = {
-    1: 'Cerah',
-    2: 'Mendung',
-    3: 'Hujan Ringan',
-    4: 'Badai Petir'
-}
-holiday_mapping = {
-    0: 'Bukan Hari Libur',
-    1: 'Hari Libur',
-}
-workingday_mapping = {
-    0: 'Bukan Hari Kerja',
-    1: 'Hari Kerja',
-}
-mnth_mapping = {
-    1: 'Jan',
-    2: 'Feb',
-    3: 'Mar',
-    4: 'Apr',
-    5: 'Mei',
-    6: 'Jun',
-    7: 'Jul',
-    8: 'Agu',
-    9: 'Sep',
-    10: 'Okt',
-    11: 'Nov',
-    12: 'Des'
-}
-yr_mapping = {
-    0: 2011,
-    1: 2012,
-}
-weekday_mapping = {
-    0: 'Senin',
-    1: 'Selasa',
-    2: 'Rabu',
-    3: 'Kamis',
-    4: 'Jumat',
-    5: 'Sabtu',
-    6: 'Minggu'
-}
-daily_df['season'] = daily_df['season'].map(season_mapping)
-daily_df['weathersit'] = daily_df['weathersit'].map(weathersit_mapping)
-daily_df['holiday'] = daily_df['holiday'].map(holiday_mapping)
-daily_df['workingday'] = daily_df['workingday'].map(workingday_mapping)
-daily_df['mnth'] = daily_df['mnth'].map(mnth_mapping)
-daily_df['weekday'] = daily_df['weekday'].map(weekday_mapping)
-hourly_df['season'] = hourly_df['season'].map(season_mapping)
-hourly_df['weathersit'] = hourly_df['weathersit'].map(weathersit_mapping)
-hourly_df['holiday'] = hourly_df['holiday'].map(holiday_mapping)
-hourly_df['workingday'] = hourly_df['workingday'].map(workingday_mapping)
+# Dataset harian & perjam dimuat, dikonversi (dteday -> datetime) dan dipetakan (Categorical)
+# sekali per proses oleh data_layer, bukan pada setiap rerun
+daily_df, hourly_df = load_datasets()
 
 
 # ============= Section: Sidebar =============
@@ -138,6 +39,10 @@ with st.sidebar:
         min_value=min_date,
         max_value=max_date
     )
+    # Grafik interaktif (Vega-Lite): browser menerima data agregat, bukan gambar
+    interactive = charts.ALTAIR_AVAILABLE and st.toggle("Grafik interaktif", value=False)
+    # Halaman dimuat ulang secara berkala untuk membaca trip baru dari live feed (live_producer.py)
+    live = st.toggle("Pantau live feed", value=False)
     # Workaround to prevent Streamlit from showing ValueError
     try:
         start_date, end_date = val
@@ -145,44 +50,69 @@ with st.sidebar:
         st.error("You must pick both the start and the end date")
         st.stop() # Pausing the script's execution
 
-daily_df = daily_df[(daily_df['dteday'].dt.date >= start_date) & (daily_df['dteday'].dt.date <= end_date)]
-season_daily_df = create_season_df(daily_df)
-weather_daily_df = create_weather_df(daily_df)
-holiday_df = create_holiday_df(daily_df)
-workingday_df = create_workingday_df(daily_df)
-corr_df = create_corr_df(daily_df)
+daily_df = slice_dates(daily_df, start_date, end_date)
+# Agregasi untuk rentang tanggal ini diambil dari prefix-sum cube (tanpa groupby ulang)
+summary = summarize_range(start_date, end_date)
+metrics = load_cube().metrics(start_date, end_date)
+season_daily_df = summary['season']
+weather_daily_df = summary['weathersit']
+holiday_df = summary['holiday']
+workingday_df = summary['workingday']
+corr_df = summary['corr']
+
+# Setiap gambar dirender sekali per (grafik, rentang tanggal, versi dataset) lalu disimpan sebagai PNG
+figure_cache = get_figure_cache()
+figure_key = (start_date, end_date, file_version(DAY_CSV))
+
+def show_figure(chart_id, draw, key=None):
+  st.image(figure_cache.render(chart_id, key or figure_key, draw), use_column_width=True)
+
+def show_charts(*chart_list):
+  # Grafik interaktif ditampilkan berdampingan seperti subplot pada versi matplotlib
+  columns = st.columns(len(chart_list))
+  for column, chart in zip(columns, chart_list):
+    with column:
+      st.altair_chart(chart, use_container_width=True)
 
 
 # ============= Dashboard: Penyewaan Harian =============
 st.subheader("Penyewaan Harian")
 col_1, col_2, col_3, col_4 = st.columns(4)
 with col_1:
-    st.metric("Min", daily_df['cnt'].min())  
+    st.metric("Min", metrics['min'])  
 with col_2: 
-    st.metric("Max", daily_df['cnt'].max())     
+    st.metric("Max", metrics['max'])     
 with col_3: 
-    st.metric("Avg", round(daily_df['cnt'].mean()))   
+    st.metric("Avg", round(metrics['mean']))   
 with col_4: 
-    st.metric("Total Orders", daily_df['cnt'].sum())
+    st.metric("Total Orders", metrics['sum'])
 # Line chart untuk memvisualisasi jumlah penyewaan harian             
-fig, ax = plt.subplots(figsize=(20,10))
-ax.plot(
-   daily_df['dteday'],
-   daily_df['cnt'],
-   color='plum',
-   marker='.'
-)
-st.pyplot(fig)
+def draw_daily_line():
+  fig, ax = plt.subplots(figsize=(20,10))
+  ax.plot(
+     daily_df['dteday'],
+     daily_df['cnt'],
+     color='plum',
+     marker='.'
+  )
+  return fig
 # Stacked area chart untuk memvisualisasi komposisi jumlah penyewaan harian
-fig, ax = plt.subplots(figsize=(20,10))
-ax.stackplot(
-   daily_df['dteday'],
-   daily_df['registered'],
-   daily_df['casual'],
-   labels=['casual', 'registered']
-)
-ax.legend(loc='upper left')
-st.pyplot(fig)
+def draw_daily_area():
+  fig, ax = plt.subplots(figsize=(20,10))
+  ax.stackplot(
+     daily_df['dteday'],
+     daily_df['registered'],
+     daily_df['casual'],
+     labels=['casual', 'registered']
+  )
+  ax.legend(loc='upper left')
+  return fig
+if interactive:
+  show_charts(charts.daily_line(daily_df))
+  show_charts(charts.daily_area(daily_df))
+else:
+  show_figure('daily_line', draw_daily_line)
+  show_figure('daily_area', draw_daily_area)
 st.write("")
 st.write("")
 
@@ -190,31 +120,39 @@ st.write("")
 # ============= Dashboard: Matriks Korelasi =============
 # Membuat heatmap untuk memvisualisasi korelasi antar variabel numerik pada dataset
 st.subheader("Korelasi Variabel Numerik")
-fig, ax = plt.subplots(figsize=(20, 10))
-sns.heatmap(
-   corr_df,
-   annot=True,
-   ax=ax
-)
-st.pyplot(fig)
+def draw_corr_heatmap():
+  fig, ax = plt.subplots(figsize=(20, 10))
+  sns.heatmap(
+     corr_df,
+     annot=True,
+     ax=ax
+  )
+  return fig
 # Membuat 2 scatter plot untuk memvisualisasi korelasi variabel-variabel yang paling kuat dengan variabel cnt,
 # yaitu antara variabel temp & atemp.
-fig, axes= plt.subplots(figsize=(20, 10), nrows=1, ncols=2)
-sns.regplot(
-    x='temp',
-    y='cnt',
-    data=daily_df,
-    ax=axes[0]
-)
-axes[0].set_title("Suhu")
-sns.regplot(
-    x='temp',
-    y='cnt',
-    data=daily_df,
-    ax=axes[1]
-)
-axes[1].set_title("Suhu Semu")
-st.pyplot(fig)
+def draw_regression():
+  fig, axes= plt.subplots(figsize=(20, 10), nrows=1, ncols=2)
+  sns.regplot(
+      x='temp',
+      y='cnt',
+      data=daily_df,
+      ax=axes[0]
+  )
+  axes[0].set_title("Suhu")
+  sns.regplot(
+      x='temp',
+      y='cnt',
+      data=daily_df,
+      ax=axes[1]
+  )
+  axes[1].set_title("Suhu Semu")
+  return fig
+if interactive:
+  show_charts(charts.corr_heatmap(corr_df))
+  show_charts(charts.regression(daily_df, 'temp', "Suhu"), charts.regression(daily_df, 'temp', "Suhu Semu"))
+else:
+  show_figure('corr_heatmap', draw_corr_heatmap)
+  show_figure('regression', draw_regression)
 st.write("")
 st.write("")
 
@@ -222,82 +160,92 @@ st.write("")
 # ============= Dashboard: Jumlah Penyewaan Pada Setiap Musim/Cuaca =============
 # Membuat barchart untuk memvisualisasi jumlah penyewaan pada setiap musim ataupun cuaca (Harian)
 st.subheader("Jumlah Penyewaan Pada Setiap Musim/Cuaca")
-colors_1 = ['#4FFB55', '#D3D3D3', '#D3D3D3', '#D3D3D3']
-colors_2 = ['#4FFB55', '#D3D3D3', '#D3D3D3']
-fig, axes = plt.subplots(figsize=(20,6), nrows=1, ncols=2)
-# First chart: season
-sns.barplot(
-    x='season',
-    y='cnt',
-    hue='season',
-    data=season_daily_df,
-    palette=colors_1,
-    ax=axes[0]
-)
-tallest_value = season_daily_df['cnt'].max()
-axes[0].bar_label(
-    axes[0].containers[0],
-    labels=['{:,}'.format(tallest_value)],
-    label_type='edge'
-)
-axes[0].margins(y=0.1)
-axes[0].set_xlabel(None)
-axes[0].set_ylabel(None)
-axes[0].set_title("Musim")
-# Second chart: weather
-sns.barplot(
-    x='weathersit',
-    y='cnt',
-    hue='weathersit',
-    data=weather_daily_df,
-    palette=colors_2,
-    ax=axes[1]
-)
-tallest_value = weather_daily_df['cnt'].max()
-axes[1].bar_label(
-    axes[1].containers[0],
-    labels=['{:,}'.format(tallest_value)],
-    label_type='edge'
-)
-axes[1].margins(y=0.1)
-axes[1].set_xlabel(None)
-axes[1].set_ylabel(None)
-axes[1].set_title("Cuaca")
-st.pyplot(fig)
-st.write("")
+def draw_season_weather_bars():
+  colors_1 = ['#4FFB55', '#D3D3D3', '#D3D3D3', '#D3D3D3']
+  colors_2 = ['#4FFB55', '#D3D3D3', '#D3D3D3']
+  fig, axes = plt.subplots(figsize=(20,6), nrows=1, ncols=2)
+  # First chart: season
+  sns.barplot(
+      x='season',
+      y='cnt',
+      hue='season',
+      data=season_daily_df,
+      palette=colors_1,
+      ax=axes[0]
+  )
+  tallest_value = season_daily_df['cnt'].max()
+  axes[0].bar_label(
+      axes[0].containers[0],
+      labels=['{:,}'.format(tallest_value)],
+      label_type='edge'
+  )
+  axes[0].margins(y=0.1)
+  axes[0].set_xlabel(None)
+  axes[0].set_ylabel(None)
+  axes[0].set_title("Musim")
+  # Second chart: weather
+  sns.barplot(
+      x='weathersit',
+      y='cnt',
+      hue='weathersit',
+      data=weather_daily_df,
+      palette=colors_2,
+      ax=axes[1]
+  )
+  tallest_value = weather_daily_df['cnt'].max()
+  axes[1].bar_label(
+      axes[1].containers[0],
+      labels=['{:,}'.format(tallest_value)],
+      label_type='edge'
+  )
+  axes[1].margins(y=0.1)
+  axes[1].set_xlabel(None)
+  axes[1].set_ylabel(None)
+  axes[1].set_title("Cuaca")
+  return fig
 # Membuat pie chart untuk memvisualisasi jumlah penyewaan pada setiap musim ataupun cuaca (harian)
-num_categories_1 = len(season_daily_df['cnt'])
-num_categories_2 = len(weather_daily_df['cnt'])
-explode_1 = [0] * num_categories_1
-explode_2 = [0] * num_categories_2
-if num_categories_1 > 1:
-   explode_1[0] = 0.2
-if num_categories_2 > 1:
-   explode_2[0] = 0.2
-fig, axes = plt.subplots(figsize=(20,6), nrows=1, ncols=2)
-# First chart: season
-axes[0].pie(
-    x=season_daily_df['cnt'],
-    labels=season_daily_df['season'],
-    colors=sns.color_palette("pastel"),
-    explode=explode_1,
-    autopct='%.2f%%'
-)
-axes[0].set_xlabel(None)
-axes[0].set_ylabel(None)
-axes[0].set_title("Musim")
-# Second chart: weather
-axes[1].pie(
-    x=weather_daily_df['cnt'],
-    labels=weather_daily_df['weathersit'],
-    colors=sns.color_palette("pastel"),
-    explode=explode_2,
-    autopct='%.2f%%'
-)
-axes[1].set_xlabel(None)
-axes[1].set_ylabel(None)
-axes[1].set_title("Cuaca")
-st.pyplot(fig)
+def draw_season_weather_pies():
+  num_categories_1 = len(season_daily_df['cnt'])
+  num_categories_2 = len(weather_daily_df['cnt'])
+  explode_1 = [0] * num_categories_1
+  explode_2 = [0] * num_categories_2
+  if num_categories_1 > 1:
+     explode_1[0] = 0.2
+  if num_categories_2 > 1:
+     explode_2[0] = 0.2
+  fig, axes = plt.subplots(figsize=(20,6), nrows=1, ncols=2)
+  # First chart: season
+  axes[0].pie(
+      x=season_daily_df['cnt'],
+      labels=season_daily_df['season'],
+      colors=sns.color_palette("pastel"),
+      explode=explode_1,
+      autopct='%.2f%%'
+  )
+  axes[0].set_xlabel(None)
+  axes[0].set_ylabel(None)
+  axes[0].set_title("Musim")
+  # Second chart: weather
+  axes[1].pie(
+      x=weather_daily_df['cnt'],
+      labels=weather_daily_df['weathersit'],
+      colors=sns.color_palette("pastel"),
+      explode=explode_2,
+      autopct='%.2f%%'
+  )
+  axes[1].set_xlabel(None)
+  axes[1].set_ylabel(None)
+  axes[1].set_title("Cuaca")
+  return fig
+if interactive:
+  show_charts(charts.totals_bar(season_daily_df, 'season', "Musim"),
+              charts.totals_bar(weather_daily_df, 'weathersit', "Cuaca"))
+  show_charts(charts.totals_pie(season_daily_df, 'season', "Musim"),
+              charts.totals_pie(weather_daily_df, 'weathersit', "Cuaca"))
+else:
+  show_figure('season_weather_bars', draw_season_weather_bars)
+  st.write("")
+  show_figure('season_weather_pies', draw_season_weather_pies)
 st.write("")
 st.write("")
 
@@ -305,85 +253,207 @@ st.write("")
 # ============= Dashboard: Jumlah Penyewaan Pada Setiap Hari Libur/Hari Kerja =============
 # Membuat barchart untuk memvisualisasi jumlah penyewaan pada setiap hari libur/kerja
 st.subheader("Jumlah Penyewaan Menurut Hari Libur/Hari Kerja")
-colors_1 = ['#4FFB55', '#D3D3D3']
-colors_2 = ['#4FFB55', '#D3D3D3']
-holiday_df = create_holiday_df(daily_df)
-workingday_df = create_workingday_df(daily_df)
-fig, axes = plt.subplots(figsize=(20,6), nrows=1, ncols=2)
-# First chart: holiday
-sns.barplot(
-    x='holiday',
-    y='cnt',
-    hue='holiday',
-    data=holiday_df,
-    palette=colors_1,
-    ax=axes[0]
-)
-tallest_value = holiday_df['cnt'].max()
-axes[0].bar_label(
-    axes[0].containers[0],
-    labels=['{:,}'.format(tallest_value)],
-    label_type='edge'
-)
-axes[0].margins(y=0.1)
-axes[0].set_xlabel(None)
-axes[0].set_ylabel(None)
-axes[0].set_title("Hari Libur")
-# Second chart: workingday
-sns.barplot(
-    x='workingday',
-    y='cnt',
-    hue='workingday',
-    data=workingday_df,
-    palette=colors_2,
-    ax=axes[1]
-)
-tallest_value = workingday_df['cnt'].max()
-axes[1].bar_label(
-    axes[1].containers[0],
-    labels=['{:,}'.format(tallest_value)],
-    label_type='edge'
-)
-axes[1].margins(y=0.1)
-axes[1].set_xlabel(None)
-axes[1].set_ylabel(None)
-axes[1].set_title("Hari Kerja")
-st.pyplot(fig)
-st.write("")
+def draw_holiday_workingday_bars():
+  colors_1 = ['#4FFB55', '#D3D3D3']
+  colors_2 = ['#4FFB55', '#D3D3D3']
+  fig, axes = plt.subplots(figsize=(20,6), nrows=1, ncols=2)
+  # First chart: holiday
+  sns.barplot(
+      x='holiday',
+      y='cnt',
+      hue='holiday',
+      data=holiday_df,
+      palette=colors_1,
+      ax=axes[0]
+  )
+  tallest_value = holiday_df['cnt'].max()
+  axes[0].bar_label(
+      axes[0].containers[0],
+      labels=['{:,}'.format(tallest_value)],
+      label_type='edge'
+  )
+  axes[0].margins(y=0.1)
+  axes[0].set_xlabel(None)
+  axes[0].set_ylabel(None)
+  axes[0].set_title("Hari Libur")
+  # Second chart: workingday
+  sns.barplot(
+      x='workingday',
+      y='cnt',
+      hue='workingday',
+      data=workingday_df,
+      palette=colors_2,
+      ax=axes[1]
+  )
+  tallest_value = workingday_df['cnt'].max()
+  axes[1].bar_label(
+      axes[1].containers[0],
+      labels=['{:,}'.format(tallest_value)],
+      label_type='edge'
+  )
+  axes[1].margins(y=0.1)
+  axes[1].set_xlabel(None)
+  axes[1].set_ylabel(None)
+  axes[1].set_title("Hari Kerja")
+  return fig
 # Membuat pie chart untuk memvisualisasi jumlah penyewaan pada setiap hari libur/hari kerja
-num_categories_1 = len(holiday_df['cnt'])
-num_categories_2 = len(workingday_df['cnt'])
-explode_1 = [0] * num_categories_1
-explode_2 = [0] * num_categories_2
-if num_categories_1 > 1:
-   explode_1[0] = 0.2
-if num_categories_2 > 1:
-   explode_2[0] = 0.2
-fig, axes = plt.subplots(figsize=(20,6), nrows=1, ncols=2)
-# First chart: holiday
-axes[0].pie(
-    x=holiday_df['cnt'],
-    labels=holiday_df['holiday'],
-    colors=sns.color_palette("pastel"),
-    explode=explode_1,
-    autopct='%.2f%%'
+def draw_holiday_workingday_pies():
+  num_categories_1 = len(holiday_df['cnt'])
+  num_categories_2 = len(workingday_df['cnt'])
+  explode_1 = [0] * num_categories_1
+  explode_2 = [0] * num_categories_2
+  if num_categories_1 > 1:
+     explode_1[0] = 0.2
+  if num_categories_2 > 1:
+     explode_2[0] = 0.2
+  fig, axes = plt.subplots(figsize=(20,6), nrows=1, ncols=2)
+  # First chart: holiday
+  axes[0].pie(
+      x=holiday_df['cnt'],
+      labels=holiday_df['holiday'],
+      colors=sns.color_palette("pastel"),
+      explode=explode_1,
+      autopct='%.2f%%'
+  )
+  axes[0].set_xlabel(None)
+  axes[0].set_ylabel(None)
+  axes[0].set_title("Hari Libur")
+  # Second chart: workingday
+  axes[1].pie(
+      x=workingday_df['cnt'],
+      labels=workingday_df['workingday'],
+      colors=sns.color_palette("pastel"),
+      explode=explode_2,
+      autopct='%.2f%%'
+  )
+  axes[1].set_xlabel(None)
+  axes[1].set_ylabel(None)
+  axes[1].set_title("Hari Kerja")
+  return fig
+if interactive:
+  show_charts(charts.totals_bar(holiday_df, 'holiday', "Hari Libur"),
+              charts.totals_bar(workingday_df, 'workingday', "Hari Kerja"))
+  show_charts(charts.totals_pie(holiday_df, 'holiday', "Hari Libur"),
+              charts.totals_pie(workingday_df, 'workingday', "Hari Kerja"))
+else:
+  show_figure('holiday_workingday_bars', draw_holiday_workingday_bars)
+  st.write("")
+  show_figure('holiday_workingday_pies', draw_holiday_workingday_pies)
+st.write("")
+st.write("")
+
+# ============= Dashboard: Penyewaan Perjam =============
+# Data perjam dari hourly.py: rentang tanggal = slice pada grid jam, grafik garis diringkas dengan LTTB
+st.subheader("Penyewaan Perjam")
+hourly_store = get_hourly_store()
+# Rentang sampai tanggal terakhir dataset juga mencakup data terbaru dari live feed
+hourly_end = None if end_date == max_date else end_date
+hourly_key = (start_date, hourly_end, file_version(HOUR_CSV), hourly_store.version)
+hourly_demand, peaks_df = hourly_store.demand(start_date, hourly_end)
+hourly_points = hourly_store.downsample(hourly_demand, 'cnt')
+rolling_points = hourly_store.downsample(hourly_demand, 'rolling')
+# Jumlah titik puncak juga dibatasi, yang terbesar ditampilkan
+peaks_df = peaks_df.nlargest(MAX_POINTS, 'cnt').sort_values('waktu')
+heatmap_df = hourly_store.heatmap(start_date, hourly_end)
+rolling_label = f"Rata-rata {ROLLING_WINDOW} jam"
+if hourly_store.feed_trips:
+  st.caption(f"Data terbaru: {hourly_store.last_hour} ({hourly_store.feed_trips:,} trip dari live feed)")
+# Line chart penyewaan perjam, rata-rata bergerak & jam-jam puncak
+def draw_hourly_demand():
+  fig, ax = plt.subplots(figsize=(20,10))
+  ax.plot(
+     hourly_points['waktu'],
+     hourly_points['cnt'],
+     color='plum',
+     linewidth=0.8,
+     label='cnt'
+  )
+  ax.plot(
+     rolling_points['waktu'],
+     rolling_points['rolling'],
+     color='purple',
+     label=rolling_label
+  )
+  ax.scatter(
+     peaks_df['waktu'],
+     peaks_df['cnt'],
+     color='red',
+     s=12,
+     zorder=3,
+     label='Puncak'
+  )
+  ax.legend(loc='upper left')
+  return fig
+# Heatmap rata-rata penyewaan menurut hari & jam
+def draw_hourly_heatmap():
+  fig, ax = plt.subplots(figsize=(20, 6))
+  sns.heatmap(
+     heatmap_df,
+     cmap='Purples',
+     ax=ax
+  )
+  ax.set_xlabel("Jam")
+  return fig
+if interactive:
+  show_charts(charts.hourly_demand(hourly_points, rolling_points, peaks_df, rolling_label))
+  show_charts(charts.hourly_heatmap(heatmap_df))
+else:
+  show_figure('hourly_demand', draw_hourly_demand, hourly_key)
+  show_figure('hourly_heatmap', draw_hourly_heatmap, hourly_key)
+# Tabel jam-jam puncak dengan penyewaan tertinggi
+st.dataframe(
+    peaks_df.nlargest(10, 'cnt')[['waktu', 'cnt', 'casual', 'registered', 'rolling']]
+      .rename(columns={'rolling': rolling_label}),
+    hide_index=True,
+    use_container_width=True
 )
-axes[0].set_xlabel(None)
-axes[0].set_ylabel(None)
-axes[0].set_title("Hari Libur")
-# Second chart: workingday
-axes[1].pie(
-    x=workingday_df['cnt'],
-    labels=workingday_df['workingday'],
-    colors=sns.color_palette("pastel"),
-    explode=explode_2,
-    autopct='%.2f%%'
+st.write("")
+st.write("")
+
+# ============= Dashboard: Prakiraan Penyewaan =============
+# Prakiraan per jam untuk satu hari dari model ridge regression (forecast.py), di-cache per input
+st.subheader("Prakiraan Penyewaan")
+forecast_date = st.date_input(
+    label="Tanggal",
+    value=max_date + datetime.timedelta(days=1),
+    min_value=min_date
 )
-axes[1].set_xlabel(None)
-axes[1].set_ylabel(None)
-axes[1].set_title("Hari Kerja")
-st.pyplot(fig)
+# Nilai awal cuaca: rata-rata bulan yang sama pada hour.csv
+typical_temp, typical_hum, typical_windspeed = typical_weather(hourly_df, forecast_date)
+col_1, col_2, col_3, col_4 = st.columns(4)
+with col_1:
+    weather = st.selectbox("Cuaca", list(weathersit_mapping.values()))
+with col_2:
+    temp_c = st.slider("Suhu (°C)", -8, 39, round(typical_temp))
+with col_3:
+    hum = st.slider("Kelembapan (%)", 0, 100, round(typical_hum))
+with col_4:
+    windspeed = st.slider("Kecepatan angin (km/jam)", 0, 67, round(typical_windspeed))
+weathersit = list(weathersit_mapping)[list(weathersit_mapping.values()).index(weather)]
+forecast_df = forecast_day(forecast_date, weathersit, temp_c, hum, windspeed)
+st.metric("Total Prakiraan", f"{forecast_df['prakiraan'].sum():,.0f}")
+# Bar chart prakiraan penyewaan per jam
+def draw_forecast():
+  fig, ax = plt.subplots(figsize=(20,6))
+  sns.barplot(
+      x='jam',
+      y='prakiraan',
+      data=forecast_df,
+      color='plum',
+      ax=ax
+  )
+  ax.set_xlabel("Jam")
+  ax.set_ylabel(None)
+  return fig
+if interactive:
+  show_charts(charts.forecast_bar(forecast_df))
+else:
+  show_figure('forecast', draw_forecast, (forecast_date, weathersit, temp_c, hum, windspeed, file_version(HOUR_CSV)))
 st.write("")
 st.write("")
 st.divider()
 st.caption("Copyright (c) Dicoding x Artha 2024")
+
+if live:
+  time.sleep(LIVE_INTERVAL)
+  st.rerun()
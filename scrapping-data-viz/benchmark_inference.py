@@ -0,0 +1,68 @@
+"""
+Benchmark of the emotion inference backends on a sample of the corpus.
+
+Every backend labels the same tweets and reports tweets/sec, the load time of
+the model and how many labels agree with the plain torch model (the cost of
+int8 quantization). Backends whose packages are missing are skipped.
+
+Usage:
+    python benchmark_inference.py --tweets 2000 --threads 4
+    python benchmark_inference.py --backends onnx onnx-int8 --max-tokens 8192
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import random
+import time
+from emotion_inference import MAX_BATCH_SIZE, MAX_TOKENS, STORE_DIR, classify, make_backend
+from tweet_preprocessing import preprocess_column
+
+BACKENDS = ["torch", "torch-int8", "onnx", "onnx-int8"]
+
+
+def sample_texts(store_dir, amount, seed=0):
+    from tweet_store import TweetStore
+    texts = [text for text in TweetStore(store_dir).scan(columns=["full_text"])["full_text"].to_pylist() if text]
+    texts = random.Random(seed).sample(texts, min(amount, len(texts)))
+    return preprocess_column(texts, lang="en", shorten=2).tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the emotion inference backends")
+    parser.add_argument("--tweets", type=int, default=2000)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS + ["stub"], default=BACKENDS)
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    args = parser.parse_args()
+
+    texts = sample_texts(args.store_dir, args.tweets)
+    print(f"{len(texts)} tweets, batches of at most {args.max_batch_size} tweets / {args.max_tokens} tokens")
+    # Labels of the first backend which ran, the others are compared with it
+    reference = None
+    reference_name = None
+    for name in args.backends:
+        try:
+            start_time = time.perf_counter()
+            backend = make_backend(name, threads=args.threads)
+            load_time = time.perf_counter() - start_time
+        except Exception as e:
+            # Ex: onnxruntime is not installed, the other backends still run
+            print(f"{name.ljust(10)}: skipped ({type(e).__name__}: {str(e).splitlines()[0]})")
+            continue
+        # Warm up (first call allocates the buffers)
+        classify(texts[:args.max_batch_size], backend, args.max_batch_size, args.max_tokens)
+        start_time = time.perf_counter()
+        labels, _ = classify(texts, backend, args.max_batch_size, args.max_tokens)
+        elapsed_time = time.perf_counter() - start_time
+        if reference is None:
+            reference, reference_name = labels, name
+        agreement = sum(a == b for a, b in zip(labels, reference)) / len(labels)
+        print(f"{name.ljust(10)}: {len(texts) / elapsed_time:8.1f} tweets/s, loaded in {load_time:5.1f}s, "
+              f"{agreement:.1%} labels agree with {reference_name}")
+
+
+if __name__ == "__main__":
+    main()
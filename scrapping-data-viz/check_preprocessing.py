@@ -0,0 +1,116 @@
+"""
+Golden check & benchmark of tweet_preprocessing against pysentimiento's preprocess_tweet.
+
+preprocessing_golden.jsonl holds tweets (mentions, urls, hashtags, emoji,
+elongations, laughter, special characters) with the output of
+pysentimiento's preprocess_tweet(text, lang="en", shorten=2), the settings of
+data_lab.ipynb. The check runs without pysentimiento installed.
+
+Usage:
+    python check_preprocessing.py                      (compare with the golden set)
+    python check_preprocessing.py --regenerate         (rebuild it, needs pysentimiento)
+    python check_preprocessing.py --benchmark 100000 --workers 4
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import pandas as pd
+from tweet_preprocessing import preprocess_column, preprocess_series
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_FILE = os.path.join(SCRIPT_DIR, "preprocessing_golden.jsonl")
+GOLDEN_ARGS = {"lang": "en", "shorten": 2}
+# Tweets taken per feature when the golden set is rebuilt
+SAMPLES_PER_FEATURE = 60
+EDGE_CASES = [
+    "#JokowiMundur 😂😂😂 haha hahahaha @user_1 https://t.co/abc www.google.com",
+    "a | b | c",
+    "👨‍👩‍👧‍👦 and 👩‍🦰🏽 ♥ ☻ ✈️ 1️⃣ 🇮🇩 #️⃣ 2⃣",
+    "loooool yesss!!! wkwkwkwk",
+    "“quoted” — dash… ‘single’ ™ € ‼",
+    "kkkk jajaja ahahah",
+    "😀‍🤖 ❤️‍🔥 ☺️",
+    "#",
+    "##Tag #123 #a_B #PrabowoGibran2024",
+    "@ @a_very_long_username_over_15 email@domain.com",
+    "   padded text \n with lines   ",
+    "",
+]
+FEATURES = {
+    "hashtag": lambda text: "#" in text,
+    "mention": lambda text: "@" in text,
+    "url": lambda text: "http" in text,
+    "emoji": lambda text: any(ord(char) > 0x2000 for char in text),
+    "elongated": lambda text: any(a == b == c for a, b, c in zip(text, text[1:], text[2:])),
+    "laughter": lambda text: "haha" in text.lower() or "wkwk" in text.lower(),
+    "plain": lambda text: text.isascii() and "@" not in text and "#" not in text,
+}
+
+
+def corpus_texts():
+    from tweet_store import TweetStore
+    return [text for text in TweetStore().scan(columns=["full_text"])["full_text"].to_pylist() if text]
+
+
+def regenerate(path):
+    from pysentimiento.preprocessing import preprocess_tweet
+    rng = random.Random(0)
+    texts = corpus_texts()
+    rng.shuffle(texts)
+    golden_texts = list(EDGE_CASES)
+    for feature in FEATURES.values():
+        golden_texts.extend([text for text in texts if feature(text)][:SAMPLES_PER_FEATURE])
+    with open(path, "w", encoding="utf-8") as f:
+        for text in dict.fromkeys(golden_texts):
+            expected = preprocess_tweet(text, **GOLDEN_ARGS)
+            f.write(json.dumps({"text": text, "expected": expected}, ensure_ascii=False) + "\n")
+    print(f"Golden set rebuilt: {path}")
+
+
+def check(path):
+    with open(path, encoding="utf-8") as f:
+        golden = [json.loads(line) for line in f]
+    outputs = preprocess_series(pd.Series([row["text"] for row in golden]), **GOLDEN_ARGS)
+    mismatches = [(row, output) for row, output in zip(golden, outputs) if output != row["expected"]]
+    for row, output in mismatches[:10]:
+        print(f"MISMATCH {row['text']!r}\n  expected {row['expected']!r}\n  got      {output!r}")
+    print(f"{len(golden) - len(mismatches)}/{len(golden)} golden tweets match")
+    return not mismatches
+
+
+def benchmark(amount, workers):
+    texts = corpus_texts()
+    # Repeat the corpus up to the wanted size
+    series = pd.Series((texts * (amount // len(texts) + 1))[:amount])
+    start_time = time.perf_counter()
+    preprocess_column(series, workers=workers, **GOLDEN_ARGS)
+    elapsed_time = time.perf_counter() - start_time
+    print(f"{amount} tweets preprocessed in {elapsed_time:.2f}s ({amount / elapsed_time:.0f} tweets/s, "
+          f"{workers or 1} worker(s))")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check tweet_preprocessing against pysentimiento")
+    parser.add_argument("--golden", default=GOLDEN_FILE)
+    parser.add_argument("--regenerate", action="store_true")
+    parser.add_argument("--benchmark", type=int, metavar="TWEETS")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.regenerate:
+        regenerate(args.golden)
+    ok = check(args.golden)
+    if args.benchmark:
+        benchmark(args.benchmark, args.workers)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
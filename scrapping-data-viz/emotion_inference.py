@@ -0,0 +1,406 @@
+"""
+Batched emotion classification of the tweet corpus on CPU.
+
+The texts are tokenized once, sorted by token length and cut into dynamic
+batches (at most `max_batch_size` texts and `max_tokens` padded tokens), so a
+batch of short tweets is not padded to the longest tweet of the corpus. The
+model runs through one of the backends:
+    torch       transformers model, torch threads set to the CPU count
+    torch-int8  same, Linear layers dynamically quantized to int8
+    onnx        graph exported once to tweets-store/onnx/, run by onnxruntime
+    onnx-int8   the exported graph with int8 weights
+    stub        no model, deterministic labels (tests & dry runs)
+
+Labels are streamed to tweets-store/labels/model=<model>/ (Parquet parts of
+id_str, label, score, text_source) as the batches finish; a rerun skips the
+tweets which already have a label. When near_duplicates.py clustered the
+corpus, one tweet per cluster is classified and its label is written for the
+whole cluster.
+
+The model is English: only the tweets translated by translation.py are labeled,
+unless --allow-untranslated also classifies the original text of the others.
+text_source ("translated" or "original") records which text was used, and
+--relabel-untranslated drops the "original" labels so that the next run
+classifies their translation.
+
+Usage:
+    python emotion_inference.py --backend onnx-int8 --threads 8
+    python benchmark_inference.py --tweets 2000
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import glob
+import os
+import time
+import uuid
+import zlib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from tqdm import tqdm
+
+# torch, transformers & onnxruntime are optional, only the selected backend needs them
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+# The onnx backends only need the tokenizer & the config once the graph is exported
+try:
+    from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(SCRIPT_DIR, "tweets-store")
+MODEL_NAME = "finiteautomata/bertweet-base-emotion-analysis"
+# BERTweet was trained on 128 tokens
+MAX_LENGTH = 128
+MAX_BATCH_SIZE = 64
+MAX_TOKENS = 4096
+# Labels written to a Parquet part every FLUSH_ROWS tweets
+FLUSH_ROWS = 2048
+
+LABEL_SCHEMA = pa.schema([
+    ("id_str", pa.string()),
+    ("label", pa.dictionary(pa.int32(), pa.string())),
+    ("score", pa.float32()),
+    # "translated" or "original", null in the parts written before it was recorded
+    ("text_source", pa.dictionary(pa.int32(), pa.string())),
+])
+TRANSLATED = "translated"
+ORIGINAL = "original"
+
+
+def default_threads():
+    return os.cpu_count() or 1
+
+
+def softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def length_batches(lengths, max_batch_size=MAX_BATCH_SIZE, max_tokens=MAX_TOKENS):
+    """
+    Indexes of the texts grouped in batches of similar length. A batch grows
+    until it holds max_batch_size texts or its padded size would pass max_tokens.
+    """
+    batches = []
+    batch = []
+    longest = 0
+    for index in np.argsort(lengths, kind="stable"):
+        length = int(lengths[index])
+        padded_size = max(longest, length) * (len(batch) + 1)
+        if batch and (len(batch) == max_batch_size or padded_size > max_tokens):
+            batches.append(batch)
+            batch = []
+            longest = 0
+        batch.append(int(index))
+        longest = max(longest, length)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class TorchBackend:
+    """transformers model on CPU, optionally with int8 dynamic quantization of the Linear layers."""
+    def __init__(self, model_name=MODEL_NAME, threads=None, quantize=False):
+        if not (TORCH_AVAILABLE and TRANSFORMERS_AVAILABLE):
+            raise RuntimeError("torch & transformers are not installed (pip install torch transformers)")
+        torch.set_num_threads(threads or default_threads())
+        self.name = "torch-int8" if quantize else "torch"
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        if quantize:
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.labels = [self.model.config.id2label[i] for i in range(self.model.config.num_labels)]
+
+    def encode(self, texts):
+        return self.tokenizer(list(texts), truncation=True, max_length=MAX_LENGTH)["input_ids"]
+
+    def pad(self, input_ids):
+        return self.tokenizer.pad({"input_ids": input_ids}, return_tensors="np")
+
+    def logits(self, input_ids):
+        batch = self.pad(input_ids)
+        with torch.inference_mode():
+            outputs = self.model(input_ids=torch.from_numpy(batch["input_ids"]),
+                                 attention_mask=torch.from_numpy(batch["attention_mask"]))
+        return outputs.logits.numpy()
+
+
+class OnnxBackend(TorchBackend):
+    """
+    The model exported to ONNX (once, cached in onnx_dir) & run by onnxruntime,
+    with int8 weights when quantize is set.
+    """
+    def __init__(self, model_name=MODEL_NAME, threads=None, quantize=False, onnx_dir=None):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed (pip install onnxruntime)")
+        if not TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("transformers is not installed (pip install transformers)")
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.model_name = model_name
+        # Only the tokenizer & the labels, the torch model is loaded when the graph has to be exported
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        config = AutoConfig.from_pretrained(model_name)
+        self.labels = [config.id2label[i] for i in range(config.num_labels)]
+        onnx_dir = onnx_dir or os.path.join(STORE_DIR, "onnx", model_name.replace("/", "--"))
+        os.makedirs(onnx_dir, exist_ok=True)
+        model_path = os.path.join(onnx_dir, "model.onnx")
+        if not os.path.exists(model_path):
+            self.export(model_path)
+        if quantize:
+            quantized_path = os.path.join(onnx_dir, "model.int8.onnx")
+            if not os.path.exists(quantized_path):
+                quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+            model_path = quantized_path
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or default_threads()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+    def export(self, path):
+        if not TORCH_AVAILABLE:
+            raise RuntimeError(f"torch is needed once to export {self.model_name} to {path} (pip install torch)")
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name).eval()
+        sample = self.tokenizer(["export sample"], return_tensors="pt")
+        torch.onnx.export(
+            model, (sample["input_ids"], sample["attention_mask"]), path,
+            input_names=["input_ids", "attention_mask"], output_names=["logits"],
+            dynamic_axes={"input_ids": {0: "batch", 1: "tokens"}, "attention_mask": {0: "batch", 1: "tokens"},
+                          "logits": {0: "batch"}},
+            opset_version=17
+        )
+
+    def logits(self, input_ids):
+        batch = self.pad(input_ids)
+        return self.session.run(["logits"], {"input_ids": batch["input_ids"].astype(np.int64),
+                                             "attention_mask": batch["attention_mask"].astype(np.int64)})[0]
+
+
+class StubBackend:
+    """Whitespace tokens & labels derived from a hash of the tokens (no model needed)."""
+    name = "stub"
+    labels = ["others", "joy", "sadness", "anger", "surprise", "disgust", "fear"]
+
+    def encode(self, texts):
+        return [[zlib.crc32(token.encode("utf-8")) % 1000 for token in text.split()][:MAX_LENGTH] or [0]
+                for text in texts]
+
+    def logits(self, input_ids):
+        logits = np.zeros((len(input_ids), len(self.labels)), dtype=np.float32)
+        for i, ids in enumerate(input_ids):
+            logits[i, sum(ids) % len(self.labels)] = 1.0
+        return logits
+
+
+def make_backend(name, model_name=MODEL_NAME, threads=None):
+    if name == "stub":
+        return StubBackend()
+    if name.startswith("onnx"):
+        return OnnxBackend(model_name, threads, quantize=name.endswith("int8"))
+    return TorchBackend(model_name, threads, quantize=name.endswith("int8"))
+
+
+class LabelStore:
+    """Labels of one model: <store_dir>/labels/model=<model>/part-<uuid>.parquet."""
+    def __init__(self, store_dir=STORE_DIR, model_name=MODEL_NAME):
+        self.labels_dir = os.path.join(store_dir, "labels", f"model={model_name.replace('/', '--')}")
+        os.makedirs(self.labels_dir, exist_ok=True)
+
+    def parts(self):
+        return sorted(glob.glob(os.path.join(self.labels_dir, "*.parquet")))
+
+    def dataset(self):
+        return ds.dataset(self.parts(), schema=LABEL_SCHEMA, format="parquet")
+
+    def labeled_ids(self):
+        return set(self.dataset().to_table(columns=["id_str"])["id_str"].to_pylist())
+
+    def write(self, ids, labels, scores, text_sources):
+        table = pa.table({
+            "id_str": pa.array(ids, pa.string()),
+            "label": pa.array(labels, pa.string()).dictionary_encode(),
+            "score": pa.array(scores, pa.float32()),
+            "text_source": pa.array(text_sources, pa.string()).dictionary_encode(),
+        }, schema=LABEL_SCHEMA)
+        pq.write_table(table, os.path.join(self.labels_dir, f"part-{uuid.uuid4().hex}.parquet"))
+
+    def drop_untranslated(self):
+        """Remove the labels not classified from a translation (text_source "original" or unknown)."""
+        dropped = 0
+        for path in self.parts():
+            table = ds.dataset(path, schema=LABEL_SCHEMA, format="parquet").to_table()
+            keep = pc.fill_null(pc.equal(table["text_source"].cast(pa.string()), TRANSLATED), False)
+            kept = table.filter(keep)
+            if kept.num_rows == table.num_rows:
+                continue
+            dropped += table.num_rows - kept.num_rows
+            # The new part is complete before the old one goes away
+            if kept.num_rows:
+                pq.write_table(kept, path + ".tmp")
+                os.replace(path + ".tmp", path)
+            else:
+                os.remove(path)
+        return dropped
+
+
+def classify(texts, backend, max_batch_size=MAX_BATCH_SIZE, max_tokens=MAX_TOKENS, on_batch=None):
+    """
+    Label & score of every text (same order). `on_batch(indexes, labels, scores)`
+    is called after every batch (ex: to stream the results to disk).
+    """
+    input_ids = backend.encode(texts)
+    lengths = np.array([len(ids) for ids in input_ids])
+    labels = [None] * len(texts)
+    scores = np.zeros(len(texts), dtype=np.float32)
+    progress = tqdm(total=len(texts), desc=f"Labeling ({backend.name})", unit="tweet")
+    try:
+        for batch in length_batches(lengths, max_batch_size, max_tokens):
+            probabilities = softmax(backend.logits([input_ids[i] for i in batch]))
+            best = probabilities.argmax(axis=1)
+            batch_labels = [backend.labels[label] for label in best]
+            batch_scores = probabilities[np.arange(len(batch)), best]
+            for i, label, score in zip(batch, batch_labels, batch_scores):
+                labels[i] = label
+                scores[i] = score
+            if on_batch is not None:
+                on_batch(batch, batch_labels, batch_scores)
+            progress.update(len(batch))
+    finally:
+        progress.close()
+    return labels, scores
+
+
+def label_corpus(backend, store_dir=STORE_DIR, model_name=MODEL_NAME, limit=None,
+                 max_batch_size=MAX_BATCH_SIZE, max_tokens=MAX_TOKENS, allow_untranslated=False):
+    """
+    Label the tweets of the store which have no label yet. Returns the number labeled.
+    Tweets without a translation are skipped unless allow_untranslated is set.
+    """
+    from tweet_store import TweetStore
+    from tweet_preprocessing import preprocess_column
+    from near_duplicates import load_clusters
+
+    table = TweetStore(store_dir).scan(columns=["id_str", "full_text"])
+    # The English translation is classified when translation.py produced it
+    df = table.to_pandas()
+    translated_path = os.path.join(store_dir, "translated.parquet")
+    if os.path.exists(translated_path):
+        translated = pq.read_table(translated_path).to_pandas().set_index("id_str")["translated_text"]
+        df["text"] = df["id_str"].map(translated)
+    else:
+        df["text"] = None
+    df["text_source"] = np.where(df["text"].notna(), TRANSLATED, ORIGINAL)
+    if allow_untranslated:
+        df["text"] = df["text"].fillna(df["full_text"])
+
+    store = LabelStore(store_dir, model_name)
+    labeled_ids = store.labeled_ids()
+    df = df[~df["id_str"].isin(labeled_ids) & df["text"].notna()]
+    if limit:
+        df = df.head(limit)
+    if df.empty:
+        return 0
+    # One tweet per near-duplicate cluster is classified, its label goes to the whole cluster
+    clusters = load_clusters(store_dir)
+    if clusters is not None:
+        df["representative"] = df["id_str"].map(clusters).fillna(df["id_str"])
+    else:
+        df["representative"] = df["id_str"]
+    members = df.groupby("representative", sort=False)["id_str"].agg(list)
+
+    pending = {"ids": [], "labels": [], "scores": [], "text_sources": []}
+    def flush():
+        if pending["ids"]:
+            store.write(pending["ids"], pending["labels"], pending["scores"], pending["text_sources"])
+            for values in pending.values():
+                values.clear()
+
+    def add(cluster_ids, label, score, text_source):
+        pending["ids"].extend(cluster_ids)
+        pending["labels"].extend([label] * len(cluster_ids))
+        pending["scores"].extend([float(score)] * len(cluster_ids))
+        pending["text_sources"].extend([text_source] * len(cluster_ids))
+        if len(pending["ids"]) >= FLUSH_ROWS:
+            flush()
+
+    # Clusters whose representative was labeled by an earlier run are copied without inference
+    labeled = store.dataset().to_table(columns=["id_str", "label", "score", "text_source"]).to_pandas()
+    labeled = labeled.set_index("id_str")
+    known = members.index.intersection(labeled.index)
+    for representative in known:
+        text_source = labeled.at[representative, "text_source"]
+        add(members[representative], labeled.at[representative, "label"], labeled.at[representative, "score"],
+            text_source if isinstance(text_source, str) else None)
+    members = members.drop(known)
+
+    # The text of the representative itself when it is in df (else of the first member)
+    by_id = df.set_index("id_str")[["text", "text_source"]]
+    source_ids = [representative if representative in by_id.index else ids[0]
+                  for representative, ids in members.items()]
+    sources = by_id.loc[source_ids]
+    texts = preprocess_column(pd.Series(sources["text"].tolist(), dtype=object), lang="en", shorten=2).tolist()
+    text_sources = sources["text_source"].tolist()
+    cluster_ids = members.tolist()
+
+    def on_batch(batch, labels, scores):
+        for i, label, score in zip(batch, labels, scores):
+            add(cluster_ids[i], label, score, text_sources[i])
+
+    try:
+        if texts:
+            classify(texts, backend, max_batch_size, max_tokens, on_batch=on_batch)
+    finally:
+        # Interrupted runs keep the labels of the finished batches
+        flush()
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Label the emotion of the tweets in the tweet store")
+    parser.add_argument("--backend", choices=["torch", "torch-int8", "onnx", "onnx-int8", "stub"], default="onnx-int8")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--threads", type=int, help="CPU threads used by the model (default: all)")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--limit", type=int, help="label at most N tweets")
+    parser.add_argument("--allow-untranslated", action="store_true",
+                        help="classify the original text of the tweets translation.py has not translated")
+    parser.add_argument("--relabel-untranslated", action="store_true",
+                        help="drop the labels not classified from a translation before labeling")
+    args = parser.parse_args()
+
+    # The stub labels are kept apart from the ones of the real model
+    model_name = "stub" if args.backend == "stub" else args.model
+    if args.relabel_untranslated:
+        dropped = LabelStore(args.store_dir, model_name).drop_untranslated()
+        print(f"{dropped} labels of untranslated tweets dropped")
+    backend = make_backend(args.backend, args.model, args.threads)
+    start_time = time.perf_counter()
+    labeled = label_corpus(backend, args.store_dir, model_name, args.limit, args.max_batch_size, args.max_tokens,
+                           args.allow_untranslated)
+    elapsed_time = time.perf_counter() - start_time
+    print(f"{labeled} tweets labeled in {elapsed_time:.1f}s ({labeled / elapsed_time if elapsed_time else 0:.1f} tweets/s)")
+
+
+if __name__ == "__main__":
+    main()
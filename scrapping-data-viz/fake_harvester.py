@@ -0,0 +1,75 @@
+"""
+Offline stand-in for tweet-harvest with the same command line options.
+
+Writes synthetic tweets (same columns as tweet-harvest) for the requested date
+range to tweets-data/<output filename> and prints tweet-harvest-like progress,
+so the harvesting driver can be tested without a token or network:
+    python scrapping.py dummy-token anger --harvester "python fake_harvester.py"
+
+FAKE_TWEETS_PER_DAY (default 300) sets how many tweets a day "has" and
+FAKE_DELAY (seconds, default 0.2) how long a run takes.
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import csv
+import os
+import random
+import time
+import zlib
+from datetime import datetime, timedelta
+
+COLUMNS = ["conversation_id_str", "created_at", "favorite_count", "full_text", "id_str", "image_url",
+           "in_reply_to_screen_name", "lang", "location", "quote_count", "reply_count", "retweet_count",
+           "tweet_url", "user_id_str", "username"]
+LOCATIONS = ["Jakarta", "Indonesia", "Bandung", "Surabaya", ""]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--token")
+    parser.add_argument("-s", "--search-keyword", default="")
+    parser.add_argument("-l", "--limit", type=int, default=100)
+    parser.add_argument("--tab", default="LATEST")
+    parser.add_argument("-f", "--from", dest="date_from")
+    parser.add_argument("-to", "--to", dest="date_to")
+    parser.add_argument("-o", "--output-filename", default="fake.csv")
+    args = parser.parse_args()
+
+    tweets_per_day = int(os.environ.get("FAKE_TWEETS_PER_DAY", 300))
+    delay = float(os.environ.get("FAKE_DELAY", 0.2))
+    start = datetime.strptime(args.date_from, "%d-%m-%Y")
+    end = datetime.strptime(args.date_to, "%d-%m-%Y")
+    days = (end - start).days + 1
+    amount = min(args.limit, days * tweets_per_day)
+    # The same query & day always produce the same tweet ids (like the real search)
+    seed = zlib.crc32(args.search_keyword.encode("utf-8"))
+    rng = random.Random(seed)
+
+    os.makedirs("tweets-data", exist_ok=True)
+    output_path = os.path.abspath(os.path.join("tweets-data", args.output_filename))
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(COLUMNS)
+        for i in range(amount):
+            # Latest first, like the LATEST tab
+            day = end - timedelta(days=i // tweets_per_day)
+            created_at = day.replace(hour=23, minute=59) - timedelta(seconds=(i % tweets_per_day) * 60)
+            tweet_id = seed * 10**9 + int(created_at.timestamp())
+            user_id = rng.randrange(10**17, 10**18)
+            writer.writerow([
+                tweet_id, created_at.strftime("%a %b %d %H:%M:%S +0000 %Y"), rng.randrange(50),
+                f"Tweet {tweet_id} tentang {args.search_keyword[:40]}\nbaris kedua", tweet_id, "", "", "in",
+                rng.choice(LOCATIONS), rng.randrange(5), rng.randrange(10), rng.randrange(20),
+                f"https://twitter.com/user{user_id}/status/{tweet_id}", user_id, f"user{user_id}",
+            ])
+            if (i + 1) % 1000 == 0:
+                print(f"Total tweets saved: {i + 1}", flush=True)
+    time.sleep(delay)
+    print(f"Your tweets saved to: {output_path}", flush=True)
+    print(f"Total tweets saved: {amount}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
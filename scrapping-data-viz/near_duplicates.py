@@ -0,0 +1,214 @@
+"""
+Near-duplicate clusters of the tweet corpus (MinHash + LSH).
+
+Tweets are normalized (lower case, retweet prefix, mentions, urls &
+punctuation removed, emoji kept as tokens), cut into character 5-grams and
+summarized by a MinHash signature. The signatures are split in LSH bands:
+tweets sharing a band are candidates, and candidates whose signatures agree on
+at least `threshold` of the hashes (estimated Jaccard similarity) end in the
+same cluster (union-find). Emoji carry most of the emotion of a tweet, so only
+tweets with the same set of emoji can share a bucket, and tweets which are
+empty after normalization (only mentions / urls) are never clustered.
+Everything runs on numpy arrays, the cost grows linearly with the corpus.
+
+The expensive stages (translation.py, emotion_inference.py) only process one
+representative per cluster (its first tweet) and copy the result to the rest
+of the cluster.
+
+Usage:
+    python near_duplicates.py [--threshold 0.7]       (writes tweets-store/clusters.parquet)
+    clusters = load_clusters()                        (id_str -> id_str of the representative)
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(SCRIPT_DIR, "tweets-store")
+CLUSTERS_FILE = "clusters.parquet"
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+# 32 bands of 4 rows: pairs above ~0.45 similarity are likely to become candidates,
+# the signature check then keeps the ones above the threshold
+BANDS = 32
+THRESHOLD = 0.7
+
+RETWEET_PREFIX = r"^rt @\w+:\s*"
+MENTION = r"@\w+"
+URL = r"https?://\S+|www\.\S+"
+# Emoji, dingbats, arrows & misc symbols (without the joiner / variation selectors)
+EMOJI_RANGES = "\U0001F000-\U0001FAFF\u2190-\u21FF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\u3030\u303D\u3297\u3299"
+EMOJI = f"[{EMOJI_RANGES}]"
+NON_WORD = f"[^\\w{EMOJI_RANGES}]+"
+
+
+def normalize_texts(texts):
+    """Lower case text without retweet prefix, mentions, urls & punctuation, emoji as separate tokens (pandas string ops)."""
+    texts = pd.Series(texts, dtype=object).fillna("").str.lower()
+    texts = texts.str.replace(RETWEET_PREFIX, "", regex=True)
+    texts = texts.str.replace(URL, " ", regex=True)
+    texts = texts.str.replace(MENTION, " ", regex=True)
+    texts = texts.str.replace(EMOJI, r" \g<0> ", regex=True)
+    texts = texts.str.replace(NON_WORD, " ", regex=True)
+    return texts.str.strip()
+
+
+def shingle_hashes(texts, shingle_size=SHINGLE_SIZE):
+    """
+    32-bit hash of every character shingle of every text, and the offset of the
+    first shingle of each text (texts shorter than a shingle count as one shingle).
+    """
+    # Short texts are padded so that every text has at least one shingle
+    texts = [text.ljust(shingle_size) for text in texts]
+    lengths = np.array([len(text) for text in texts], dtype=np.int64)
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    text_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    shingle_counts = lengths - shingle_size + 1
+    # Start of every shingle in the concatenated codes (shingles never cross two texts)
+    starts = np.repeat(text_starts, shingle_counts) + (
+        np.arange(shingle_counts.sum()) - np.repeat(np.cumsum(shingle_counts) - shingle_counts, shingle_counts)
+    )
+    hashes = np.zeros(len(starts), dtype=np.uint64)
+    # Polynomial rolling hash (wraps around 2**64), folded to 32 bits
+    for offset in range(shingle_size):
+        hashes = hashes * np.uint64(1000003) + codes[starts + offset]
+    hashes = (hashes ^ (hashes >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+    offsets = np.concatenate([[0], np.cumsum(shingle_counts)[:-1]])
+    return hashes, offsets
+
+
+def minhash_signatures(hashes, offsets, num_perm=NUM_PERM, seed=0):
+    """(texts, num_perm) uint32 MinHash signatures, hash i(x) = (a_i * x + b_i) >> 32 (multiply-shift)."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+    signatures = np.empty((len(offsets), num_perm), dtype=np.uint32)
+    for i in range(num_perm):
+        permuted = ((hashes * a[i] + b[i]) >> np.uint64(32)).astype(np.uint32)
+        signatures[:, i] = np.minimum.reduceat(permuted, offsets)
+    return signatures
+
+
+class UnionFind:
+    def __init__(self, size):
+        self.parent = np.arange(size)
+
+    def find(self, x):
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x, y):
+        root_x, root_y = self.find(x), self.find(y)
+        if root_x != root_y:
+            # The smallest index stays the root, it becomes the representative
+            self.parent[max(root_x, root_y)] = min(root_x, root_y)
+
+    def roots(self):
+        return np.array([self.find(x) for x in range(len(self.parent))])
+
+
+def lsh_clusters(signatures, bands=BANDS, threshold=THRESHOLD, groups=None):
+    """
+    Root (index of the first member) of the cluster of every signature. With `groups`
+    (an integer per signature), signatures of different groups never share a bucket.
+    """
+    size, num_perm = signatures.shape
+    rows = num_perm // bands
+    groups = np.zeros(size, dtype=np.uint32) if groups is None else np.asarray(groups, dtype=np.uint32)
+    union_find = UnionFind(size)
+    for band in range(bands):
+        # The group is part of the bucket key
+        band_keys = np.column_stack([signatures[:, band * rows:(band + 1) * rows], groups])
+        band_keys = band_keys.view(np.dtype((np.void, band_keys.dtype.itemsize * (rows + 1)))).ravel()
+        _, first, inverse = np.unique(band_keys, return_index=True, return_inverse=True)
+        # Every text is compared with the first text of its bucket
+        candidates = np.nonzero(first[inverse] != np.arange(size))[0]
+        if not len(candidates):
+            continue
+        others = first[inverse[candidates]]
+        similarity = (signatures[candidates] == signatures[others]).mean(axis=1)
+        for x, y in zip(candidates[similarity >= threshold], others[similarity >= threshold]):
+            union_find.union(x, y)
+    return union_find.roots()
+
+
+def cluster_texts(texts, threshold=THRESHOLD, num_perm=NUM_PERM, bands=BANDS, shingle_size=SHINGLE_SIZE, seed=0):
+    """Index of the representative (first near-duplicate in the list) of every text."""
+    normalized = normalize_texts(texts)
+    # Texts equal after normalization are clustered before any hashing
+    unique_texts, first, inverse = np.unique(normalized.to_numpy(dtype=str), return_index=True, return_inverse=True)
+    hashes, offsets = shingle_hashes(unique_texts, shingle_size)
+    signatures = minhash_signatures(hashes, offsets, num_perm, seed)
+    # Group = set of emoji of the text, the empty text gets a group of its own
+    emoji_sets = pd.Series(unique_texts).str.findall(EMOJI).map(lambda found: "".join(sorted(set(found))))
+    groups, _ = pd.factorize(emoji_sets.where(unique_texts != "", "\0empty"))
+    unique_roots = lsh_clusters(signatures, bands, threshold, groups)
+    # Representative of a cluster = its earliest text in the original order
+    cluster_first = pd.Series(first).groupby(unique_roots).transform("min").to_numpy()
+    clusters = cluster_first[inverse]
+    # Texts empty after normalization (only mentions / urls) have nothing to compare, each stays alone
+    empty = normalized.to_numpy(dtype=str) == ""
+    clusters[empty] = np.nonzero(empty)[0]
+    return clusters
+
+
+def representatives(clusters):
+    """Mask of the texts which are the representative of their cluster."""
+    clusters = np.asarray(clusters)
+    return clusters == np.arange(len(clusters))
+
+
+def propagate(clusters, values):
+    """The value of its representative for every text (values indexed like the texts)."""
+    return np.asarray(values, dtype=object)[np.asarray(clusters)]
+
+
+def load_clusters(store_dir=STORE_DIR):
+    """id_str -> id_str of the representative of its cluster, or None when not computed yet."""
+    path = os.path.join(store_dir, CLUSTERS_FILE)
+    if not os.path.exists(path):
+        return None
+    return pq.read_table(path).to_pandas().set_index("id_str")["representative"]
+
+
+def main():
+    from tweet_store import TweetStore
+
+    parser = argparse.ArgumentParser(description="Cluster the near-duplicate tweets of the tweet store")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="estimated Jaccard similarity")
+    parser.add_argument("--num-perm", type=int, default=NUM_PERM)
+    parser.add_argument("--bands", type=int, default=BANDS)
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    args = parser.parse_args()
+
+    table = TweetStore(args.store_dir).scan(columns=["id_str", "full_text"])
+    texts = table["full_text"].to_pylist()
+    start_time = time.perf_counter()
+    clusters = cluster_texts(texts, args.threshold, args.num_perm, args.bands)
+    elapsed_time = time.perf_counter() - start_time
+    ids = table["id_str"].to_numpy(zero_copy_only=False)
+    pq.write_table(pa.table({"id_str": ids, "representative": ids[clusters]}),
+                   os.path.join(args.store_dir, CLUSTERS_FILE))
+
+    exact = len(set(texts))
+    kept = int(representatives(clusters).sum())
+    print(f"{len(texts)} tweets clustered in {elapsed_time:.1f}s")
+    print(f"Exact full_text duplicates removed: {len(texts) - exact} ({1 - exact / len(texts):.1%})")
+    print(f"Near-duplicates removed: {len(texts) - kept} ({1 - kept / len(texts):.1%}), "
+          f"{kept} tweets left for translation & labeling")
+
+
+if __name__ == "__main__":
+    main()
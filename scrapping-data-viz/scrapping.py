@@ -1,7 +1,40 @@
-import subprocess
+"""
+Tweet harvesting driver: runs tweet-harvest over the (emotion x date window) grid.
+
+The windows run concurrently through a bounded pool of subprocesses, the output
+of every child is streamed line by line (prefixed with its window) instead of
+being buffered. A window which hits the tweet limit is split in two halves and
+harvested again, down to single days. Every finished window is recorded in
+`tweets-data/manifest.jsonl`, so a rerun skips it.
+
+Usage:
+    python scrapping.py <token> <emotion|all> [--workers 3] [--limit 50000]
+    python scrapping.py dummy-token anger --harvester "python fake_harvester.py"   (offline test)
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import shlex
+import shutil
 import sys
+import time
+from datetime import datetime, timedelta
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, "tweets-data")
+MANIFEST_FILE = os.path.join(DATA_DIR, "manifest.jsonl")
+# Pinned so npx does not resolve @latest on every run (bump deliberately)
+TWEET_HARVEST = "tweet-harvest@2.6.1"
+DATE_FORMAT = "%d-%m-%Y"
+DEFAULT_LIMIT = 50000
+DEFAULT_WORKERS = 3
 
-# No need to include sadness (as it's already collected)
 search_queries = {
     "generic": "prabowo",
     "anger": "(prabowo OR gibran OR wowo) (paok OR babi OR biadab OR benci OR sialan OR tai OR geram OR dengki OR tolol OR bajingan)",
@@ -13,46 +46,182 @@ search_queries = {
 }
 
 date_range = {
-    "november":["28-11-2023", "30-11-2023"],
-    "december":["01-12-2023", "30-12-2023"],
-    "january":["01-01-2024", "31-01-2024"],
-    "february":["01-02-2024", "29-02-2024"],
-    "march":["01-03-2024", "17-03-2024"]
+    "november": ["28-11-2023", "30-11-2023"],
+    "december": ["01-12-2023", "30-12-2023"],
+    "january": ["01-01-2024", "31-01-2024"],
+    "february": ["01-02-2024", "29-02-2024"],
+    "march": ["01-03-2024", "17-03-2024"]
 }
 
-# date_range = {
-#     "november":["28-11-2023", "29-11-2023"]
-# }
-
-# Constructing the run command from terminal arguments
-token = sys.argv[1]
-emotion = sys.argv[2]
-command = {
-    "package" : "npx",
-    "scrapper" : "tweet-harvest@latest",
-    "token_option" : "-t",
-    "token_value" : token,
-    "search_option" : "-s",
-    "search_value" : search_queries[emotion],
-    "limit_option" : "-l",
-    "limit_value" : "50000",
-    "tab_option": "--tab",
-    "tab_value" : "LATEST",
-    "date_start_option" : "-f",
-    "date_start_value" : None,
-    "date_end_option" : "-to",
-    "date_end_value" : None
-}
+# Ex: "Your tweets saved to: /.../tweets-data/x.csv"
+SAVED_TO_PATTERN = re.compile(r"saved to:?\s*(\S+\.csv)", re.IGNORECASE)
+
+
+class Manifest:
+    """Append-only record of the harvested windows (one JSON object per line)."""
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[self.key(entry["emotion"], entry["start"], entry["end"])] = entry
+
+    @staticmethod
+    def key(emotion, start, end):
+        return f"{emotion}|{start}|{end}"
+
+    def get(self, emotion, start, end):
+        return self.entries.get(self.key(emotion, start, end))
+
+    def record(self, **entry):
+        entry["finished_at"] = datetime.now().isoformat(timespec="seconds")
+        self.entries[self.key(entry["emotion"], entry["start"], entry["end"])] = entry
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def split_window(start, end):
+    """Two halves of a date window (dates as dd-mm-yyyy, both ends included)."""
+    start_date = datetime.strptime(start, DATE_FORMAT)
+    end_date = datetime.strptime(end, DATE_FORMAT)
+    middle = start_date + (end_date - start_date) / 2
+    middle = datetime(middle.year, middle.month, middle.day)
+    return (start, middle.strftime(DATE_FORMAT)), ((middle + timedelta(days=1)).strftime(DATE_FORMAT), end)
+
+
+def window_days(start, end):
+    return (datetime.strptime(end, DATE_FORMAT) - datetime.strptime(start, DATE_FORMAT)).days + 1
+
+
+def count_tweets(path):
+    # csv handles the line breaks inside the tweet texts
+    with open(path, encoding="utf-8", newline="") as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+
+def harvester_command(args):
+    """The harvester as an argument list, without going through a shell."""
+    if args.harvester:
+        return shlex.split(args.harvester)
+    # npx is npx.cmd on Windows
+    npx = shutil.which("npx") or "npx"
+    return [npx, "--yes", TWEET_HARVEST]
+
+
+class HarvestDriver:
+    def __init__(self, args):
+        self.args = args
+        self.manifest = Manifest(MANIFEST_FILE)
+        self.sem = asyncio.Semaphore(args.workers)
+        self.stats = {"done": 0, "skipped": 0, "split": 0, "failed": 0, "tweets": 0}
+
+    async def harvest(self, emotion, start, end):
+        """Harvest one window (splitting it when it hits the limit)."""
+        entry = self.manifest.get(emotion, start, end)
+        if entry is not None and entry["status"] == "done":
+            self.stats["skipped"] += 1
+            return
+        if entry is None or entry["status"] != "split":
+            async with self.sem:
+                entry = await self.run_window(emotion, start, end)
+        if entry["status"] == "split":
+            # The halves run outside the semaphore slot of their parent
+            halves = split_window(start, end)
+            await asyncio.gather(*[self.harvest(emotion, *half) for half in halves])
+
+    async def run_window(self, emotion, start, end):
+        label = f"[{emotion} {start}..{end}]"
+        output_name = f"{emotion}_{start}_{end}.csv"
+        command = harvester_command(self.args) + [
+            "-t", self.args.token,
+            "-s", search_queries[emotion],
+            "-l", str(self.args.limit),
+            "--tab", "LATEST",
+            "-f", start,
+            "-to", end,
+            "-o", output_name,
+        ]
+        print(f"{label} start")
+        start_time = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *command, cwd=SCRIPT_DIR, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+        saved_path = None
+        # Stream the child output instead of buffering all of it
+        async for raw_line in process.stdout:
+            line = raw_line.decode("utf-8", errors="replace").rstrip()
+            if not line:
+                continue
+            print(f"{label} {line}")
+            match = SAVED_TO_PATTERN.search(line)
+            if match:
+                saved_path = match.group(1)
+        return_code = await process.wait()
+        elapsed_time = time.perf_counter() - start_time
+
+        if saved_path is None or not os.path.exists(saved_path):
+            saved_path = os.path.join(DATA_DIR, output_name)
+        if return_code != 0 or not os.path.exists(saved_path):
+            print(f"{label} failed (exit code {return_code})")
+            self.stats["failed"] += 1
+            return {"status": "failed"}
+
+        # Group the harvested files per emotion (ex: tweets-data/Anger/)
+        emotion_dir = os.path.join(DATA_DIR, emotion.capitalize())
+        os.makedirs(emotion_dir, exist_ok=True)
+        final_path = os.path.join(emotion_dir, os.path.basename(saved_path))
+        shutil.move(saved_path, final_path)
+        tweets = count_tweets(final_path)
+        self.stats["tweets"] += tweets
+
+        # At the limit the window most likely holds more tweets, the halves are harvested again
+        status = "done"
+        if tweets >= self.args.limit and window_days(start, end) > 1:
+            status = "split"
+            self.stats["split"] += 1
+        else:
+            self.stats["done"] += 1
+        entry = {"emotion": emotion, "start": start, "end": end, "status": status, "tweets": tweets,
+                 "file": os.path.relpath(final_path, SCRIPT_DIR), "seconds": round(elapsed_time, 1)}
+        self.manifest.record(**entry)
+        print(f"{label} {status}: {tweets} tweets in {elapsed_time:.1f}s")
+        return entry
+
+    async def run(self, emotions):
+        windows = [(emotion, start, end) for emotion in emotions for start, end in date_range.values()]
+        await asyncio.gather(*[self.harvest(*window) for window in windows])
+        return self.stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Harvest the tweets of every (emotion, date window) concurrently")
+    parser.add_argument("token", help="twitter auth token")
+    parser.add_argument("emotions", nargs="+", help=f"emotions to harvest ({', '.join(search_queries)}) or all")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="harvester processes running at once")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="tweets per window before it is split")
+    parser.add_argument("--harvester", help="harvester command (default: npx --yes tweet-harvest@<pinned version>)")
+    args = parser.parse_args(argv)
+    if args.emotions == ["all"]:
+        args.emotions = list(search_queries)
+    unknown = set(args.emotions) - search_queries.keys()
+    if unknown:
+        parser.error(f"unknown emotions: {', '.join(sorted(unknown))}")
+    return args
+
+
+async def main():
+    args = parse_args()
+    os.makedirs(DATA_DIR, exist_ok=True)
+    driver = HarvestDriver(args)
+    start_time = time.perf_counter()
+    stats = await driver.run(args.emotions)
+    print(f"====== Finished in {time.perf_counter() - start_time:.1f}s: {stats} ======")
+    if stats["failed"]:
+        sys.exit(1)
+
 
-# Scraping
-for date in date_range.values():
-    command["date_start_value"] = date[0]
-    command["date_end_value"] = date[1]
-    list_command = [value for value in command.values()]
-    print("====== Start Scrapping ... ======")
-    result = subprocess.run(list_command, capture_output=True, text=True, shell=True)
-    result_list = str(result.stdout).split("\n")
-    print("====== Scrapping successful...======")
-    print("====== Result: {} =====\n".format(result_list[-2]))   
-
-# temp_command_1 = 'npx tweet-harvest@latest -t 5aa215dfb6a1756ff296181ddac3f2bc3939c839 -s bakso -l 30 --tab LATEST'.split()
+if __name__ == "__main__":
+    asyncio.run(main())
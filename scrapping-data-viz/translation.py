@@ -0,0 +1,286 @@
+"""
+Batched translation stage (Indonesian -> English) with a persistent cache.
+
+Texts are normalized (retweet prefix, whitespace & unicode form) and keyed by
+the hash of the backend, the language pair & the normalized text, so retweets &
+copies of the same tweet are translated once, and a stub dry run never serves
+its translations to a real backend. Only the texts missing from the SQLite cache are sent to the
+backend, in batches running concurrently (bounded). Every finished batch is
+written to the cache right away, which is the checkpoint: an interrupted run
+continues where it stopped. When near_duplicates.py clustered the corpus, only
+one tweet per cluster is translated and the others get its translation.
+
+Backends (pluggable, anything with `name` & `translate_batch(texts)`):
+    google  deep_translator's GoogleTranslator, one request per text
+    marian  local Helsinki-NLP/opus-mt-id-en through transformers (offline, true batches)
+    stub    returns the text itself (tests & dry runs)
+
+Usage:
+    python translation.py --backend google --concurrency 8
+    translated = translate_texts(df["full_text"], GoogleBackend(), TranslationCache())
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from tqdm import tqdm
+
+# deep_translator & transformers are optional, only the selected backend needs its package
+try:
+    from deep_translator import GoogleTranslator
+    DEEP_TRANSLATOR_AVAILABLE = True
+except ImportError:
+    DEEP_TRANSLATOR_AVAILABLE = False
+
+try:
+    from transformers import MarianMTModel, MarianTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(SCRIPT_DIR, "tweets-store", "translations.db")
+TRANSLATED_FILE = os.path.join(SCRIPT_DIR, "tweets-store", "translated.parquet")
+SOURCE_LANG = "id"
+TARGET_LANG = "en"
+MARIAN_MODEL = "Helsinki-NLP/opus-mt-id-en"
+BATCH_SIZE = 32
+CONCURRENCY = 8
+MAX_ATTEMPTS = 5
+
+# Ex: "RT @someone: " in front of a retweet
+RETWEET_PREFIX = re.compile(r"^RT @\w+:\s*")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    text = unicodedata.normalize("NFKC", text)
+    text = RETWEET_PREFIX.sub("", text)
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def backend_namespace(backend):
+    """Ex: "google:id-en", the translations of different backends or language pairs never share a key."""
+    return f"{backend.name}:{getattr(backend, 'source', SOURCE_LANG)}-{getattr(backend, 'target', TARGET_LANG)}"
+
+
+def text_key(normalized_text, namespace=""):
+    return hashlib.blake2b(f"{namespace}\n{normalized_text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TranslationCache:
+    """(Backend, language pair, normalized text) hash -> translation, in SQLite (WAL, safe to read while a run writes)."""
+    def __init__(self, path=CACHE_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, source TEXT, translated TEXT, backend TEXT, created REAL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, keys):
+        found = {}
+        keys = list(keys)
+        # SQLite limits the number of parameters of a statement
+        for i in range(0, len(keys), 900):
+            chunk = keys[i:i + 900]
+            rows = self.conn.execute(
+                f"SELECT key, translated FROM translations WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, entries, backend):
+        """entries: (key, source text, translation) tuples."""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+            [(key, source, translated, backend, now) for key, source, translated in entries]
+        )
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class GoogleBackend:
+    """Google Translate through deep_translator (it has no batch endpoint, a batch is sent text by text)."""
+    name = "google"
+
+    def __init__(self, source=SOURCE_LANG, target=TARGET_LANG):
+        if not DEEP_TRANSLATOR_AVAILABLE:
+            raise RuntimeError("deep_translator is not installed (pip install deep-translator)")
+        self.source = source
+        self.target = target
+
+    def translate_batch(self, texts):
+        # One translator per batch, the batches run in different threads
+        translator = GoogleTranslator(source=self.source, target=self.target)
+        return [translator.translate(text) for text in texts]
+
+
+class MarianBackend:
+    """Local MarianMT model, translates a whole batch in one forward pass."""
+    name = "marian"
+    source = SOURCE_LANG
+    target = TARGET_LANG
+    # The model is not thread safe, the batches go one after the other
+    max_concurrency = 1
+
+    def __init__(self, model_name=MARIAN_MODEL, device=None):
+        if not TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("transformers is not installed (pip install transformers sentencepiece)")
+        self.tokenizer = MarianTokenizer.from_pretrained(model_name)
+        self.model = MarianMTModel.from_pretrained(model_name)
+        if device is not None:
+            self.model.to(device)
+        self.model.eval()
+
+    def translate_batch(self, texts):
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True, truncation=True).to(self.model.device)
+        outputs = self.model.generate(**inputs)
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+class StubBackend:
+    """Returns the texts unchanged (optionally after `delay` seconds per batch)."""
+    name = "stub"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def translate_batch(self, texts):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return list(texts)
+
+
+BACKENDS = {"google": GoogleBackend, "marian": MarianBackend, "stub": StubBackend}
+
+
+async def translate_batch_with_retry(backend, texts, max_attempts=MAX_ATTEMPTS):
+    """Run a (blocking) backend call in a thread, retrying with exponential backoff."""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            translations = await asyncio.to_thread(backend.translate_batch, texts)
+            if len(translations) != len(texts):
+                raise ValueError(f"{backend.name} returned {len(translations)} translations for {len(texts)} texts")
+            return translations
+        except Exception as e:
+            if attempt == max_attempts:
+                raise
+            delay = min(30, 2 ** (attempt - 1))
+            tqdm.write(f"====> {backend.name} failed ({type(e).__name__}: {e}), retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+
+async def translate_texts_async(texts, backend, cache, batch_size=BATCH_SIZE, concurrency=CONCURRENCY):
+    """Translations of `texts` (same order, None for empty texts)."""
+    texts = list(texts)
+    namespace = backend_namespace(backend)
+    keys = []
+    pending = {}
+    for text in texts:
+        if not isinstance(text, str) or not text.strip():
+            keys.append(None)
+            continue
+        normalized_text = normalize_text(text)
+        key = text_key(normalized_text, namespace)
+        keys.append(key)
+        pending.setdefault(key, normalized_text)
+
+    translations = cache.get_many(pending)
+    missing = [(key, text) for key, text in pending.items() if key not in translations]
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    sem = asyncio.Semaphore(min(concurrency, getattr(backend, "max_concurrency", concurrency)))
+    progress = tqdm(total=len(missing), desc=f"Translating ({backend.name})", unit="text")
+
+    async def run_batch(batch):
+        async with sem:
+            results = await translate_batch_with_retry(backend, [text for _, text in batch])
+        # Checkpoint: the batch is in the cache before the next one is counted
+        cache.put_many([(key, text, result) for (key, text), result in zip(batch, results)], backend.name)
+        for (key, _), result in zip(batch, results):
+            translations[key] = result
+        progress.update(len(batch))
+
+    try:
+        await asyncio.gather(*[run_batch(batch) for batch in batches])
+    finally:
+        progress.close()
+    return [translations.get(key) if key is not None else None for key in keys]
+
+
+def translate_texts(texts, backend, cache, batch_size=BATCH_SIZE, concurrency=CONCURRENCY):
+    """Blocking version of translate_texts_async (for scripts; in a notebook await the async one)."""
+    return asyncio.run(translate_texts_async(texts, backend, cache, batch_size, concurrency))
+
+
+def main():
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from tweet_store import TweetStore, STORE_DIR
+    from near_duplicates import load_clusters
+
+    parser = argparse.ArgumentParser(description="Translate the tweets of the tweet store to English")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="google")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--cache", default=CACHE_FILE)
+    parser.add_argument("--output", default=TRANSLATED_FILE)
+    parser.add_argument("--limit", type=int, help="translate only the first N tweets")
+    parser.add_argument("--all-tweets", action="store_true", help="ignore the near-duplicate clusters")
+    args = parser.parse_args()
+
+    table = TweetStore(args.store_dir).scan(columns=["id_str", "full_text"])
+    if args.limit:
+        table = table.slice(0, args.limit)
+    df = table.to_pandas()
+    # Only one tweet per near-duplicate cluster is translated (see near_duplicates.py)
+    clusters = load_clusters(args.store_dir)
+    if clusters is not None and not args.all_tweets:
+        df["representative"] = df["id_str"].map(clusters).fillna(df["id_str"])
+    else:
+        df["representative"] = df["id_str"]
+    full_texts = df.set_index("id_str")["full_text"]
+    representatives = df["representative"].unique()
+    texts = full_texts.reindex(representatives).fillna(df.groupby("representative")["full_text"].first()).tolist()
+
+    backend = BACKENDS[args.backend]()
+    cache = TranslationCache(args.cache)
+    cached_before = len(cache)
+    start_time = time.perf_counter()
+    translations = translate_texts(texts, backend, cache, args.batch_size, args.concurrency)
+    elapsed_time = time.perf_counter() - start_time
+    translated = len(cache) - cached_before
+    cache.close()
+
+    # A plain dict lookup: Series.map would turn the None translations (null full_text) into float NaN
+    lookup = dict(zip(representatives, translations))
+    translations = [lookup.get(representative) for representative in df["representative"]]
+    pq.write_table(pa.table({"id_str": pa.array(df["id_str"], pa.string()),
+                             "translated_text": pa.array(translations, pa.string())}),
+                   args.output)
+    print(f"{len(df)} tweets, {len(texts)} cluster representatives, {translated} texts sent to {backend.name}, "
+          f"the rest served by the cache, in {elapsed_time:.1f}s")
+    print(f"Translations saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
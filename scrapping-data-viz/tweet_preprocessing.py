@@ -0,0 +1,177 @@
+"""
+Column-wise version of pysentimiento's `preprocess_tweet`.
+
+The steps of `preprocess_tweet(text, lang=..., shorten=...)` run in the same
+order, but each one over a whole pandas column (compiled regexes through the
+`.str` accessor, one `str.translate` table for the special characters) and
+only on the rows which can match (ex: the hashtag step only sees texts
+containing "#", emoji.demojize only the texts with an emoji character).
+The output is the same as pysentimiento's, check_preprocessing.py compares
+both on a golden set.
+
+Usage:
+    df["preprocessed_text"] = preprocess_column(df["translated_text"], lang="en", shorten=2)
+    # Large corpora: chunks in worker processes
+    df["preprocessed_text"] = preprocess_column(df["translated_text"], workers=4)
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import emoji
+from emoji.tokenizer import get_search_tree
+import pandas as pd
+
+CHUNK_SIZE = 20000
+
+# The regexes & tables below are the ones of pysentimiento.preprocessing (0.7)
+USER_REGEX = re.compile(r"@[a-zA-Z0-9_]{0,15}")
+URL_REGEX = re.compile(
+    r"((?<=[^a-zA-Z0-9])(?:https?\:\/\/|[a-zA-Z0-9]{1,}\.{1}|\b)(?:\w{1,}\.{1}){1,5}(?:com|co|org|edu|gov|uk|net|ca|de|jp|fr|au|us|ru|ch|it|nl|se|no|es|mil|iq|io|ac|ly|sm){1}(?:\/[a-zA-Z0-9]{1,})*)"
+)
+HASHTAG_REGEX = re.compile(r"\B#(\w*[a-zA-Z]+\w*)")
+START_OF_CAMEL = re.compile(r"([A-Z]+)")
+EMOJI_NAME_REGEX = re.compile(r"\|([^\|]+)\|")
+
+CHAR_REPLACEMENTS = {
+    "~": None, "£": None, "¥": None, "¨": '"', "©": None, "«": '"', "°": None, "´": None, "¶": None,
+    "·": None, "º": None, "»": '"', "×": None, "ا": None, "–": None, "—": None, "‘": None, "’": None,
+    "“": '"', "”": '"', "•": None, "…": None, "‼": "!", "€": "$", "™": None, "●": None, "☠": None,
+    "☹": None, "☺": None, "☻": "😃", "♀": None, "♂": None, "♡": "❤️", "♥": "❤️", "⚰": None,
+    "⛱": None, "⛹": None, "✈": None, "✓": None, "❤": None, "ー": None, "🕯": None, "🛰": None,
+}
+# str.translate table: None deletes the character
+CHAR_TABLE = str.maketrans(CHAR_REPLACEMENTS)
+CHAR_REGEX = re.compile("[" + re.escape("".join(CHAR_REPLACEMENTS)) + "]")
+
+LAUGHTER = {
+    "es": (re.compile("[ja][ja]+aj[ja]+"), "jaja"),
+    "en": (re.compile("[ha][ha]+ah[ha]+"), "haha"),
+    "it": (re.compile("[ha][ha]+ah[ha]+"), "haha"),
+    "pt": (re.compile("[ha][ha]+ah[ha]+|kk+"), "kk"),
+}
+DEFAULT_TOKENS = {
+    "es": {"user_token": "@usuario", "url_token": "url", "hashtag_token": "hashtag"},
+    "en": {"user_token": "@USER", "url_token": "HTTPURL", "hashtag_token": "hashtag"},
+    "it": {"user_token": "##user", "url_token": "##url", "hashtag_token": "##hashtag"},
+    "pt": {"user_token": "@USER", "url_token": "HTTPURL", "hashtag_token": "hashtag"},
+}
+
+
+def char_class(chars):
+    """Regex character class of the given characters, as ranges."""
+    codes = sorted({ord(char) for char in chars})
+    ranges = []
+    for code in codes:
+        if ranges and code == ranges[-1][1] + 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return "[" + "".join(
+        re.escape(chr(start)) if start == end else f"{re.escape(chr(start))}-{re.escape(chr(end))}"
+        for start, end in ranges
+    ) + "]"
+
+
+@lru_cache(maxsize=None)
+def emoji_candidate_regex():
+    """
+    Matches the texts emoji.demojize can change: a character starting an emoji
+    (the ASCII ones, "#", "*" & digits, only start a keycap with U+FE0F / U+20E3)
+    or a variation selector (demojize drops them).
+    """
+    first_chars = [char for char in get_search_tree() if ord(char) >= 128]
+    return re.compile(char_class(first_chars + ["\ufe0e", "\ufe0f", "\u20e3"]))
+
+
+def camel_to_human(text):
+    return START_OF_CAMEL.sub(r" \1", text).strip().lower()
+
+
+def _where(series, mask, function):
+    """Apply a column function only to the rows selected by mask."""
+    if mask.any():
+        series = series.copy()
+        series[mask] = function(series[mask])
+    return series
+
+
+def preprocess_series(series, lang="es", user_token=None, url_token=None, preprocess_hashtags=True,
+                      hashtag_token=None, char_replace=True, demoji=True, shorten=3, normalize_laughter=True,
+                      emoji_wrapper="emoji", preprocess_handles=True):
+    """preprocess_tweet over a whole column (same arguments). Missing values stay missing."""
+    user_token = user_token or DEFAULT_TOKENS[lang]["user_token"]
+    url_token = url_token or DEFAULT_TOKENS[lang]["url_token"]
+    hashtag_token = hashtag_token or DEFAULT_TOKENS[lang]["hashtag_token"]
+    text = series.astype(object)
+    valid = text.map(lambda value: isinstance(value, str))
+    result = text.copy()
+    text = text[valid]
+
+    if preprocess_hashtags:
+        def process_hashtag(match):
+            hashtag = camel_to_human(match.group(1))
+            return hashtag_token + " " + hashtag if hashtag_token else hashtag
+        text = _where(text, text.str.contains("#", regex=False),
+                      lambda rows: rows.str.replace(HASHTAG_REGEX, process_hashtag, regex=True))
+
+    if char_replace:
+        text = _where(text, text.str.contains(CHAR_REGEX), lambda rows: rows.str.translate(CHAR_TABLE))
+
+    if preprocess_handles:
+        text = _where(text, text.str.contains("@", regex=False),
+                      lambda rows: rows.str.replace(USER_REGEX, user_token, regex=True))
+
+    # The url regex needs a "." (ex: "t.co/x", "www.")
+    text = _where(text, text.str.contains(".", regex=False),
+                  lambda rows: rows.str.replace(URL_REGEX, url_token, regex=True))
+
+    if shorten:
+        repeated_regex = re.compile(r"(.)" + r"\1" * (shorten - 1) + "+")
+        text = text.str.replace(repeated_regex, r"\1" * shorten, regex=True)
+
+    if demoji:
+        wrapper = f" {emoji_wrapper} ".replace("  ", " ")
+        # Most tweets have no emoji at all, demojize only runs on the others
+        text = _where(text, text.str.contains(emoji_candidate_regex()),
+                      lambda rows: rows.map(lambda row: emoji.demojize(row, language=lang, delimiters=("|", "|"))))
+        # Runs on every row: pysentimiento also rewrites "|...|" which was in the text itself
+        text = _where(text, text.str.contains("|", regex=False), lambda rows: rows.str.replace(
+            EMOJI_NAME_REGEX, lambda match: wrapper + " ".join(match.group(1).split("_")) + wrapper, regex=True
+        ))
+
+    if normalize_laughter:
+        laughter_regex, replacement = LAUGHTER[lang]
+        text = text.str.replace(laughter_regex, replacement, regex=True)
+
+    result[valid] = text.str.strip()
+    return result
+
+
+def _preprocess_chunk(args):
+    chunk, kwargs = args
+    return preprocess_series(chunk, **kwargs)
+
+
+def preprocess_column(series, workers=None, chunk_size=CHUNK_SIZE, **kwargs):
+    """
+    preprocess_series, split in chunks processed by `workers` processes when the
+    column is large (workers=None or 1 runs in this process).
+    """
+    series = pd.Series(series)
+    if not workers or workers <= 1 or len(series) <= chunk_size:
+        return preprocess_series(series, **kwargs)
+    chunks = [(series.iloc[i:i + chunk_size], kwargs) for i in range(0, len(series), chunk_size)]
+    # spawn: same behaviour on Linux & Windows, and safe from a notebook with threads
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1), mp_context=context) as executor:
+        return pd.concat(list(executor.map(_preprocess_chunk, chunks)))
+
+
+def preprocess_tweet(text, **kwargs):
+    """Single text version (drop-in for pysentimiento.preprocessing.preprocess_tweet)."""
+    return preprocess_series(pd.Series([text]), **kwargs).iloc[0]
@@ -0,0 +1,352 @@
+"""
+Columnar store of the harvested tweets (replaces glob + pd.concat of every CSV).
+
+`ingest` appends only the harvester CSVs which are new or changed since the
+last run to a Parquet dataset, keeping the first copy of every tweet (keyed by
+`id_str`, across all the files). The columns are typed once at ingest time:
+`created_at` is a UTC timestamp, the counts are integers and `location`,
+`lang` & `folder` (the tweets-data sub folder, ex: Anger) are dictionary
+encoded. The ids already stored are kept as a sorted array next to the data,
+so deduplicating a new file does not read the dataset back.
+
+A crash never leaves duplicates or half written parts behind: a new part is
+written under a temporary name and only renamed once its ids are logged next
+to it, and `compact` records which parts it replaces before swapping them.
+Opening the store finishes (or undoes) whatever a crashed run left.
+
+Querying is lazy, only the requested columns & matching rows are loaded:
+    store = TweetStore()
+    df = store.to_pandas(columns=["created_at", "full_text"], folders=["Anger", "Fear"])
+
+Usage:
+    python tweet_store.py ingest [--data-dir tweets-data] [--compact]
+    python tweet_store.py stats
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import glob
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, "tweets-data")
+STORE_DIR = os.path.join(SCRIPT_DIR, "tweets-store")
+# Ex: "Wed Feb 28 23:59:09 +0000 2024"
+CREATED_AT_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+COLUMNS = ["conversation_id_str", "created_at", "favorite_count", "full_text", "id_str", "image_url",
+           "in_reply_to_screen_name", "lang", "location", "quote_count", "reply_count", "retweet_count",
+           "tweet_url", "user_id_str", "username"]
+COUNT_COLUMNS = ["favorite_count", "quote_count", "reply_count", "retweet_count"]
+
+TWEET_SCHEMA = pa.schema([
+    ("id_str", pa.string()),
+    ("conversation_id_str", pa.string()),
+    ("created_at", pa.timestamp("s", tz="UTC")),
+    ("full_text", pa.string()),
+    ("favorite_count", pa.int64()),
+    ("quote_count", pa.int64()),
+    ("reply_count", pa.int64()),
+    ("retweet_count", pa.int64()),
+    ("image_url", pa.string()),
+    ("in_reply_to_screen_name", pa.string()),
+    ("lang", pa.dictionary(pa.int32(), pa.string())),
+    ("location", pa.dictionary(pa.int32(), pa.string())),
+    ("tweet_url", pa.string()),
+    ("user_id_str", pa.string()),
+    ("username", pa.string()),
+    ("folder", pa.dictionary(pa.int32(), pa.string())),
+    ("source_file", pa.string()),
+])
+
+
+def read_harvest_csv(path):
+    """One harvester CSV as a table of raw columns (every column as text), None when empty."""
+    if os.path.getsize(path) == 0:
+        return None
+    try:
+        return pcsv.read_csv(
+            path,
+            # The tweet texts contain line breaks
+            parse_options=pcsv.ParseOptions(newlines_in_values=True),
+            convert_options=pcsv.ConvertOptions(
+                column_types={column: pa.string() for column in COLUMNS},
+                strings_can_be_null=True
+            )
+        )
+    except pa.ArrowInvalid as e:
+        # Ex: a harvest which found nothing leaves a file without a header
+        if "Empty CSV file" in str(e):
+            return None
+        raise
+
+
+def to_count(column):
+    # Counts missing from a row are 0
+    return pc.fill_null(pc.cast(column, pa.int64()), 0)
+
+
+def typed_table(raw, folder, source_file):
+    """Convert the raw text columns to TWEET_SCHEMA."""
+    columns = {}
+    for column in COLUMNS:
+        if column in raw.column_names:
+            columns[column] = raw[column]
+        else:
+            columns[column] = pa.nulls(raw.num_rows, pa.string())
+    columns["created_at"] = pc.strptime(columns["created_at"], format=CREATED_AT_FORMAT, unit="s", error_is_null=True)
+    for column in COUNT_COLUMNS:
+        columns[column] = to_count(columns[column])
+    columns["folder"] = pa.array([folder] * raw.num_rows, pa.string())
+    columns["source_file"] = pa.array([source_file] * raw.num_rows, pa.string())
+    arrays = []
+    for field in TWEET_SCHEMA:
+        arrays.append(pc.cast(columns[field.name], field.type))
+    return pa.Table.from_arrays(arrays, schema=TWEET_SCHEMA)
+
+
+def tweet_ids(table):
+    return pc.cast(table["id_str"], pa.int64()).to_numpy(zero_copy_only=False)
+
+
+class TweetStore:
+    """
+    tweets-store/
+        parts/part-<uuid>.parquet   the tweets
+        parts/part-<uuid>.ids       ids of a part added since ids.npy was written (raw int64)
+        parts/compact.json          parts replaced by a running compaction
+        ids.npy                     sorted ids of every stored tweet
+        ingested.json               CSV path -> size & mtime when it was ingested
+    """
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self.parts_dir = os.path.join(store_dir, "parts")
+        self.ids_path = os.path.join(store_dir, "ids.npy")
+        self.ingested_path = os.path.join(store_dir, "ingested.json")
+        os.makedirs(self.parts_dir, exist_ok=True)
+        self.ingested = {}
+        if os.path.exists(self.ingested_path):
+            with open(self.ingested_path, encoding="utf-8") as f:
+                self.ingested = json.load(f)
+        self.compact_path = os.path.join(self.parts_dir, "compact.json")
+        self._recover()
+        self.ids = np.load(self.ids_path) if os.path.exists(self.ids_path) else np.empty(0, np.int64)
+        # Ids logged by an ingest which stopped before rewriting ids.npy
+        for ids_log_path in self._ids_logs():
+            self.ids = np.union1d(self.ids, np.fromfile(ids_log_path, dtype=np.int64))
+        # Ids added by the running ingest, merged into self.ids once at its end
+        self._new_ids = np.empty(0, np.int64)
+
+    def _ids_logs(self):
+        return sorted(glob.glob(os.path.join(self.parts_dir, "*.ids")))
+
+    def _recover(self):
+        """Finish what a crashed ingest / compaction committed to, drop what it had not."""
+        if os.path.exists(self.compact_path):
+            with open(self.compact_path, encoding="utf-8") as f:
+                plan = json.load(f)
+            # The merged part was complete before the plan was written
+            merged_path = os.path.join(self.parts_dir, plan["merged"])
+            if os.path.exists(merged_path + ".tmp"):
+                os.replace(merged_path + ".tmp", merged_path)
+            for name in plan["replaced"]:
+                if os.path.exists(os.path.join(self.parts_dir, name)):
+                    os.remove(os.path.join(self.parts_dir, name))
+            os.remove(self.compact_path)
+        # A part whose ids are logged was complete, it only missed its rename
+        for ids_log_path in self._ids_logs():
+            part_path = ids_log_path[:-len(".ids")] + ".parquet"
+            if os.path.exists(part_path + ".tmp"):
+                os.replace(part_path + ".tmp", part_path)
+        # Anything still temporary was being written when the run stopped
+        for path in glob.glob(os.path.join(self.parts_dir, "*.tmp")):
+            os.remove(path)
+
+    def _write_part(self, table, new_ids):
+        # Written under a temporary name, renamed only once its ids are logged:
+        # a crash in between is finished by _recover, one before is dropped
+        part_path = os.path.join(self.parts_dir, f"part-{uuid.uuid4().hex}.parquet")
+        pq.write_table(table, part_path + ".tmp")
+        ids_log_path = part_path[:-len(".parquet")] + ".ids"
+        with open(ids_log_path + ".tmp", "wb") as f:
+            np.asarray(new_ids, dtype=np.int64).tofile(f)
+        os.replace(ids_log_path + ".tmp", ids_log_path)
+        os.replace(part_path + ".tmp", part_path)
+        self._new_ids = np.union1d(self._new_ids, new_ids)
+
+    def _save_ids(self):
+        # Only the ids of a new part are written per file, ids.npy is rewritten once per ingest call
+        self.ids = np.union1d(self.ids, self._new_ids)
+        self._new_ids = np.empty(0, np.int64)
+        tmp_path = self.ids_path + ".tmp.npy"
+        np.save(tmp_path, self.ids)
+        os.replace(tmp_path, self.ids_path)
+        for ids_log_path in self._ids_logs():
+            os.remove(ids_log_path)
+
+    def _save_state(self):
+        # The ids are logged first: a file whose ids are saved but which is not marked ingested
+        # yet is simply read again next time, and all its rows are dropped as duplicates
+        tmp_path = self.ingested_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.ingested, f, indent=1)
+        os.replace(tmp_path, self.ingested_path)
+
+    def pending_files(self, data_dir=DATA_DIR):
+        """CSV files (relative to data_dir) which are new or changed since they were ingested."""
+        pending = []
+        for path in sorted(glob.glob(os.path.join(data_dir, "**", "*.csv"), recursive=True)):
+            relpath = os.path.relpath(path, data_dir).replace(os.sep, "/")
+            stat = os.stat(path)
+            entry = self.ingested.get(relpath)
+            if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+                pending.append(relpath)
+        return pending
+
+    def _drop_known(self, table):
+        """Rows of the table whose id is neither stored yet nor repeated earlier in the table."""
+        ids = tweet_ids(table)
+        # First occurrence of every id inside the table
+        _, first = np.unique(ids, return_index=True)
+        keep = np.zeros(len(ids), dtype=bool)
+        keep[first] = True
+        for known in (self.ids, self._new_ids):
+            if len(known):
+                positions = np.searchsorted(known, ids).clip(max=len(known) - 1)
+                keep &= known[positions] != ids
+        return table.filter(pa.array(keep)), ids[keep]
+
+    def ingest(self, data_dir=DATA_DIR):
+        """Append the tweets of the new / changed CSV files. Returns ingest statistics."""
+        stats = {"files": 0, "rows": 0, "added": 0, "duplicates": 0}
+        try:
+            self._ingest_files(data_dir, stats)
+        finally:
+            if len(self._new_ids):
+                self._save_ids()
+        return stats
+
+    def _ingest_files(self, data_dir, stats):
+        for relpath in self.pending_files(data_dir):
+            path = os.path.join(data_dir, relpath)
+            stat = os.stat(path)
+            raw = read_harvest_csv(path)
+            added = 0
+            if raw is not None and raw.num_rows:
+                # Files right in tweets-data have no folder
+                folder = relpath.split("/")[0] if "/" in relpath else None
+                table = typed_table(raw, folder, relpath)
+                table = table.filter(pc.is_valid(table["id_str"]))
+                new_table, new_ids = self._drop_known(table)
+                added = new_table.num_rows
+                if added:
+                    self._write_part(new_table, new_ids)
+                stats["rows"] += raw.num_rows
+                stats["duplicates"] += raw.num_rows - added
+            self.ingested[relpath] = {"size": stat.st_size, "mtime": stat.st_mtime, "added": added,
+                                      "ingested_at": datetime.now().isoformat(timespec="seconds")}
+            self._save_state()
+            stats["files"] += 1
+            stats["added"] += added
+
+    def compact(self):
+        """Rewrite the parts into a single file sorted by created_at (reads faster than many small parts)."""
+        parts = self.parts()
+        if len(parts) <= 1:
+            return
+        table = self.dataset().to_table().sort_by("created_at")
+        merged_path = os.path.join(self.parts_dir, f"part-{uuid.uuid4().hex}.parquet")
+        pq.write_table(table, merged_path + ".tmp", row_group_size=256 * 1024)
+        # The plan commits the swap: from here on _recover completes it after a crash
+        plan = {"merged": os.path.basename(merged_path), "replaced": [os.path.basename(path) for path in parts]}
+        with open(self.compact_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(plan, f, indent=1)
+        os.replace(self.compact_path + ".tmp", self.compact_path)
+        os.replace(merged_path + ".tmp", merged_path)
+        for path in parts:
+            os.remove(path)
+        os.remove(self.compact_path)
+
+    def parts(self):
+        return sorted(glob.glob(os.path.join(self.parts_dir, "*.parquet")))
+
+    def dataset(self):
+        return ds.dataset(self.parts(), schema=TWEET_SCHEMA, format="parquet")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def scan(self, columns=None, folders=None, since=None, until=None, lang=None, where=None):
+        """
+        The matching tweets as an Arrow table. `since` & `until` are datetimes or ISO
+        strings (until excluded), `where` is an extra pyarrow.dataset expression.
+        """
+        expression = where
+        conditions = []
+        if folders is not None:
+            conditions.append(ds.field("folder").isin(list(folders)))
+        if lang is not None:
+            conditions.append(ds.field("lang") == lang)
+        if since is not None:
+            conditions.append(ds.field("created_at") >= pa.scalar(to_utc(since), TWEET_SCHEMA.field("created_at").type))
+        if until is not None:
+            conditions.append(ds.field("created_at") < pa.scalar(to_utc(until), TWEET_SCHEMA.field("created_at").type))
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return self.dataset().to_table(columns=columns, filter=expression)
+
+    def to_pandas(self, columns=None, **filters):
+        """Like scan(), as a DataFrame (dictionary columns become pandas categories)."""
+        return self.scan(columns=columns, **filters).to_pandas()
+
+
+def to_utc(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def load_tweets(columns=None, store_dir=STORE_DIR, **filters):
+    """Shortcut for notebooks: load_tweets(["full_text"], folders=["Joy"])."""
+    return TweetStore(store_dir).to_pandas(columns=columns, **filters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar store of the harvested tweets")
+    parser.add_argument("command", choices=["ingest", "stats"])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--compact", action="store_true", help="merge the parts into one file after ingesting")
+    args = parser.parse_args()
+
+    store = TweetStore(args.store_dir)
+    if args.command == "ingest":
+        start_time = time.perf_counter()
+        stats = store.ingest(args.data_dir)
+        if args.compact:
+            store.compact()
+        print(f"Ingested {stats['files']} files in {time.perf_counter() - start_time:.2f}s: "
+              f"{stats['added']} new tweets, {stats['duplicates']} duplicates dropped")
+    start_time = time.perf_counter()
+    table = store.scan(columns=["folder"])
+    counts = table["folder"].value_counts().to_pylist() if table.num_rows else []
+    print(f"{len(store)} tweets in {len(store.parts())} parts (counted in {time.perf_counter() - start_time:.3f}s)")
+    for count in counts:
+        print(f"  {str(count['values']).ljust(10)}: {count['counts']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Streaming Parquet output for scraped articles.
+
+Records are buffered in small chunks and appended to a Parquet dataset
+partitioned by source/year/month (hive layout, ex:
+scrapping_result/articles/source=jpnn/year=2023/month=1/part-....parquet).
+`genre` is dictionary encoded and `keyphrases` is stored as a list of strings.
+
+Reading it back (only the needed columns / partitions are loaded):
+    df = read_articles(ARTICLES_DIR, columns=["title", "genre"], source="jpnn", year=2023)
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import time
+import uuid
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+ARTICLE_SCHEMA = pa.schema([
+    ("url", pa.string()),
+    ("title", pa.string()),
+    ("body", pa.string()),
+    ("summary", pa.string()),
+    ("genre", pa.dictionary(pa.int32(), pa.string())),
+    ("date", pa.string()),
+    ("published", pa.timestamp("s")),
+    ("keyphrases", pa.list_(pa.string())),
+    ("overlay", pa.bool_()),
+    ("source", pa.string()),
+    ("year", pa.int16()),
+    ("month", pa.int8()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("source", pa.string()), ("year", pa.int16()), ("month", pa.int8())]),
+    flavor="hive"
+)
+
+
+def parse_published(date_str):
+    """
+    Parse the date of an article. Supports jpnn's "01 January 2009" (already
+    translated to English) and tempo's ISO "2009-12-31T10:15:00+07:00".
+    """
+    if not date_str:
+        return None
+    try:
+        # The local time is kept, the UTC offset is dropped
+        return datetime.fromisoformat(date_str).replace(tzinfo=None)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(date_str.strip(), "%d %B %Y")
+    except ValueError:
+        return None
+
+
+def normalize_keyphrases(keyphrases):
+    if keyphrases is None:
+        return []
+    if isinstance(keyphrases, str):
+        # tempo sometimes ships the keywords as a single comma separated string
+        return [keyphrase.strip() for keyphrase in keyphrases.split(",") if keyphrase.strip()]
+    return [str(keyphrase) for keyphrase in keyphrases]
+
+
+class ArticleSink:
+    """
+    Append scraped articles to the Parquet dataset as they complete.
+
+    The buffer is flushed every `flush_rows` records, so memory stays bounded,
+    and by the first write() coming `flush_interval` seconds or more after the
+    last flush. There is no timer: an idle sink keeps its buffer until the next
+    write(), flush() or close().
+    `on_flush(records)` is called after the records are safely on disk
+    (ex: to mark them done in the crawl journal).
+    """
+    def __init__(self, root, source, flush_rows=500, flush_interval=30, on_flush=None):
+        self.root = root
+        self.source = source
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.written = 0
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        records = self._buffer
+        self._buffer = []
+        ds.write_dataset(
+            self._to_table(records),
+            self.root,
+            format="parquet",
+            partitioning=PARTITIONING,
+            # Unique file names, every flush adds new files next to the existing ones
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore"
+        )
+        self.written += len(records)
+        if self.on_flush is not None:
+            self.on_flush(records)
+
+    def close(self):
+        self.flush()
+
+    def _to_table(self, records):
+        columns = {name: [] for name in ARTICLE_SCHEMA.names}
+        for record in records:
+            published = parse_published(record.get("date"))
+            columns["url"].append(record.get("url"))
+            columns["title"].append(record.get("title"))
+            columns["body"].append(record.get("body"))
+            columns["summary"].append(record.get("summary"))
+            columns["genre"].append(record.get("genre"))
+            columns["date"].append(record.get("date"))
+            columns["published"].append(published)
+            columns["keyphrases"].append(normalize_keyphrases(record.get("keyphrases")))
+            columns["overlay"].append(record.get("overlay"))
+            columns["source"].append(self.source)
+            # Articles without a parsable date end up in year=0/month=0
+            columns["year"].append(published.year if published else 0)
+            columns["month"].append(published.month if published else 0)
+        return pa.table(columns, schema=ARTICLE_SCHEMA)
+
+
+def read_articles(root, columns=None, source=None, year=None, month=None):
+    """Load the articles as a pandas DataFrame, reading only the given columns & partitions."""
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+    filter_expression = None
+    for name, value in (("source", source), ("year", year), ("month", month)):
+        if value is None:
+            continue
+        expression = ds.field(name) == value
+        filter_expression = expression if filter_expression is None else filter_expression & expression
+    return dataset.to_table(columns=columns, filter=filter_expression).to_pandas()
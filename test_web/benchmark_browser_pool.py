@@ -0,0 +1,60 @@
+"""
+Benchmark: one Chromium per article vs. the shared browser pool.
+
+Runs both strategies against the local fixture server and reports articles/sec.
+Usage: python benchmark_browser_pool.py [amount_of_articles]
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import asyncio
+import sys
+import time
+from playwright.async_api import async_playwright
+from fixture_server import start_fixture_server
+from browser_pool import BrowserPool
+from scrapping_jppn_individual import scrape_article_content, POOL_SIZE, POOL_BROWSERS, PAGE_MAX_USES
+
+
+# The old strategy: a fresh async_playwright() + Chromium for every URL
+async def scrape_with_fresh_browser(url, sem):
+    async with sem:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch()
+            page = await browser.new_page()
+            await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            title = await page.locator('h1.judul').inner_text()
+            await browser.close()
+    return {"url": url, "title": title}
+
+
+async def bench_fresh_browser(urls):
+    sem = asyncio.Semaphore(POOL_SIZE)
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*[scrape_with_fresh_browser(url, sem) for url in urls])
+    return results, time.perf_counter() - start_time
+
+
+async def bench_pool(urls):
+    start_time = time.perf_counter()
+    async with BrowserPool(size=POOL_SIZE, browsers=POOL_BROWSERS, max_uses=PAGE_MAX_USES) as pool:
+        results = await asyncio.gather(*[scrape_article_content(url, pool) for url in urls], return_exceptions=True)
+    return results, time.perf_counter() - start_time
+
+
+async def main():
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    server, base_url = start_fixture_server()
+    urls = [f"{base_url}/news/{i}" for i in range(amount)]
+
+    print(f"Benchmarking {amount} articles (pool size: {POOL_SIZE}, browsers: {POOL_BROWSERS})")
+    for name, bench in [("fresh browser per url", bench_fresh_browser), ("browser pool", bench_pool)]:
+        results, elapsed = await bench(urls)
+        failed = sum(1 for result in results if not result or isinstance(result, Exception))
+        print(f"{name.ljust(24)}: {elapsed:.2f}s, {amount / elapsed:.2f} articles/s, failed: {failed}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
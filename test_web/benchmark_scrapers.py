@@ -0,0 +1,252 @@
+"""
+Benchmark suite of the scraper configurations against the local site simulator.
+
+Every configuration (stage x concurrency) scrapes the same simulated articles
+and reports articles/sec, p50/p99 latency per article and the peak RSS of the
+process & its browsers. Results can be saved and compared with an earlier run
+to catch throughput regressions.
+
+Usage:
+    python benchmark_scrapers.py --articles 200 --latency 0.05 --error-rate 0.01
+    python benchmark_scrapers.py --configs tempo_http --save baseline.json
+    python benchmark_scrapers.py --configs tempo_http --compare baseline.json
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+from fixture_server import start_fixture_server, SimulatorConfig, day_article_ids
+from retry_policy import RetryPolicy, RetryError, run_with_retry
+
+# psutil is optional, without it the peak RSS of the process itself is reported (browsers excluded)
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Concurrency levels tried for every stage
+CONCURRENCY_LEVELS = {
+    "tempo_http": [5, 10, 20],
+    "jpnn_pool": [4, 7, 14],
+    "jpnn_index": [6, 12],
+}
+FIRST_DAY = date(2023, 1, 1)
+# Failure of the comparison when articles/sec dropped by more than this share
+MAX_REGRESSION = 0.10
+
+
+class RssSampler:
+    """Samples the RSS of this process & its children (browsers) to find the peak."""
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._task = None
+
+    def _rss(self):
+        process = psutil.Process(os.getpid())
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    async def _sample(self):
+        while True:
+            self.peak = max(self.peak, self._rss())
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if PSUTIL_AVAILABLE:
+            self._task = asyncio.create_task(self._sample())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            return self.peak
+        try:
+            import resource
+            # Peak of the whole run so far (KB on Linux)
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return None
+
+
+def article_urls(base_url, path, amount, articles_per_day):
+    urls = []
+    day = FIRST_DAY
+    while len(urls) < amount:
+        urls.extend(f"{base_url}{path}{article_id}" for article_id in day_article_ids(day, articles_per_day))
+        day += timedelta(days=1)
+    return urls[:amount]
+
+
+async def timed(coro_factory, latencies):
+    """Run one article & record its latency. Returns True on success."""
+    start_time = time.perf_counter()
+    try:
+        await coro_factory()
+    except RetryError:
+        return False
+    latencies.append(time.perf_counter() - start_time)
+    return True
+
+
+async def bench_tempo_http(base_url, concurrency, amount, config):
+    from tempo_fetcher import TempoFetcher
+    urls = article_urls(base_url, "/tempo/read/", amount, config.articles_per_day)
+    policy = RetryPolicy(base_delay=0.05)
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with TempoFetcher(max_connections=concurrency) as fetcher:
+        async def fetch(url):
+            async with sem:
+                return await timed(lambda: run_with_retry(lambda: fetcher.fetch(url), url, policy), latencies)
+        results = await asyncio.gather(*[fetch(url) for url in urls])
+    return results, latencies
+
+
+async def bench_jpnn_pool(base_url, concurrency, amount, config):
+    from browser_pool import BrowserPool
+    from scrapping_jppn_individual import scrape_article_content
+    urls = article_urls(base_url, "/news/", amount, config.articles_per_day)
+    policy = RetryPolicy(base_delay=0.05)
+    latencies = []
+    async with BrowserPool(size=concurrency, browsers=max(1, concurrency // 7)) as pool:
+        results = await asyncio.gather(*[
+            timed(lambda url=url: scrape_article_content(url, pool, policy), latencies) for url in urls
+        ])
+    return results, latencies
+
+
+async def bench_jpnn_index(base_url, concurrency, amount, config):
+    from browser_pool import BrowserPool
+    from index_scheduler import IndexScheduler, HostRateLimiter, make_item
+    from scrapping_jppn_index import scrape_index_page
+    # Enough days to list `amount` links
+    days = max(1, -(-amount // config.articles_per_day))
+    items = []
+    for i in range(days):
+        day = FIRST_DAY + timedelta(days=i)
+        items.append(make_item(day.isoformat(), f"{base_url}/indeks?id=&d={day.day:02d}&m={day.month:02d}&y={day.year}&tab=all"))
+    latencies = []
+
+    async def fetch_page(page, item):
+        start_time = time.perf_counter()
+        result = await scrape_index_page(page, item)
+        latencies.append(time.perf_counter() - start_time)
+        return result
+
+    async with BrowserPool(size=concurrency) as pool:
+        scheduler = IndexScheduler(pool, fetch_page, workers=concurrency,
+                                   rate_limiter=HostRateLimiter(rate=10_000, burst=10_000),
+                                   policy=RetryPolicy(base_delay=0.05))
+        results_index = await scheduler.run(items, desc="Index pages")
+    # One result per article link found
+    results = [True for pages in results_index.values() for links in pages for _ in links]
+    return results, latencies
+
+
+BENCHMARKS = {
+    "tempo_http": bench_tempo_http,
+    "jpnn_pool": bench_jpnn_pool,
+    "jpnn_index": bench_jpnn_index,
+}
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run_config(name, concurrency, base_url, amount, config):
+    sampler = RssSampler()
+    sampler.start()
+    start_time = time.perf_counter()
+    results, latencies = await BENCHMARKS[name](base_url, concurrency, amount, config)
+    elapsed_time = time.perf_counter() - start_time
+    peak_rss = await sampler.stop()
+    succeeded = sum(1 for result in results if result)
+    return {
+        "config": f"{name}[{concurrency}]",
+        "articles": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed": round(elapsed_time, 3),
+        "articles_per_second": round(succeeded / elapsed_time, 2),
+        "p50": round(percentile(latencies, 0.5) or 0, 4),
+        "p99": round(percentile(latencies, 0.99) or 0, 4),
+        "peak_rss_mb": round(peak_rss / 1e6, 1) if peak_rss else None,
+    }
+
+
+def compare(results, baseline_path, max_regression):
+    """Print the change of articles/sec against a saved run. Returns False on a regression."""
+    with open(baseline_path) as f:
+        baseline = {result["config"]: result for result in json.load(f)}
+    ok = True
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get(result["config"])
+        if previous is None or not previous["articles_per_second"]:
+            continue
+        change = result["articles_per_second"] / previous["articles_per_second"] - 1
+        regression = change < -max_regression
+        ok = ok and not regression
+        print(f"{result['config'].ljust(16)}: {change:+.1%}{'  REGRESSION' if regression else ''}")
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against the local site simulator")
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="mean response delay in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--paragraphs", type=int, default=8, help="paragraphs per article page")
+    parser.add_argument("--configs", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with the results saved by an earlier run")
+    parser.add_argument("--max-regression", type=float, default=MAX_REGRESSION)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(latency=args.latency, error_rate=args.error_rate, paragraphs=args.paragraphs, seed=0)
+    server, base_url = start_fixture_server(config=config)
+    print(f"Simulator: latency {args.latency}s, error rate {args.error_rate:.0%}, "
+          f"{args.paragraphs} paragraphs/page, {args.articles} articles per configuration")
+
+    results = []
+    for name in args.configs:
+        for concurrency in CONCURRENCY_LEVELS[name]:
+            try:
+                result = await run_config(name, concurrency, base_url, args.articles, config)
+            except Exception as e:
+                # Ex: Chromium is not installed, the other configurations still run
+                print(f"{name}[{concurrency}]: skipped ({type(e).__name__}: {str(e).splitlines()[0]})")
+                continue
+            results.append(result)
+            print(f"{result['config'].ljust(16)}: {result['articles_per_second']:8.2f} articles/s, "
+                  f"p50 {result['p50'] * 1000:7.1f} ms, p99 {result['p99'] * 1000:7.1f} ms, "
+                  f"peak RSS {result['peak_rss_mb']} MB, failed {result['failed']}")
+    server.shutdown()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.save}")
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""
+Check & benchmark the tempo.co HTTP-first fetcher against the recorded pages
+served by the local fixture server.
+
+`article_static` has its JSON-LD in the raw HTML (HTTP path), `article_rendered`
+only injects it client-side (Playwright fallback path).
+Usage: python benchmark_tempo_fetcher.py [amount_of_requests]
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import asyncio
+import sys
+import time
+from fixture_server import start_fixture_server
+from tempo_fetcher import TempoFetcher
+
+EXPECTED = {
+    "article_static": {
+        "title": "Sebelum Meninggal, Gus Dur Sering Membicarakan PKB",
+        "date": "2009-12-31T10:15:00+07:00",
+        "genre": "Nasional",
+        "keyphrases": ["Gus Dur", "PKB", "Abdurrahman Wahid"],
+    },
+    "article_rendered": {
+        "title": "Jokowi Resmikan Tol Baru",
+        "date": "2023-01-05T08:00:00+07:00",
+        "genre": "Bisnis",
+        "keyphrases": ["Jokowi", "Tol"],
+    },
+}
+
+
+async def main():
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    server, base_url = start_fixture_server()
+
+    async with TempoFetcher() as fetcher:
+        for name, expected in EXPECTED.items():
+            url = f"{base_url}/tempo/{name}"
+            start_time = time.perf_counter()
+            results = await asyncio.gather(*[fetcher.fetch(url) for _ in range(amount)])
+            elapsed_time = time.perf_counter() - start_time
+
+            # Validate every extracted field
+            for result in results:
+                for key, value in expected.items():
+                    assert result[key] == value, f"{name}: {key} is {result[key]!r}, expected {value!r}"
+            print(f"{name.ljust(18)}: {amount} articles in {elapsed_time:.2f}s ({elapsed_time / amount * 1000:.1f} ms/article)")
+
+        print(f"Fetched over HTTP: {fetcher.stats['http']}, rendered with the browser: {fetcher.stats['browser']}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
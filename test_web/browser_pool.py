@@ -0,0 +1,133 @@
+"""
+A long-lived pool of Playwright browsers & pages shared by the scrapers.
+
+Instead of launching a new Chromium for every URL, the pool launches a few
+browsers once and hands out reusable pages. A page is recycled after it has
+been used `max_uses` times or when the scraping attempt using it failed.
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+
+
+def combine_hooks(*hooks):
+    """Run several on_new_page/on_new_context hooks one after another (None entries are skipped)."""
+    hooks = [hook for hook in hooks if hook is not None]
+    async def combined(target):
+        for hook in hooks:
+            await hook(target)
+    return combined
+
+
+class PageSlot:
+    """A pooled page together with the browser it belongs to and its use count."""
+    def __init__(self, browser_index, page):
+        self.browser_index = browser_index
+        self.page = page
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Pool of `size` pages spread over `browsers` Chromium processes.
+
+    Usage:
+        async with BrowserPool(size=7) as pool:
+            async with pool.page() as page:
+                await page.goto(url)
+    """
+    def __init__(self, size=7, browsers=1, max_uses=50, launch_options=None, on_new_page=None, on_new_context=None):
+        self.size = size
+        self.browsers = max(1, min(browsers, size))
+        self.max_uses = max_uses
+        self.launch_options = launch_options or {"headless": True}
+        # Optional coroutine function called with every newly created page (ex: stealth_async)
+        self.on_new_page = on_new_page
+        # Optional coroutine function called with every new browser context (ex: resource blocking)
+        self.on_new_context = on_new_context
+        self._playwright = None
+        self._browsers = []
+        self._contexts = []
+        self._relaunch_lock = asyncio.Lock()
+        self._idle = asyncio.Queue()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        for i in range(self.browsers):
+            await self._launch_browser(i)
+        # Spread the pages evenly across the browsers
+        for i in range(self.size):
+            browser_index = i % self.browsers
+            page = await self._new_page(browser_index)
+            self._idle.put_nowait(PageSlot(browser_index, page))
+
+    async def close(self):
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browsers.clear()
+        self._contexts.clear()
+        self._playwright = None
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page from the pool (waits when every page is in use)."""
+        slot = await self._idle.get()
+        failed = False
+        try:
+            yield slot.page
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            slot.uses += 1
+            try:
+                if failed or slot.uses >= self.max_uses or slot.page.is_closed():
+                    await self._recycle(slot)
+            finally:
+                # Always hand the slot back, otherwise the pool shrinks on errors
+                self._idle.put_nowait(slot)
+
+    async def _launch_browser(self, index):
+        browser = await self._playwright.chromium.launch(**self.launch_options)
+        context = await browser.new_context()
+        if self.on_new_context is not None:
+            await self.on_new_context(context)
+        if index < len(self._browsers):
+            self._browsers[index] = browser
+            self._contexts[index] = context
+        else:
+            self._browsers.append(browser)
+            self._contexts.append(context)
+
+    async def _new_page(self, browser_index):
+        page = await self._contexts[browser_index].new_page()
+        if self.on_new_page is not None:
+            await self.on_new_page(page)
+        return page
+
+    async def _recycle(self, slot):
+        try:
+            await slot.page.close()
+        except Exception:
+            pass
+        # Relaunch the browser if it has crashed (all of its pages are gone as well)
+        async with self._relaunch_lock:
+            if not self._browsers[slot.browser_index].is_connected():
+                await self._launch_browser(slot.browser_index)
+        slot.page = await self._new_page(slot.browser_index)
+        slot.uses = 0
@@ -0,0 +1,155 @@
+"""
+A durable crawl journal (SQLite in WAL mode) which records the state of every URL.
+
+States: pending -> in_flight -> done, or back to pending on failure until
+`max_attempts` is reached (then failed). URLs left in_flight by a crashed run are
+put back to pending when the journal is opened again, so a restarted script
+picks up exactly the remaining URLs. `requeue_failed` gives the failed URLs a
+fresh set of attempts (ex: after the site came back up).
+
+Several processes may share one journal when each one owns a shard of the
+URLs (`shard=(index, count)`, by CRC32 of the URL): claims & the crash
+recovery then only touch the URLs of that shard.
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import sqlite3
+import time
+import zlib
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+
+def shard_of(url, num_shards):
+    """Stable shard number of a URL (the same in every process & run)."""
+    return zlib.crc32(url.encode("utf-8")) % num_shards
+
+
+class CrawlJournal:
+    def __init__(self, path, max_attempts=3, shard=None):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.shard = shard
+        # Autocommit mode, every state change is committed right away
+        # (the timeout lets the processes of a sharded crawl wait for each other's writes)
+        self.conn = sqlite3.connect(path, isolation_level=None, timeout=60)
+        self.conn.create_function("shard_of", 2, shard_of, deterministic=True)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_urls_state ON urls (state)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.recover()
+
+    def close(self):
+        self.conn.close()
+
+    def recover(self):
+        """Put the URLs which were in flight when the previous run died back to pending."""
+        shard_filter, shard_params = self._shard_filter()
+        cursor = self.conn.execute(f"UPDATE urls SET state = ? WHERE state = ?{shard_filter}",
+                                   (PENDING, IN_FLIGHT, *shard_params))
+        return cursor.rowcount
+
+    def _shard_filter(self):
+        if self.shard is None:
+            return "", ()
+        index, count = self.shard
+        return " AND shard_of(url, ?) = ?", (count, index)
+
+    def add_urls(self, urls):
+        """Register new URLs as pending (already known URLs are ignored). Returns the amount added."""
+        before = self.conn.total_changes
+        # One transaction for the whole list instead of one per URL
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, updated_at) VALUES (?, ?)",
+                ((url, time.time()) for url in urls)
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.conn.total_changes - before
+
+    def claim(self, limit):
+        """Mark up to `limit` pending URLs as in flight and return them."""
+        shard_filter, shard_params = self._shard_filter()
+        rows = self.conn.execute(
+            f"""
+            UPDATE urls SET state = ?, updated_at = ?
+            WHERE url IN (SELECT url FROM urls WHERE state = ?{shard_filter} ORDER BY rowid LIMIT ?)
+            RETURNING url
+            """,
+            (IN_FLIGHT, time.time(), PENDING, *shard_params, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def mark_done(self, url):
+        self.conn.execute(
+            "UPDATE urls SET state = ?, attempts = attempts + 1, last_error = NULL, updated_at = ? WHERE url = ?",
+            (DONE, time.time(), url)
+        )
+
+    def mark_done_many(self, urls):
+        """Same as mark_done for a list of URLs, committed in one transaction."""
+        self.conn.execute("BEGIN")
+        try:
+            for url in urls:
+                self.mark_done(url)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def mark_failed(self, url, error=None, final=False):
+        """
+        Record a failed attempt, the URL is retried until it has used up `max_attempts`.
+        final=True fails it right away (ex: the caller already retried it or the error is permanent).
+        """
+        self.conn.execute(
+            """
+            UPDATE urls
+            SET attempts = attempts + 1,
+                state = CASE WHEN ? OR attempts + 1 >= ? THEN ? ELSE ? END,
+                last_error = ?, updated_at = ?
+            WHERE url = ?
+            """,
+            (final, self.max_attempts, FAILED, PENDING, str(error) if error is not None else None, time.time(), url)
+        )
+
+    def requeue_failed(self):
+        """Put the failed URLs back to pending with their attempts reset. Returns the amount requeued."""
+        shard_filter, shard_params = self._shard_filter()
+        cursor = self.conn.execute(
+            f"UPDATE urls SET state = ?, attempts = 0, updated_at = ? WHERE state = ?{shard_filter}",
+            (PENDING, time.time(), FAILED, *shard_params)
+        )
+        return cursor.rowcount
+
+    def counts(self):
+        """Amount of URLs in every state. Ex: {"pending": 10, "done": 5, ...}"""
+        counts = {PENDING: 0, IN_FLIGHT: 0, DONE: 0, FAILED: 0}
+        for state, count in self.conn.execute("SELECT state, COUNT(*) FROM urls GROUP BY state"):
+            counts[state] = count
+        return counts
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
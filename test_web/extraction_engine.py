@@ -0,0 +1,251 @@
+"""
+Declarative extraction engine for the news article pages.
+
+Every site has an extraction spec in `specs/<site>.json` mapping the output
+fields to a CSS selector (or to a path inside one of the `<head>` JSON-LD
+blocks) followed by post-processors. The same spec is evaluated either inside
+the browser with a single `page.evaluate` call (one IPC round trip instead of
+one per field), or with lxml on static HTML (HTTP fetches, cached pages).
+
+Spec format:
+    {
+        "site": "jpnn",
+        "wait_for": <Playwright selector awaited before extracting (optional)>,
+        "fields": {
+            "<name>": {
+                "selector": <CSS selector>,     or   "jsonld": <index>, "path": "<key.key>",
+                "all": <every match as a list>,     "index": <n-th match, default 0>,
+                "attr": <read an attribute instead of the text>,
+                "required": <raise SelectorMissingError when missing>,
+                "paginated": <concatenate the values of the next pages>,
+                "post": [<names of POST_PROCESSORS>]
+            }
+        },
+        "next_page": {"selector": <CSS selector>, "text": <link text>}   (optional)
+    }
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import json
+import os
+import time
+from functools import lru_cache
+from urllib.parse import urljoin
+from retry_policy import SelectorMissingError, check_response
+
+# lxml (+ cssselect) is only needed for the static HTML path
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+SPECS_DIR = os.path.join(os.path.dirname(__file__), "specs")
+JSONLD_SELECTOR = 'head > script[type="application/ld+json"]'
+# Upper bound of followed "Next" pages per article
+MAX_PAGES = 10
+
+# Indonesian -> English month names (for the date of the article)
+ID_ENG_MONTHS = {
+    "Januari": "January",
+    "Februari": "February",
+    "Maret": "March",
+    "April": "April",
+    "Mei": "May",
+    "Juni": "June",
+    "Juli": "July",
+    "Agustus": "August",
+    "September": "September",
+    "Oktober": "October",
+    "November": "November",
+    "Desember": "December"
+}
+
+
+def jpnn_date(value):
+    # Ex: "Minggu, 01 Januari 2023 – 10:15 WIB" -> "01 Januari 2023"
+    date_part = value.replace("\u2013", "-").split("-")[0]
+    return date_part.split(",")[1].strip()
+
+
+def id_months(value):
+    for id_month, eng_month in ID_ENG_MONTHS.items():
+        value = value.replace(id_month, eng_month)
+    return value
+
+
+POST_PROCESSORS = {
+    "strip": lambda value: value.strip(),
+    "join": lambda values: " ".join(values),
+    "jpnn_date": jpnn_date,
+    "id_months": id_months,
+}
+
+# Runs in the page: every selector field, the JSON-LD blocks & the next page link in one call
+EXTRACT_JS = """
+(spec) => {
+    const read = (el, field) => field.attr ? el.getAttribute(field.attr) : el.innerText;
+    const fields = {};
+    for (const [name, field] of Object.entries(spec.fields)) {
+        if (!field.selector) continue;
+        const elements = Array.from(document.querySelectorAll(field.selector));
+        if (field.all) {
+            fields[name] = elements.map((el) => read(el, field));
+        } else {
+            const el = elements[field.index || 0];
+            fields[name] = el ? read(el, field) : null;
+        }
+    }
+    const jsonld = Array.from(document.querySelectorAll(spec.jsonld_selector)).map((el) => el.textContent);
+    let next = null;
+    if (spec.next_page) {
+        const link = Array.from(document.querySelectorAll(spec.next_page.selector))
+            .find((el) => !spec.next_page.text || el.innerText.includes(spec.next_page.text));
+        next = link ? link.href : null;
+    }
+    return {fields, jsonld, next};
+}
+"""
+
+
+@lru_cache(maxsize=None)
+def load_spec(site):
+    """The spec of a site (`specs/<site>.json`)."""
+    with open(os.path.join(SPECS_DIR, f"{site}.json"), encoding="utf-8") as f:
+        spec = json.load(f)
+    unknown = {name for field in spec["fields"].values() for name in field.get("post", [])} - POST_PROCESSORS.keys()
+    if unknown:
+        raise ValueError(f"Unknown post-processors in the {site} spec: {sorted(unknown)}")
+    return spec
+
+
+def _js_spec(spec):
+    return {
+        "fields": {name: field for name, field in spec["fields"].items() if "selector" in field},
+        "jsonld_selector": JSONLD_SELECTOR,
+        "next_page": spec.get("next_page"),
+    }
+
+
+async def extract_page(page, spec):
+    """Raw values of an already loaded page: {"fields": {...}, "jsonld": [...], "next": url or None}."""
+    return await page.evaluate(EXTRACT_JS, _js_spec(spec))
+
+
+@lru_cache(maxsize=None)
+def _css(selector):
+    return CSSSelector(selector)
+
+
+def extract_html(html, spec, base_url=None):
+    """Same as extract_page, evaluated with lxml on static HTML."""
+    if not LXML_AVAILABLE:
+        raise ImportError("lxml and cssselect are required to extract static HTML")
+    root = lxml.html.fromstring(html)
+
+    def read(el, field):
+        return el.get(field["attr"]) if field.get("attr") else el.text_content()
+
+    fields = {}
+    for name, field in _js_spec(spec)["fields"].items():
+        elements = _css(field["selector"])(root)
+        if field.get("all"):
+            fields[name] = [read(el, field) for el in elements]
+        else:
+            index = field.get("index", 0)
+            fields[name] = read(elements[index], field) if index < len(elements) else None
+
+    jsonld = [el.text_content() for el in _css(JSONLD_SELECTOR)(root)]
+
+    next_url = None
+    next_page = spec.get("next_page")
+    if next_page:
+        for el in _css(next_page["selector"])(root):
+            if not next_page.get("text") or next_page["text"] in el.text_content():
+                next_url = urljoin(base_url or "", el.get("href", ""))
+                break
+    return {"fields": fields, "jsonld": jsonld, "next": next_url}
+
+
+def _jsonld_value(jsonld, field):
+    index = field["jsonld"]
+    if index >= len(jsonld):
+        return None
+    value = json.loads(jsonld[index])
+    for key in field["path"].split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def finalize(url, raw_pages, spec):
+    """
+    Build the article from the raw values of its pages: paginated fields are
+    concatenated, JSON-LD paths resolved and the post-processors applied.
+    Raises SelectorMissingError when a required field is missing.
+    """
+    first = raw_pages[0]
+    article_content = {"url": url}
+    for name, field in spec["fields"].items():
+        if "jsonld" in field:
+            value = _jsonld_value(first["jsonld"], field)
+        elif field.get("paginated"):
+            value = [item for raw in raw_pages for item in raw["fields"][name]]
+        else:
+            value = first["fields"][name]
+        if field.get("required") and value in (None, [], ""):
+            raise SelectorMissingError(f"{name} is missing on {url}")
+        if value is not None:
+            for post in field.get("post", []):
+                value = POST_PROCESSORS[post](value)
+        article_content[name] = value
+    return article_content
+
+
+async def extract_article(page, url, spec, timeout=60000, timings=None):
+    """
+    Load an article (and its next pages) in a Playwright page and extract it.
+    The seconds spent on navigation, dom_wait & extraction are added to `timings` (a dict) when given.
+    """
+    timings = timings if timings is not None else {}
+    raw_pages = []
+    visited = set()
+    next_url = url
+    while next_url and next_url not in visited and len(raw_pages) < MAX_PAGES:
+        visited.add(next_url)
+        start_time = time.perf_counter()
+        response = await page.goto(next_url, timeout=timeout, wait_until="domcontentloaded")
+        check_response(response, next_url)
+        timings["navigation"] = timings.get("navigation", 0) + time.perf_counter() - start_time
+        if spec.get("wait_for"):
+            start_time = time.perf_counter()
+            await page.wait_for_selector(spec["wait_for"], state="attached", timeout=timeout)
+            timings["dom_wait"] = timings.get("dom_wait", 0) + time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        raw = await extract_page(page, spec)
+        timings["extraction"] = timings.get("extraction", 0) + time.perf_counter() - start_time
+        raw_pages.append(raw)
+        next_url = raw["next"]
+    timings["pages"] = len(raw_pages)
+    return finalize(url, raw_pages, spec)
+
+
+def extract_static(url, html, spec, fetch_html=None):
+    """
+    Extract an article from static HTML. The next pages are only followed when
+    `fetch_html(url)` is given (ex: HtmlCache.get), it returns the HTML or None.
+    """
+    raw_pages = [extract_html(html, spec, base_url=url)]
+    visited = {url}
+    next_url = raw_pages[-1]["next"]
+    while fetch_html is not None and next_url and next_url not in visited and len(raw_pages) < MAX_PAGES:
+        visited.add(next_url)
+        next_html = fetch_html(next_url)
+        if next_html is None:
+            break
+        raw_pages.append(extract_html(next_html, spec, base_url=next_url))
+        next_url = raw_pages[-1]["next"]
+    return finalize(url, raw_pages, spec)
@@ -0,0 +1,250 @@
+"""
+A local HTML fixture server that imitates the pages our scrapers read.
+
+Used by the benchmarks so that scraper performance can be measured without
+hitting the live news sites. Besides the recorded fixtures it simulates:
+    /indeks?id=&d=01&m=01&y=2023&tab=all   jpnn daily index (paginated with "Next")
+    /news/<id>[?page=2]                     jpnn article (odd ids span several pages)
+    /tempo/indeks/2023-01-01/               tempo daily index
+    /tempo/read/<id>                        tempo article (JSON-LD in the raw HTML)
+Latency, error rate & page sizes come from a SimulatorConfig.
+
+Point the scrapers at it with the environment variables:
+    JPNN_INDEX_URL=http://127.0.0.1:8765/indeks
+    TEMPO_INDEX_URL=http://127.0.0.1:8765/tempo/indeks/
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import date
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+SCRIPT_DIR = os.path.dirname(__file__)
+# Recorded tempo.co article pages
+TEMPO_FIXTURE_DIR = os.path.join(SCRIPT_DIR, "fixtures", "tempo")
+
+# Amount of paragraphs rendered on every page of a jpnn article
+PARAGRAPHS_PER_PAGE = 8
+
+ID_MONTHS = ["Januari", "Februari", "Maret", "April", "Mei", "Juni", "Juli",
+             "Agustus", "September", "Oktober", "November", "Desember"]
+GENRES = ["Politik", "Ekonomi", "Olahraga", "Hiburan", "Teknologi"]
+
+
+class SimulatorConfig:
+    """
+    Behaviour of the simulated sites.
+
+    latency: mean response delay in seconds (uniform between 0 and twice the mean)
+    error_rate: share of the requests answered with a 503
+    paragraphs: paragraphs per article page (page size)
+    article_pages: pages of every odd jpnn article (even ones have a single page)
+    articles_per_day / links_per_page: size of the daily index & of one index page
+    """
+    def __init__(self, latency=0.0, error_rate=0.0, paragraphs=PARAGRAPHS_PER_PAGE, article_pages=2,
+                 articles_per_day=60, links_per_page=20, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.paragraphs = paragraphs
+        self.article_pages = article_pages
+        self.articles_per_day = articles_per_day
+        self.links_per_page = links_per_page
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self):
+        with self.lock:
+            return self.random.uniform(0, 2 * self.latency) if self.latency else 0
+
+    def fails(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+
+def render_jpnn_article(article_id, page_num, paragraphs=PARAGRAPHS_PER_PAGE, article_pages=2):
+    paragraph_tags = "\n".join(
+        f"<p>Paragraf {i + 1} halaman {page_num} dari artikel {article_id}. Lorem ipsum dolor sit amet.</p>"
+        for i in range(paragraphs)
+    )
+    # Every odd article is split into several pages (linked with a "Next" button)
+    pagination = ""
+    if article_id % 2 == 1 and page_num < article_pages:
+        pagination = f'<div class="pagination"><a href="/news/{article_id}?page={page_num + 1}">Next</a></div>'
+    return f"""<!DOCTYPE html>
+<html>
+<head><title>Artikel {article_id}</title></head>
+<body>
+  <div class="breadcrumb"><a href="/">Home</a><a href="/politik">Politik</a></div>
+  <h1 class="judul">Judul artikel {article_id}</h1>
+  <span class="date-publish">Minggu, 01 Januari 2023 \u2013 10:{article_id % 60:02d} WIB</span>
+  <div class="text-center relative"><p>Ringkasan artikel {article_id}</p></div>
+  <div itemprop="articleBody">
+{paragraph_tags}
+  </div>
+  {pagination}
+  <div class="tags"><a class="text-tags">Tags</a><a href="/tag/a">Pemilu</a><a href="/tag/b">Jakarta</a></div>
+</body>
+</html>"""
+
+
+def day_article_ids(day, articles_per_day):
+    """Stable article ids of a day (ex: date(2023, 1, 1))."""
+    first_id = day.toordinal() * articles_per_day
+    return range(first_id, first_id + articles_per_day)
+
+
+def render_jpnn_index(base_url, day, page_num, articles_per_day, links_per_page):
+    # Ex: /indeks?id=&d=01&m=01&y=2023&tab=all&page=2, like jpnn.com's daily index
+    ids = list(day_article_ids(day, articles_per_day))
+    page_ids = ids[(page_num - 1) * links_per_page:page_num * links_per_page]
+    links = "\n".join(f'  <div class="item"><h1><a href="{base_url}/news/{article_id}">Judul artikel {article_id}</a></h1></div>'
+                      for article_id in page_ids)
+    pagination = ""
+    if page_num * links_per_page < len(ids):
+        pagination = (f'<div class="pagination"><a href="/indeks?id=&d={day.day:02d}&m={day.month:02d}'
+                      f'&y={day.year}&tab=all&page={page_num + 1}">Next</a></div>')
+    return f"""<!DOCTYPE html>
+<html>
+<head><title>Indeks Berita {day.isoformat()}</title></head>
+<body>
+{links}
+  {pagination}
+</body>
+</html>"""
+
+
+def render_tempo_index(base_url, day, articles_per_day):
+    # Ex: /tempo/indeks/2023-01-01/, tempo.co lists a whole day on one page
+    cards = "\n".join(
+        f"""  <article class="text-card">
+    <h2 class="title"><a href="{base_url}/tempo/read/{article_id}">Berita {article_id}</a></h2>
+    <p>Ringkasan berita {article_id}</p>
+    <p class="date">{day.isoformat()}</p>
+  </article>"""
+        for article_id in day_article_ids(day, articles_per_day)
+    )
+    return f"""<!DOCTYPE html>
+<html>
+<head><title>Indeks {day.isoformat()} - Tempo.co</title></head>
+<body>
+{cards}
+</body>
+</html>"""
+
+
+def render_tempo_article(article_id, paragraphs=PARAGRAPHS_PER_PAGE, articles_per_day=60):
+    day = date.fromordinal(max(1, article_id // articles_per_day))
+    genre = GENRES[article_id % len(GENRES)]
+    body = " ".join(f"Paragraf {i + 1} dari berita {article_id}. Lorem ipsum dolor sit amet." for i in range(paragraphs))
+    news_article = json.dumps({
+        "@context": "https://schema.org",
+        "@type": "NewsArticle",
+        "headline": f"Berita {article_id}",
+        "datePublished": f"{day.isoformat()}T10:00:00+07:00",
+        "articleBody": body,
+        "keywords": [genre, "Jakarta"],
+    })
+    return f"""<!DOCTYPE html>
+<html lang="id">
+<head>
+  <meta charset="utf-8">
+  <title>Berita {article_id} - Tempo.co</title>
+  <script type="application/ld+json">{{"@context": "https://schema.org", "@type": "WebSite", "name": "Tempo.co"}}</script>
+  <script type="application/ld+json">{news_article}</script>
+</head>
+<body>
+  <ul class="sitemap">
+    <li><a href="/"><span itemprop="name">Home</span></a></li>
+    <li><a href="/{genre.lower()}"><span itemprop="name">{genre}</span></a></li>
+  </ul>
+  <article>
+    <h1 class="title">Berita {article_id}</h1>
+    {"".join(f"<p>{paragraph}.</p>" for paragraph in body.split(". ") if paragraph)}
+  </article>
+</body>
+</html>"""
+
+
+def parse_day(query):
+    return date(int(query["y"][0]), int(query["m"][0]), int(query["d"][0]))
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        config = self.server.config
+        delay = config.delay()
+        if delay:
+            time.sleep(delay)
+        if config.fails():
+            self.send_error(503)
+            return
+
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query, keep_blank_values=True)
+        parts = parsed.path.strip("/").split("/")
+        page_num = int(query.get("page", ["1"])[0])
+        base_url = f"http://{self.headers.get('Host')}"
+        if len(parts) == 2 and parts[0] == "news" and parts[1].isdigit():
+            self._send_html(render_jpnn_article(int(parts[1]), page_num, config.paragraphs, config.article_pages))
+        elif parts == ["indeks"] and {"d", "m", "y"} <= query.keys():
+            self._send_html(render_jpnn_index(base_url, parse_day(query), page_num,
+                                              config.articles_per_day, config.links_per_page))
+        elif len(parts) == 3 and parts[:2] == ["tempo", "indeks"]:
+            self._send_html(render_tempo_index(base_url, date.fromisoformat(parts[2]), config.articles_per_day))
+        elif len(parts) == 3 and parts[:2] == ["tempo", "read"] and parts[2].isdigit():
+            self._send_html(render_tempo_article(int(parts[2]), config.paragraphs, config.articles_per_day))
+        elif len(parts) == 2 and parts[0] == "tempo":
+            # Ex: /tempo/article_static serves fixtures/tempo/article_static.html
+            file_path = os.path.join(TEMPO_FIXTURE_DIR, f"{os.path.basename(parts[1])}.html")
+            if not os.path.exists(file_path):
+                self.send_error(404)
+                return
+            with open(file_path, encoding="utf-8") as f:
+                self._send_html(f.read())
+        else:
+            self.send_error(404)
+
+    def _send_html(self, html, status=200):
+        body = html.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the benchmark output clean
+        pass
+
+
+def start_fixture_server(host="127.0.0.1", port=0, config=None):
+    """Start the server on a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.config = config or SimulatorConfig()
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the simulated jpnn/tempo sites")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response delay in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--paragraphs", type=int, default=PARAGRAPHS_PER_PAGE)
+    args = parser.parse_args()
+    config = SimulatorConfig(latency=args.latency, error_rate=args.error_rate, paragraphs=args.paragraphs)
+    server, base_url = start_fixture_server(port=args.port, config=config)
+    print(f"Serving fixture pages on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,196 @@
+"""
+Content-addressed on-disk cache of the raw HTML fetched by the scrapers.
+
+Pages are stored gzip compressed under their SHA-256 (identical pages are only
+stored once) in `objects/<2 chars>/<digest>.html.gz`. A SQLite index maps every
+(url, fetch time) to a digest. Old fetches expire after `ttl` seconds and the
+least recently used pages are evicted once the cache grows over `max_bytes`.
+
+With the cache filled, the extractors can run again offline ("replay"), ex:
+after a selector changed, without crawling the site again:
+    python scrapping_jppn_individual.py --replay
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+
+
+class HtmlCache:
+    def __init__(self, cache_dir, max_bytes=5 * 1024**3, ttl=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fetches (
+                url TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (url, fetched_at)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_fetches_digest ON fetches (digest)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], f"{digest}.html.gz")
+
+    def put(self, url, html, fetched_at=None):
+        """Store the HTML of a URL. Returns its digest."""
+        data = html.encode("utf-8") if isinstance(html, str) else html
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        fetched_at = fetched_at if fetched_at is not None else now
+
+        row = self.conn.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            blob_path = self._blob_path(digest)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            compressed = gzip.compress(data, compresslevel=6)
+            # Write to a temporary file first so a crash never leaves a truncated page behind
+            tmp_path = f"{blob_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, blob_path)
+            self.conn.execute("INSERT INTO blobs (digest, size, last_access) VALUES (?, ?, ?)",
+                              (digest, len(compressed), now))
+            self._total_bytes += len(compressed)
+        else:
+            self.conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (now, digest))
+        self.conn.execute("INSERT OR REPLACE INTO fetches (url, fetched_at, digest) VALUES (?, ?, ?)",
+                          (url, fetched_at, digest))
+
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+        return digest
+
+    def get(self, url, max_age=None):
+        """The most recently fetched HTML of a URL (not older than `max_age` seconds), or None."""
+        row = self.conn.execute(
+            "SELECT digest, fetched_at FROM fetches WHERE url = ? ORDER BY fetched_at DESC LIMIT 1", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        digest, fetched_at = row
+        # The cache ttl applies on every read, not only when evict() runs
+        if self.ttl is not None:
+            max_age = self.ttl if max_age is None else min(max_age, self.ttl)
+        if max_age is not None and time.time() - fetched_at > max_age:
+            return None
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                data = gzip.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        self.conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        return data.decode("utf-8", errors="replace")
+
+    def _oldest_fetch(self):
+        # Fetches older than this are expired (-inf without ttl)
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    def has(self, url):
+        """True when the URL has a fetch which did not expire yet."""
+        return self.conn.execute(
+            "SELECT 1 FROM fetches WHERE url = ? AND fetched_at >= ? LIMIT 1", (url, self._oldest_fetch())
+        ).fetchone() is not None
+
+    def urls(self):
+        """Every cached URL (with a fetch which did not expire yet)."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT url FROM fetches WHERE fetched_at >= ?", (self._oldest_fetch(),)
+        )]
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def evict(self):
+        """Drop expired fetches, then the least recently used pages until the cache fits in max_bytes."""
+        self.conn.execute("BEGIN")
+        try:
+            if self.ttl is not None:
+                self.conn.execute("DELETE FROM fetches WHERE fetched_at < ?", (time.time() - self.ttl,))
+            # Pages which no fetch points to anymore
+            orphans = self.conn.execute(
+                "SELECT digest, size FROM blobs WHERE digest NOT IN (SELECT digest FROM fetches)"
+            ).fetchall()
+            removed = list(orphans)
+            target = self.max_bytes * 0.9
+            remaining = self._total_bytes - sum(size for _, size in orphans)
+            if remaining > target:
+                for digest, size in self.conn.execute(
+                    "SELECT digest, size FROM blobs WHERE digest IN (SELECT digest FROM fetches) ORDER BY last_access"
+                ):
+                    if remaining <= target:
+                        break
+                    removed.append((digest, size))
+                    remaining -= size
+            for digest, size in removed:
+                self.conn.execute("DELETE FROM fetches WHERE digest = ?", (digest,))
+                self.conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        # The files are only deleted once the index no longer points to them
+        for digest, size in removed:
+            try:
+                os.remove(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+        return len(removed)
+
+
+def recording_hook(cache):
+    """An `on_new_context` hook for BrowserPool which stores every fetched HTML document in the cache."""
+    async def hook(context):
+        async def store_response(response):
+            if response.request.resource_type != "document" or response.status != 200:
+                return
+            try:
+                cache.put(response.url, await response.text())
+            except Exception:
+                # The page may have navigated away before its body could be read
+                pass
+        context.on("response", store_response)
+    return hook
+
+
+def replay_hook(cache):
+    """
+    An `on_new_context` hook for BrowserPool which serves documents from the
+    cache and never touches the network (every other request is aborted).
+    """
+    async def hook(context):
+        async def serve_from_cache(route):
+            request = route.request
+            if request.resource_type == "document":
+                html = cache.get(request.url)
+                if html is not None:
+                    await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=html)
+                    return
+                await route.fulfill(status=404, body="Not in cache")
+                return
+            await route.abort()
+        await context.route("**/*", serve_from_cache)
+    return hook
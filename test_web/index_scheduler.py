@@ -0,0 +1,182 @@
+"""
+Scheduler for the index crawlers.
+
+Every (day, page) index fetch is a work item. The items of all years run
+through one bounded queue served by a fixed amount of workers that borrow pages
+from a BrowserPool. Politeness is enforced by a per-host token bucket instead
+of fixed sleeps between years.
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import asyncio
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+from tqdm.asyncio import tqdm
+from retry_policy import RetryPolicy, classify_error
+
+
+def make_item(key, url, page=1):
+    """A work item. `key` groups the pages of one day (ex: "2023-01-31")."""
+    return {"key": key, "url": url, "page": page, "attempts": 0}
+
+
+class HostRateLimiter:
+    """Token bucket per host: at most `rate` requests/second with bursts of `burst`."""
+    def __init__(self, rate=2.0, burst=4):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = {}
+        self._updated = {}
+        self._locks = defaultdict(asyncio.Lock)
+
+    async def wait(self, url):
+        host = urlparse(url).netloc
+        async with self._locks[host]:
+            while True:
+                now = time.monotonic()
+                tokens = self._tokens.get(host, self.burst)
+                elapsed = now - self._updated.get(host, now)
+                tokens = min(self.burst, tokens + elapsed * self.rate)
+                self._updated[host] = now
+                if tokens >= 1:
+                    self._tokens[host] = tokens - 1
+                    return
+                self._tokens[host] = tokens
+                await asyncio.sleep((1 - tokens) / self.rate)
+
+
+class IndexScheduler:
+    """
+    Runs index work items with `workers` concurrent pages.
+
+    `fetch_page(page, item)` is the site specific coroutine. It returns a tuple
+    (result, next_url) where next_url is the URL of the next index page of the
+    same day or None. The follow-up page becomes a new work item.
+
+    Failed items are retried according to `policy` (with backoff, without
+    blocking a worker) and `breakers` lowers the concurrency per host when its
+    error rate climbs. Items the policy gives up on end up in `failed_items`.
+
+    `on_result(item, result)` is awaited for every fetched page as soon as it
+    is available (ex: to hand the links to the article stage). With
+    `keep_results=False` the results are not collected and run() returns {}.
+    """
+    def __init__(self, pool, fetch_page, workers=12, rate_limiter=None, queue_size=100, policy=None, breakers=None,
+                 on_result=None, keep_results=True):
+        self.pool = pool
+        self.fetch_page = fetch_page
+        self.workers = workers
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.queue_size = queue_size
+        self.policy = policy or RetryPolicy()
+        self.breakers = breakers
+        self.on_result = on_result
+        self.keep_results = keep_results
+        self.failed_items = []
+
+    async def run(self, items, desc="Index pages"):
+        """Returns {key: [result of page 1, result of page 2, ...]}."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # Follow-up pages & retries go to an unbounded queue, otherwise workers could block each other
+        self._follow_up = asyncio.Queue()
+        self._outstanding = 0
+        self._feeding = True
+        self._all_done = asyncio.Event()
+        self._results = defaultdict(dict)
+        self._retry_tasks = set()
+        self._pbar = tqdm(total=0, desc=desc)
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        for item in items:
+            self._add(1)
+            await self._queue.put(item)
+        self._feeding = False
+        if self._outstanding == 0:
+            self._all_done.set()
+        await self._all_done.wait()
+
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._pbar.close()
+
+        return {key: [pages[page] for page in sorted(pages)] for key, pages in self._results.items()}
+
+    def _add(self, amount):
+        self._outstanding += amount
+        self._pbar.total += amount
+        self._pbar.refresh()
+
+    def _finish(self):
+        self._outstanding -= 1
+        self._pbar.update(1)
+        if self._outstanding == 0 and not self._feeding:
+            self._all_done.set()
+
+    async def _next_item(self):
+        if not self._follow_up.empty():
+            return self._follow_up.get_nowait()
+        get_main = asyncio.create_task(self._queue.get())
+        get_follow_up = asyncio.create_task(self._follow_up.get())
+        done, pending = await asyncio.wait([get_main, get_follow_up], return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        # Put back an item that was taken by the losing task in the meantime
+        items = [task.result() for task in done]
+        for item in items[1:]:
+            self._follow_up.put_nowait(item)
+        return items[0]
+
+    async def _retry_later(self, item, delay):
+        await asyncio.sleep(delay)
+        self._follow_up.put_nowait(item)
+
+    async def _worker(self):
+        while True:
+            item = await self._next_item()
+            breaker = self.breakers.get(item["url"]) if self.breakers is not None else None
+            try:
+                if breaker is not None:
+                    await breaker.acquire()
+                success = False
+                try:
+                    await self.rate_limiter.wait(item["url"])
+                    async with self.pool.page() as page:
+                        result, next_url = await self.fetch_page(page, item)
+                    success = True
+                finally:
+                    if breaker is not None:
+                        await breaker.release(success)
+                if self.keep_results:
+                    self._results[item["key"]][item["page"]] = result
+                if next_url:
+                    self._add(1)
+                    self._follow_up.put_nowait(make_item(item["key"], next_url, item["page"] + 1))
+            except Exception as e:
+                item["attempts"] += 1
+                item["error_class"] = classify_error(e)
+                if self.policy.should_retry(item["error_class"], item["attempts"]):
+                    delay = self.policy.delay(item["attempts"], item["error_class"])
+                    tqdm.write(f"{item['error_class']} on {item['url']}. Retry attempt no: {item['attempts']}. Retrying after {delay:.1f} seconds...")
+                    self._add(1)
+                    # The worker moves on to the next item while this one waits for its backoff
+                    retry_task = asyncio.create_task(self._retry_later(item, delay))
+                    self._retry_tasks.add(retry_task)
+                    retry_task.add_done_callback(self._retry_tasks.discard)
+                else:
+                    tqdm.write(f"Giving up on {item['url']} after {item['attempts']} attempts ({item['error_class']})")
+                    self.failed_items.append(item)
+            else:
+                # A slow consumer blocks this worker (backpressure on the index crawl)
+                if self.on_result is not None:
+                    try:
+                        await self.on_result(item, result)
+                    except Exception as e:
+                        # A failing consumer must not kill the worker, the crawl would wait for it forever
+                        item["error_class"] = classify_error(e)
+                        tqdm.write(f"Result of {item['url']} could not be processed ({type(e).__name__}: {e})")
+                        self.failed_items.append(item)
+            finally:
+                self._finish()
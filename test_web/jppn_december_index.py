@@ -7,6 +7,7 @@ Date: 22 September 2024
 import os
 import asyncio
 from playwright.async_api import async_playwright
+from url_filter import UrlIndex
 import pandas as pd
 from datetime import datetime, timedelta
 from tqdm.asyncio import tqdm
@@ -19,7 +20,10 @@ import re
 # Global Constants
 SCRIPT_DIR = os.path.dirname(__file__)
 RESULT_DIR = f"{SCRIPT_DIR}/scrapping_result/"
-BASE_URL = "https://www.jpnn.com/indeks"
+# Overridable to point the crawl at the local simulator (see fixture_server.py)
+BASE_URL = os.environ.get("JPNN_INDEX_URL", "https://www.jpnn.com/indeks")
+# Shared with scrapping_jppn_index.py, links of the full-year runs are dropped
+URL_INDEX_DIR = f"{RESULT_DIR}url_index/jpnn"
 
 # Create a semaphore to limit concurrent tasks
 # sem = asyncio.Semaphore(10)
@@ -102,15 +106,18 @@ async def main():
         results_index = await asyncio.gather(*tasks_index) 
         elapsed_time_index = time.perf_counter() - start_time_index
 
-        # Flatten list
+        # Flatten list & drop the links which are already in an index file
         all_links = list(chain.from_iterable(results_index))
-        
-        # Saving to dataframe
+        # Saving to dataframe (appended, the index file keeps the links of the earlier runs)
         file_name = f"{RESULT_DIR}december_jppn_index_{year}.csv"
-        df = pd.DataFrame({
-            "url": all_links     
-        })    
-        df.to_csv(file_name, index=False)
+        with UrlIndex(URL_INDEX_DIR) as url_index:
+            all_links = url_index.filter_new(all_links, record=False)
+            df = pd.DataFrame({
+                "url": all_links     
+            })    
+            df.to_csv(file_name, index=False, mode="a", header=not os.path.exists(file_name))
+            # Marked seen only once they are in the index file, a failed write does not lose them
+            url_index.add_many(all_links)
 
         # Final Reporting
         sys.stdout.flush()    
@@ -0,0 +1,81 @@
+"""
+Pipelined index -> article crawl.
+
+The index pages and the articles no longer run as two batch phases: every
+index page hands its links to a bounded queue as soon as it is fetched and the
+article workers start right away. A full queue blocks the index workers
+(backpressure), so memory stays flat however many links a month has, and the
+time for a month becomes roughly max(index, articles) instead of their sum.
+
+Usage:
+    scheduler = IndexScheduler(index_pool, scrape_index_page, keep_results=False)
+    pipeline = IndexArticlePipeline(scheduler, scrape_article, links_of=lambda item, links: links)
+    stats = await pipeline.run(month_items(2023, 1))
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import asyncio
+from tqdm.asyncio import tqdm
+
+
+class IndexArticlePipeline:
+    """
+    `links_of(item, result)` turns the result of an index page into article
+    work (ex: the new URLs only), `handle_article(work)` processes one of them
+    and returns True on success. `backlog` is work left over by an earlier run,
+    it is fed alongside the index crawl.
+    """
+    def __init__(self, scheduler, handle_article, links_of, workers=7, queue_size=500):
+        self.scheduler = scheduler
+        self.handle_article = handle_article
+        self.links_of = links_of
+        self.workers = workers
+        self.queue_size = queue_size
+        self.stats = {"queued": 0, "succeeded": 0, "failed": 0}
+
+    async def run(self, items, backlog=(), desc="Index pages"):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pbar = tqdm(total=0, desc="Articles")
+        self.scheduler.on_result = self._enqueue_links
+        consumers = [asyncio.create_task(self._consumer()) for _ in range(self.workers)]
+
+        try:
+            await asyncio.gather(self._feed(backlog), self.scheduler.run(items, desc=desc))
+            # One stop signal per consumer, queued behind the remaining work
+            for _ in consumers:
+                await self._queue.put(None)
+            await asyncio.gather(*consumers)
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+            self._pbar.close()
+        return self.stats
+
+    async def _put(self, work):
+        self.stats["queued"] += 1
+        self._pbar.total += 1
+        self._pbar.refresh()
+        await self._queue.put(work)
+
+    async def _feed(self, backlog):
+        for work in backlog:
+            await self._put(work)
+
+    async def _enqueue_links(self, item, result):
+        for work in self.links_of(item, result):
+            await self._put(work)
+
+    async def _consumer(self):
+        while True:
+            work = await self._queue.get()
+            if work is None:
+                return
+            try:
+                success = await self.handle_article(work)
+            except Exception as e:
+                # A broken article never stops the pipeline
+                tqdm.write(f"Article stage failed on {work}: {e!r}")
+                success = False
+            self.stats["succeeded" if success else "failed"] += 1
+            self._pbar.update(1)
@@ -0,0 +1,219 @@
+"""
+One retry policy shared by all the scrapers.
+
+- Exponential backoff with full jitter instead of fixed sleeps.
+- Errors are classified (timeout, http_4xx, http_5xx, throttled,
+  selector_missing, other). A 404 or a missing selector is not retried
+  over and over like a timeout is.
+- A per-host circuit breaker which lowers the allowed concurrency when the
+  error rate of a host climbs (and opens completely for a cool-down period
+  when it is very high), then slowly raises it again once requests succeed.
+
+Usage:
+    policy = RetryPolicy()
+    breakers = CircuitBreakerRegistry(max_concurrency=7)
+    article_content = await run_with_retry(lambda: fetch(url), url, policy, breakers)
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from urllib.parse import urlparse
+from tqdm.asyncio import tqdm
+
+try:
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    PlaywrightTimeoutError = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class HttpStatusError(Exception):
+    """Raised by a scraper when the page answered with an error status code."""
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+class SelectorMissingError(Exception):
+    """Raised by a scraper when an element it needs is not on the page."""
+
+
+class RetryError(Exception):
+    """Raised when every attempt failed (or the error is not retryable)."""
+    def __init__(self, url, error_class, attempts, last_error):
+        super().__init__(f"{url} failed after {attempts} attempt(s): {error_class} ({last_error})")
+        self.url = url
+        self.error_class = error_class
+        self.attempts = attempts
+        self.last_error = last_error
+
+
+def check_response(response, url):
+    """Raise HttpStatusError for a 4xx/5xx Playwright/httpx response."""
+    status = getattr(response, "status", None) or getattr(response, "status_code", None)
+    if status is not None and status >= 400:
+        raise HttpStatusError(status, url)
+
+
+def classify_error(error):
+    if isinstance(error, HttpStatusError):
+        status = error.status
+    elif httpx is not None and isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    else:
+        status = None
+    if status is not None:
+        if status == 429:
+            return "throttled"
+        return "http_4xx" if status < 500 else "http_5xx"
+    if isinstance(error, SelectorMissingError):
+        return "selector_missing"
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if PlaywrightTimeoutError is not None and isinstance(error, PlaywrightTimeoutError):
+        return "timeout"
+    if httpx is not None and isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    return "other"
+
+
+class RetryPolicy:
+    """
+    `max_attempts` per error class (an error class missing from `retryable`
+    is not retried at all). Delays grow as base_delay * 2^attempt capped at
+    max_delay, with full jitter.
+    """
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=60.0, retryable=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable or {
+            "timeout": max_attempts,
+            "throttled": max_attempts,
+            "http_5xx": max_attempts,
+            "other": max_attempts,
+            # The element may just not be rendered yet, try once more
+            "selector_missing": 2,
+        }
+
+    def should_retry(self, error_class, attempt):
+        return attempt < self.retryable.get(error_class, 1)
+
+    def delay(self, attempt, error_class=None):
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        # Throttling means the site wants us to slow down a lot more
+        if error_class == "throttled":
+            delay = min(self.max_delay, delay * 4)
+        return random.uniform(0, delay)
+
+
+class CircuitBreaker:
+    """
+    Adaptive concurrency limit of one host.
+
+    The error rate is computed over the last `window` requests. Above
+    `slow_down_rate` the limit is halved, above `open_rate` the breaker opens
+    and no request is let through for `cool_down` seconds. Every success
+    raises the limit by one again (up to `max_concurrency`).
+    """
+    def __init__(self, max_concurrency=10, window=20, slow_down_rate=0.3, open_rate=0.7, cool_down=30.0):
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.window = window
+        self.slow_down_rate = slow_down_rate
+        self.open_rate = open_rate
+        self.cool_down = cool_down
+        self.in_flight = 0
+        self.opened_until = 0.0
+        self._outcomes = deque(maxlen=window)
+        self._condition = asyncio.Condition()
+
+    @property
+    def error_rate(self):
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    async def acquire(self):
+        while True:
+            # While the breaker is open nobody gets through
+            wait_open = self.opened_until - time.monotonic()
+            if wait_open > 0:
+                await asyncio.sleep(wait_open)
+                continue
+            async with self._condition:
+                if self.opened_until > time.monotonic():
+                    continue
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                await self._condition.wait()
+
+    async def release(self, success):
+        async with self._condition:
+            self.in_flight -= 1
+            self._outcomes.append(success)
+            if success:
+                self.limit = min(self.max_concurrency, self.limit + 1)
+            elif len(self._outcomes) >= self.window // 2:
+                if self.error_rate >= self.open_rate:
+                    self.opened_until = time.monotonic() + self.cool_down
+                    self.limit = 1
+                    self._outcomes.clear()
+                elif self.error_rate >= self.slow_down_rate:
+                    self.limit = max(1, self.limit // 2)
+            self._condition.notify_all()
+
+
+class CircuitBreakerRegistry:
+    """One CircuitBreaker per host."""
+    def __init__(self, **breaker_options):
+        self.breaker_options = breaker_options
+        self._breakers = {}
+
+    def get(self, url):
+        host = urlparse(url).netloc
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(**self.breaker_options)
+        return self._breakers[host]
+
+
+async def run_with_retry(attempt_factory, url, policy=None, breakers=None, on_retry=None):
+    """
+    Run `attempt_factory()` (a function returning a new coroutine) until it
+    succeeds. Raises RetryError once the policy gives up.
+    `on_retry(error_class, attempt)` is called before every retry.
+    """
+    policy = policy or RetryPolicy()
+    breaker = breakers.get(url) if breakers is not None else None
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker is not None:
+            await breaker.acquire()
+        try:
+            result = await attempt_factory()
+        except Exception as e:
+            if breaker is not None:
+                await breaker.release(False)
+            error_class = classify_error(e)
+            if not policy.should_retry(error_class, attempt):
+                raise RetryError(url, error_class, attempt, e) from e
+            delay = policy.delay(attempt, error_class)
+            tqdm.write(f"{error_class} on {url}. Retry attempt no: {attempt}. Retrying after {delay:.1f} seconds...")
+            if on_retry is not None:
+                on_retry(error_class, attempt)
+            await asyncio.sleep(delay)
+            continue
+        if breaker is not None:
+            await breaker.release(True)
+        return result
@@ -0,0 +1,215 @@
+"""
+Metrics of a scraping run: per-stage latency histograms, counters & gauges.
+
+Stages of an article: queue_wait (waiting for a free pooled page), navigation
+(page.goto), dom_wait (waiting for a selector), extraction (the evaluate call)
+and write (handing the record to the sink, including its flushes).
+
+The metrics are served in the Prometheus text format on
+http://127.0.0.1:<port>/metrics while the run is going, and dumped as a JSON
+summary at the end of it.
+
+Usage:
+    metrics = ScraperMetrics()
+    metrics.serve(9464)
+    with metrics.time("navigation"):
+        await page.goto(url)
+    metrics.dump_json("metrics.json")
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# psutil is optional, without it the browser memory gauge is not reported
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+STAGES = ["queue_wait", "navigation", "dom_wait", "extraction", "write"]
+# Upper bounds (seconds) of the latency buckets
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Approximate quantile (upper bound of the bucket holding it, "+Inf" past the last bucket)."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return "+Inf"
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "mean": round(self.sum / self.count, 4) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+def browser_rss_bytes():
+    """Resident memory of the browser processes started by this process, or None without psutil."""
+    if not PSUTIL_AVAILABLE:
+        return None
+    total = 0
+    for child in psutil.Process(os.getpid()).children(recursive=True):
+        try:
+            if any(name in child.name().lower() for name in BROWSER_PROCESS_NAMES):
+                total += child.memory_info().rss
+        except psutil.Error:
+            # The process exited in the meantime
+            continue
+    return total
+
+
+class ScraperMetrics:
+    """
+    `gauges` are callables evaluated when the metrics are read, ex:
+    {"bytes_loaded": lambda: resource_stats.bytes_loaded}.
+    """
+    def __init__(self, gauges=None):
+        self.started = time.monotonic()
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.counters = {"articles": 0, "pages": 0}
+        self.retries = {}
+        self.failures = {}
+        self.gauges = {"browser_rss_bytes": browser_rss_bytes}
+        self.gauges.update(gauges or {})
+        self._lock = threading.Lock()
+        self._server = None
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self.stages[stage].observe(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start_time)
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def retry(self, error_class):
+        with self._lock:
+            self.retries[error_class] = self.retries.get(error_class, 0) + 1
+
+    def failure(self, error_class):
+        with self._lock:
+            self.failures[error_class] = self.failures.get(error_class, 0) + 1
+
+    def _gauge_values(self):
+        values = {}
+        for name, gauge in self.gauges.items():
+            value = gauge()
+            if value is not None:
+                values[name] = value
+        return values
+
+    def summary(self):
+        with self._lock:
+            elapsed_time = time.monotonic() - self.started
+            return {
+                "elapsed_seconds": round(elapsed_time, 2),
+                "articles_per_second": round(self.counters["articles"] / elapsed_time, 3) if elapsed_time else 0,
+                "pages_per_second": round(self.counters["pages"] / elapsed_time, 3) if elapsed_time else 0,
+                "counters": dict(self.counters),
+                "retries": dict(self.retries),
+                "failures": dict(self.failures),
+                "stages": {stage: histogram.summary() for stage, histogram in self.stages.items()},
+                "gauges": self._gauge_values(),
+            }
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            lines.append("# HELP scraper_stage_seconds Time spent per stage of an article")
+            lines.append("# TYPE scraper_stage_seconds histogram")
+            for stage, histogram in self.stages.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            for name, value in self.counters.items():
+                lines.append(f"# TYPE scraper_{name}_total counter")
+                lines.append(f"scraper_{name}_total {value}")
+            for metric, values in [("retries", self.retries), ("failures", self.failures)]:
+                lines.append(f"# TYPE scraper_{metric}_total counter")
+                for error_class, value in values.items():
+                    lines.append(f'scraper_{metric}_total{{error_class="{error_class}"}} {value}')
+            lines.append("# TYPE scraper_uptime_seconds gauge")
+            lines.append(f"scraper_uptime_seconds {time.monotonic() - self.started:.3f}")
+            for name, value in self._gauge_values().items():
+                lines.append(f"# TYPE scraper_{name} gauge")
+                lines.append(f"scraper_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Serve /metrics from a daemon thread (stopped by close())."""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}/metrics"
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
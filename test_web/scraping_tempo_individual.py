@@ -6,7 +6,6 @@ Date: 22 September 2024
 """
 import os
 import asyncio
-from playwright.async_api import async_playwright
 import pandas as pd
 from datetime import datetime, timedelta
 import json
@@ -14,57 +13,32 @@ from tqdm.asyncio import tqdm
 import time
 import sys
 from collections import defaultdict
-from playwright_stealth import stealth_async
+from tempo_fetcher import TempoFetcher
+from html_cache import HtmlCache
+from retry_policy import RetryPolicy, CircuitBreakerRegistry, RetryError, run_with_retry
 
 # Global Constants
 SCRIPT_DIR = os.path.dirname(__file__)
 RESULT_DIR = f"{SCRIPT_DIR}/scrapping_result/"
 BASE_URL = "https://www.tempo.co/indeks/"
+# Raw HTML of every fetched page, used to re-extract the articles offline with --replay
+CACHE_DIR = f"{RESULT_DIR}html_cache"
+CACHE_MAX_BYTES = 20 * 1024**3
+REPLAY = "--replay" in sys.argv
 
 # Create a semaphore to limit concurrent tasks
-sem = asyncio.Semaphore(2)
+MAX_CONCURRENCY = 2
+sem = asyncio.Semaphore(MAX_CONCURRENCY)
 
-async def scrape_article_content(url):
+async def scrape_article_content(url, fetcher, policy=None, breakers=None):
     async with sem:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
-            await stealth_async(page)
-            while True:
-                try:
-                    await page.goto(url, timeout=60000)
-                    # Getting the script & genre tags
-                    script_tags = page.locator('head script[type="application/ld+json"] + script[type="application/ld+json"]').nth(0)                
-                    article_genre_tags = page.locator('ul.sitemap li:nth-child(2) span[itemprop="name"]')
-                    
-                    # Extrating article content & genre
-                    script_content = await script_tags.inner_text(timeout=60000)
-                    article_genre = await article_genre_tags.inner_text(timeout=60000)
-
-                    # Parse the JSON content
-                    json_data = json.loads(script_content)
-
-                    # Extract article's content (Title, article body, date published, keyphrases)
-                    article_title = json_data.get("headline")
-                    article_published = json_data.get("datePublished")
-                    article_body = json_data.get("articleBody")
-                    article_keyphrases = json_data.get("keywords")
-
-                    # Create a dictionary containing article's content
-                    article_content = {
-                        "url": url,
-                        "title": article_title,
-                        "body": article_body,
-                        "date": article_published,
-                        "genre": article_genre,
-                        "keyphrases": article_keyphrases
-                    }                    
-                    break
-                except Exception as e:
-                    tqdm.write(f"{e} occurred. Retrying after 2 seconds...")
-                    await asyncio.sleep(2)
-            await browser.close()
-        return article_content
+        try:
+            # Plain HTTP GET first, the browser is only used when the ld+json is not in the raw HTML
+            return await run_with_retry(lambda: fetcher.fetch(url), url, policy, breakers)
+        except RetryError as e:
+            # A dead URL is reported & skipped instead of being retried forever
+            tqdm.write(str(e))
+            return {"url": url}
 
 
 async def main():
@@ -76,12 +50,20 @@ async def main():
 
     # Create multiple tasks for extracting individual news content
     start_time_individual = time.perf_counter()
-    tasks_individual = [scrape_article_content(url) for url in all_links] 
-    results_individual_list = await tqdm.gather(*tasks_individual, desc="Scraping Individual Pages", total=len(all_links)) 
+    # Offline there is nothing to wait for, a failure is a real extraction error
+    policy = RetryPolicy(max_attempts=1) if REPLAY else RetryPolicy(base_delay=2)
+    breakers = CircuitBreakerRegistry(max_concurrency=MAX_CONCURRENCY)
+    cache = HtmlCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+    async with TempoFetcher(stealth=True, cache=cache, replay=REPLAY) as fetcher:
+        tasks_individual = [scrape_article_content(url, fetcher, policy, breakers) for url in all_links] 
+        results_individual_list = await tqdm.gather(*tasks_individual, desc="Scraping Individual Pages", total=len(all_links)) 
     elapsed_time_individual = time.perf_counter() - start_time_individual
     print("")
     print("\n")
     print(f"Time taken for scraping individual news page: {elapsed_time_individual:.2f}s")          
+    print(f"Fetched over HTTP: {fetcher.stats['http']}, rendered with the browser: {fetcher.stats['browser']}")
+    print(fetcher.resource_stats.summary())
+    cache.close()
     with open('data.json', 'w') as f:
         json.dump(results_individual_list, f)
 
@@ -6,121 +6,110 @@ Date: 22 September 2024
 """
 import os
 import asyncio
-from playwright.async_api import async_playwright
+from urllib.parse import urljoin
+from browser_pool import BrowserPool
+from index_scheduler import IndexScheduler, HostRateLimiter, make_item
+from resource_blocking import ResourceStats, blocking_hook
+from retry_policy import RetryPolicy, CircuitBreakerRegistry, check_response
+from url_filter import UrlIndex
 import pandas as pd
 from datetime import datetime, timedelta
-from tqdm.asyncio import tqdm
 import time
 import sys
 from collections import defaultdict
 from itertools import chain
-import re
 
 # Global Constants
 SCRIPT_DIR = os.path.dirname(__file__)
 RESULT_DIR = f"{SCRIPT_DIR}/scrapping_result/"
-BASE_URL = "https://www.jpnn.com/indeks"
+# Overridable to point the crawl at the local simulator (see fixture_server.py)
+BASE_URL = os.environ.get("JPNN_INDEX_URL", "https://www.jpnn.com/indeks")
+# Every jpnn article link ever written to an index file (shared with jppn_december_index.py)
+URL_INDEX_DIR = f"{RESULT_DIR}url_index/jpnn"
 
-# Create a semaphore to limit concurrent tasks
-# sem = asyncio.Semaphore(10)
+# Number of index pages fetched concurrently (across all years)
+INDEX_WORKERS = 12
+# Politeness budget for jpnn.com (requests per second & burst size)
+HOST_RATE = 2.0
+HOST_BURST = 4
 
-# Asynchronous function to scrape articles for a particular month
-async def scrape_article_monthly(url):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        article_links = []
-        
-        # Finding the date information on the url
-        # Ex: https://www.jpnn.com/indeks?id=&d=01&m=10&y=2024&tab=all        
-        url_date_pattern = r"d=(\d{2})&m=(\d{2})&y=(\d{4})"
-        match = re.search(url_date_pattern, url)      
-        day_url = match.group(1)
-        month_url = match.group(2)
-        year_url = match.group(3)
-        date_url = f"{year_url}-{month_url}-{day_url}"
+# Building one work item for every day of a month
+# Ex: https://www.jpnn.com/indeks?id=&d=01&m=10&y=2024&tab=all
+def month_items(year, month):
+    current_date = datetime(year, month, 1)
+    items = []
+    while current_date.month == month:
+        current_day = current_date.strftime('%d')
+        formatted_url = f"{BASE_URL}?id=&d={current_day}&m={month:02d}&y={year}&tab=all"
+        items.append(make_item(current_date.strftime('%Y-%m-%d'), formatted_url))
+        current_date += timedelta(days=1)  # Move to the next day
+    return items
 
-        # Extract the year and month from the URL
-        current_date = datetime.strptime(date_url, "%Y-%m-%d")
-        # Getting the last date of the current month (month provided by the URL)
-        next_month = current_date.replace(day=28) + timedelta(days=4)  
-        last_day_of_month = next_month - timedelta(days=next_month.day)
+# Scraping a single index page, the "Next" page (if any) is scheduled as its own work item
+async def scrape_index_page(page, item):
+    response = await page.goto(item["url"], timeout=60000, wait_until="domcontentloaded")
+    check_response(response, item["url"])
+    # Collect all article links on the current page
+    links = page.locator('h1 a')
+    article_links = [await link.get_attribute('href') for link in await links.all()]
 
-        # Total number of days to scrape (offset +1 for loop)
-        total_days = (last_day_of_month - current_date).days + 1  
-
-        # Extracting month name & year (for progress bar descriptions)
-        month_name = current_date.strftime('%B')  # Get the full month name
-        year = current_date.strftime('%Y')  # Get the year
-        
-        # Extracting current date, month, and year
-        current_month = current_date.strftime('%m')
-        current_year = current_date.strftime('%Y')
-
-        # Progress bar setup
-        async for _ in tqdm(range(total_days), desc=f"Progress {month_name} {year}".ljust(24)):
-            try:
-                current_day = current_date.strftime('%d')
-                formatted_url = f"{BASE_URL}?id=&d={current_day}&m={current_month}&y={current_year}&tab=all"
-                await page.goto(formatted_url, timeout=60000, wait_until="domcontentloaded")
-                # Collect all article links on the current page
-                links = page.locator('h1 a')
-                article_links.extend([await link.get_attribute('href') for link in await links.all()])
-                
-                # Handle Pagination
-                while True:
-                    # Checking the next button
-                    next_button = page.locator('.pagination a', has_text='Next').first
-                    if await next_button.count() > 0:
-                        await next_button.click()                        
-                        await page.wait_for_load_state('domcontentloaded')
-                        links_next = page.locator('h1 a')
-                        article_links.extend([await link.get_attribute('href') for link in await links_next.all()])
-                    else:
-                        break
-                current_date += timedelta(days=1)  # Move to the next day
-            except Exception as e:
-                tqdm.write(f"Timeout error occurred. Retrying after 2 seconds...")
-                await asyncio.sleep(2)
-
-        await browser.close()
-    
-    return article_links
+    # Handle Pagination
+    next_url = None
+    next_button = page.locator('.pagination a', has_text='Next').first
+    if await next_button.count() > 0:
+        href = await next_button.get_attribute('href')
+        if href:
+            next_url = urljoin(page.url, href)
+    return article_links, next_url
 
 async def main():
     # URL format: https://www.jpnn.com/indeks?id=&d=02&m=10&y=2024&tab=all
-    for year in range(2010, 2022):
-        # Base monthly URLs starting with the first date in each month
-        months = [f"{BASE_URL}?id=&d=01&m={month:02d}&y={year}&tab=all" for month in range(1, 13)]  
-        
-        # Create task for each month
-        tasks_index = [scrape_article_monthly(url) for url in months] 
-        
-        # Create multiple tasks at once and wait for all of them to complete
-        start_time_index = time.perf_counter()
-        results_index = await asyncio.gather(*tasks_index) 
-        elapsed_time_index = time.perf_counter() - start_time_index
+    years = range(2010, 2022)
+    # Every (day, page) of every year goes through the same queue
+    items = list(chain.from_iterable(month_items(year, month) for year in years for month in range(1, 13)))
 
-        # Flatten list
-        all_links = list(chain.from_iterable(results_index))
-        
-        # Saving to dataframe
+    # Images, fonts, stylesheets, ads & third-party scripts are not loaded at all
+    resource_stats = ResourceStats()
+    pool = BrowserPool(size=INDEX_WORKERS, on_new_context=blocking_hook("jpnn", resource_stats))
+    await pool.start()
+    scheduler = IndexScheduler(pool, scrape_index_page, workers=INDEX_WORKERS,
+                               rate_limiter=HostRateLimiter(rate=HOST_RATE, burst=HOST_BURST),
+                               policy=RetryPolicy(base_delay=2),
+                               breakers=CircuitBreakerRegistry(max_concurrency=INDEX_WORKERS))
+    start_time_index = time.perf_counter()
+    results_index = await scheduler.run(items, desc="Scraping index pages")
+    elapsed_time_index = time.perf_counter() - start_time_index
+    await pool.close()
+
+    # Group the links of every day by year (days are kept in chronological order)
+    links_per_year = defaultdict(list)
+    for day in sorted(results_index):
+        links_per_year[int(day[:4])].extend(chain.from_iterable(results_index[day]))
+
+    sys.stdout.flush()    
+    print("")  
+    # Links seen by an earlier run (or repeated by the pagination) never reach the article stage again
+    url_index = UrlIndex(URL_INDEX_DIR)
+    for year in years:
+        # Saving to dataframe (appended, the index file keeps the links of the earlier runs)
+        all_links = links_per_year[year]
+        new_links = url_index.filter_new(all_links, record=False)
         file_name = f"{RESULT_DIR}jppn_index_{year}.csv"
         df = pd.DataFrame({
-            "url": all_links     
+            "url": new_links     
         })    
-        df.to_csv(file_name, index=False)
-
-        # Final Reporting
-        sys.stdout.flush()    
-        print("")  
-        print(f"Scraping complete. Total articles scraped: {len(all_links)}")
-        print(f"Time taken for scraping the index page: {elapsed_time_index:.2f}s")      
-        print(f"Results saved to {file_name}")
+        df.to_csv(file_name, index=False, mode="a", header=not os.path.exists(file_name))
+        # Marked seen only once they are in the index file, a failed write does not lose them
+        url_index.add_many(new_links)
+        print(f"Total articles in {year}: {len(all_links)}, new: {len(new_links)}. Results saved to {file_name}")
+    url_index.close()
 
-        # Small break
-        time.sleep(10)
+    # Final Reporting
+    print(f"Time taken for scraping the index page: {elapsed_time_index:.2f}s")      
+    print(resource_stats.summary())
+    print(f"Index pages failed: {len(scheduler.failed_items)}")
+    for item in scheduler.failed_items:
+        print(f"- {item['url']} ({item.get('error_class')})")
 
 # Run the asyncio event loop
 if __name__ == "__main__":
@@ -6,7 +6,14 @@ Date: 22 September 2024
 """
 import os
 import asyncio
-from playwright.async_api import async_playwright
+from browser_pool import BrowserPool, combine_hooks
+from crawl_journal import CrawlJournal
+from article_sink import ArticleSink
+from resource_blocking import ResourceStats, blocking_hook
+from html_cache import HtmlCache, recording_hook
+from retry_policy import RetryPolicy, CircuitBreakerRegistry, RetryError, SelectorMissingError, run_with_retry
+from extraction_engine import load_spec, extract_article, extract_static
+from scraper_metrics import ScraperMetrics, STAGES
 import pandas as pd
 from tqdm.asyncio import tqdm
 import time
@@ -15,122 +22,171 @@ import sys
 # Global Constants
 SCRIPT_DIR = os.path.dirname(__file__)
 RESULT_DIR = f"{SCRIPT_DIR}/scrapping_result/"
-
-# Create a semaphore to limit concurrent tasks
-sem = asyncio.Semaphore(7)
+YEAR = 2023
+INDEX_FILE = f"{RESULT_DIR}jppn_index_{YEAR}.csv"
+JOURNAL_FILE = f"{RESULT_DIR}jppn_{YEAR}_journal.db"
+ARTICLES_DIR = f"{RESULT_DIR}articles"
+# Write the buffered articles every 500 records, or with the first article finished 30 seconds after the last write
+SINK_FLUSH_ROWS = 500
+SINK_FLUSH_INTERVAL = 30
+# Raw HTML of every fetched page, used to re-extract the articles offline with --replay
+CACHE_DIR = f"{RESULT_DIR}html_cache"
+CACHE_MAX_BYTES = 20 * 1024**3
+REPLAY_ARTICLES_DIR = f"{RESULT_DIR}articles_replay"
+REPLAY = "--replay" in sys.argv
+# Give the URLs which failed in earlier runs another try
+REQUEUE_FAILED = "--requeue-failed" in sys.argv
+# Live metrics on http://127.0.0.1:9464/metrics, JSON summary written at the end of the run.
+# --metrics-port <port> serves them elsewhere (0 = any free port, -1 = not served)
+METRICS_PORT = int(sys.argv[sys.argv.index("--metrics-port") + 1]) if "--metrics-port" in sys.argv[:-1] else 9464
+METRICS_FILE = f"{RESULT_DIR}jppn_{YEAR}_metrics.json"
+
+# Number of pages scraped concurrently (shared by all the pooled browsers)
+POOL_SIZE = 7
+# Number of Chromium processes the pages are spread across
+POOL_BROWSERS = 2
+# Recycle a page after this many articles to keep browser memory in check
+PAGE_MAX_USES = 50
+# Errors which will not go away by retrying later, the URL is failed right away.
+# The other ones put it back to pending until the journal's max_attempts is used up.
+PERMANENT_ERRORS = {"http_4xx", "selector_missing"}
+
+# Fields, selectors & post-processors of a jpnn article (specs/jpnn.json)
+JPNN_SPEC = load_spec("jpnn")
+
+# A single attempt at scraping one article (retries are handled by run_with_retry)
+async def scrape_article_once(url, pool, overlay, metrics=None):
+    timings = {}
+    start_time = time.perf_counter()
+    try:
+        # Borrow a page from the pool (a failed attempt recycles the page)
+        async with pool.page() as page:
+            timings["queue_wait"] = time.perf_counter() - start_time
+            # Every field (and the "Next" page link) is read with one evaluate call per page
+            article_content = await extract_article(page, url, JPNN_SPEC, timings=timings)
+    finally:
+        # Failed attempts are timed as well (up to the stage they reached)
+        if metrics is not None:
+            for stage in STAGES:
+                if stage in timings:
+                    metrics.observe(stage, timings[stage])
+            metrics.inc("pages", timings.get("pages", 0))
+    article_content["overlay"] = overlay
+    return article_content
 
 # This function is only scraping 1 article at a time (but this function can be run concurrently)
-async def scrape_article_content(url):
-    async with sem:
-        async with async_playwright() as p: 
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
-            complete_article_body = []
-            overlay = False
-            retry_attempt = 1
-            article_content = {}
-            while retry_attempt < 4:
-                try:
-                    # Going to the url
-                    await page.goto(url, timeout=60000, wait_until="domcontentloaded")
-                    # Getting the article body element (<p> elements)
-                    article_body_tags = page.locator('div[itemprop="articleBody"] p')        
-                    # Get the title tag
-                    title_tag = page.locator('h1.judul')
-                    # Get the genre tag
-                    genre_tag = page.locator('div.breadcrumb a').nth(1)                    
-                    # Get the keyphrases tags
-                    keyphrases_tags = page.locator('div.tags > a:not(.text-tags)')
-                    # Get the summary (description) tag
-                    summary_tag = page.locator('div.text-center.relative > :first-child').first
-                    # Extract the date
-                    date_tag = page.locator('.date-publish')
-
-                    # Extrating the text of these tags
-                    article_body = await article_body_tags.all_inner_texts()
-                    title = await title_tag.inner_text()
-                    genre = await genre_tag.inner_text()
-                    keyphrases= await keyphrases_tags.all_inner_texts()
-                    summary = await summary_tag.inner_text()
-                    date_str = await date_tag.inner_text()
-
-                    # Processing date data
-                    date_str = date_str.replace("\u2013", "-")
-                    date_part = date_str.split("-")[0]
-                    date = date_part.split(',')[1].strip() # Ex: 01 Januari 2009
-                    id_eng_months = {
-                        "Januari": "January",
-                        "Februari": "February",
-                        "Maret": "March",
-                        "April": "April",
-                        "Mei": "May",
-                        "Juni": "June",
-                        "Juli": "July",
-                        "Agustus": "August",
-                        "September": "September",
-                        "Oktober": "October",
-                        "November": "November",
-                        "Desember": "December"
-                    }   
-                    for id_month, eng_month in id_eng_months.items():
-                        date = date.replace(id_month, eng_month)                 
-
-                    # Adding article body
-                    complete_article_body.extend(article_body)
-
-                    # In case of pagination, combine the article content
-                    next_button = page.locator('.pagination a', has_text='Next').first
-                    if await next_button.count() > 0:
-                        # Going to the next page                    
-                        await next_button.click()                        
-                        await page.wait_for_load_state('domcontentloaded')
-                        article_body_tags_next = page.locator('div[itemprop="articleBody"] p')
-                        article_body_next = await article_body_tags_next.all_inner_texts()
-                        complete_article_body.extend(article_body_next)
-
-                    # Create a dictionary containing article's content
-                    article_content = {
-                        "url": url,
-                        "title": title,
-                        "body": " ".join(complete_article_body),
-                        "genre": genre,
-                        "date": date,                        
-                        "keyphrases": keyphrases,
-                        "summary": summary,
-                        "overlay": overlay
-                    }                    
-
-                    break
-                except Exception as e:
-                    tqdm.write(f"An error occured to {url}. Retry attempt no: {retry_attempt}. Retrying after 3 seconds...")
-                    overlay = True
-                    complete_article_body.clear()
-                    await asyncio.sleep(3)
-                    retry_attempt += 1
-            await browser.close()
-
-        return article_content
+# Raises RetryError when the article could not be scraped
+async def scrape_article_content(url, pool, policy=None, breakers=None, metrics=None):
+    # overlay is flagged once an attempt has failed
+    state = {"overlay": False}
+    def on_retry(error_class, attempt):
+        state["overlay"] = True
+        if metrics is not None:
+            metrics.retry(error_class)
+    return await run_with_retry(lambda: scrape_article_once(url, pool, state["overlay"], metrics),
+                                url, policy, breakers, on_retry)
+
+# Scrape one article and hand its result to the sink (it is marked done once the sink flushed it)
+async def scrape_and_record(url, pool, journal, sink, policy, breakers, metrics=None):
+    try:
+        article_content = await scrape_article_content(url, pool, policy, breakers, metrics)
+    except RetryError as e:
+        tqdm.write(str(e))
+        # run_with_retry already used up the RetryPolicy, a transient error is tried again in a later batch
+        journal.mark_failed(url, e.error_class, final=e.error_class in PERMANENT_ERRORS)
+        if metrics is not None:
+            metrics.failure(e.error_class)
+        return False
+    start_time = time.perf_counter()
+    sink.write(article_content)
+    if metrics is not None:
+        metrics.observe("write", time.perf_counter() - start_time)
+        metrics.inc("articles")
+    # Only a flag is returned, the article itself is kept by the sink
+    return True
+
+# Re-extract every cached article offline (no request leaves the machine, no browser is launched)
+def replay(cache):
+    df_index = pd.read_csv(INDEX_FILE)
+    all_links = [url for url in df_index['url'].tolist() if cache.has(url)]
+    print(f"Replaying {len(all_links)} cached articles")
+
+    start_time = time.perf_counter()
+    extracted = 0
+    with ArticleSink(REPLAY_ARTICLES_DIR, source="jpnn", flush_rows=SINK_FLUSH_ROWS) as sink:
+        for url in tqdm(all_links, desc="Replaying Individual Pages"):
+            try:
+                article_content = extract_static(url, cache.get(url), JPNN_SPEC, fetch_html=cache.get)
+            except SelectorMissingError as e:
+                tqdm.write(str(e))
+                continue
+            article_content["overlay"] = False
+            sink.write(article_content)
+            extracted += 1
+    elapsed_time = time.perf_counter() - start_time
+    print(f"Articles extracted: {extracted}/{len(all_links)} in {elapsed_time:.2f}s. Results saved to {REPLAY_ARTICLES_DIR}")
 
 async def main():
-    # Load the index df
-    df_index = pd.read_csv(r'C:\Users\User\Documents\Python_Projects\test_web\scrapping_result\jppn_index_2023.csv')
-    all_links = df_index['url'].tolist()
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    cache = HtmlCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+    if REPLAY:
+        replay(cache)
+        cache.close()
+        return
+
+    # The journal remembers which URLs are done, so a restarted run only scrapes the remaining ones
+    journal = CrawlJournal(JOURNAL_FILE)
+    if REQUEUE_FAILED:
+        print(f"Failed links requeued: {journal.requeue_failed()}")
+
+    # Register the links of the index file (already known links are ignored)
+    df_index = pd.read_csv(INDEX_FILE)
+    added = journal.add_urls(df_index['url'].tolist())
+    counts = journal.counts()
+    print(f"New links: {added}, pending: {counts['pending']}, done: {counts['done']}, failed: {counts['failed']}")
+
+    # Articles are streamed into the Parquet dataset, the journal marks them done once they are on disk
+    sink = ArticleSink(ARTICLES_DIR, source="jpnn", flush_rows=SINK_FLUSH_ROWS, flush_interval=SINK_FLUSH_INTERVAL,
+                       on_flush=lambda records: journal.mark_done_many(record["url"] for record in records))
+
+    # Launch the browsers once and reuse their pages for every batch
+    # Images, fonts, stylesheets, ads & third-party scripts are not loaded at all,
+    # every fetched HTML document is kept in the cache
+    resource_stats = ResourceStats()
+    pool = BrowserPool(size=POOL_SIZE, browsers=POOL_BROWSERS, max_uses=PAGE_MAX_USES,
+                       on_new_context=combine_hooks(blocking_hook("jpnn", resource_stats), recording_hook(cache)))
+    await pool.start()
+
+    # Exponential backoff between attempts, jpnn.com gets fewer concurrent pages when its error rate climbs
+    policy = RetryPolicy(max_attempts=3, base_delay=3)
+    breakers = CircuitBreakerRegistry(max_concurrency=POOL_SIZE)
+
+    metrics = ScraperMetrics(gauges={
+        "bytes_loaded": lambda: resource_stats.bytes_loaded,
+        "requests_blocked": lambda: sum(resource_stats.blocked.values()),
+        "pool_size": lambda: POOL_SIZE,
+    })
+    if METRICS_PORT >= 0:
+        # A busy port (ex: another crawl is running) costs the live metrics, not the crawl
+        try:
+            print(f"Metrics served on {metrics.serve(METRICS_PORT)}")
+        except OSError as e:
+            print(f"Metrics not served, port {METRICS_PORT} unavailable: {e}")
 
     batch_size = 5000 
-    batch_num = 2 # batch num should be 1 not 2. This is a temporary fix.
-    for i in range(10000, len(all_links), batch_size): # The starting range should be 0 not 10k, this is a  temporary fix.
-        batch = all_links[i:i + batch_size]
+    # Continue the numbering of the previous run
+    batch_num = int(journal.get_meta("batch_num", 1))
+    while True:
+        batch = journal.claim(batch_size)
+        if not batch:
+            break
 
         # Create multiple tasks for extracting individual news content
         start_time_individual = time.perf_counter()
-        tasks_individual = [scrape_article_content(url) for url in batch] 
-        results_individual_list = await tqdm.gather(*tasks_individual, desc="Scraping Individual Pages", total=len(batch))  # Return a list of dictionary
+        tasks_individual = [scrape_and_record(url, pool, journal, sink, policy, breakers, metrics) for url in batch] 
+        results_individual_list = await tqdm.gather(*tasks_individual, desc="Scraping Individual Pages", total=len(batch))  # Return a list of success flags
         elapsed_time_individual = time.perf_counter() - start_time_individual
-
-        # Saving to dataframe
-        df_final = pd.DataFrame(results_individual_list)
-        file_name = f"{RESULT_DIR}jppn_2023_batch_{batch_num}.csv"  
-        df_final.to_csv(file_name, index=False)
+        sink.flush()
 
         # Final Reporting
         sys.stdout.flush()    
@@ -138,11 +194,26 @@ async def main():
         print("-------")    
         print(f"Finished batch: {batch_num}")
         print(f"Time taken for scraping individual news page: {elapsed_time_individual:.2f}s")          
-        print(f"Results saved to {file_name}")
+        print(f"Articles scraped: {sum(results_individual_list)}/{len(batch)}. Results saved to {ARTICLES_DIR}")
+        print(f"Progress: {journal.counts()}")
+        print(resource_stats.summary())
+        summary = metrics.summary()
+        print(f"Articles/s: {summary['articles_per_second']}, p50/p99 navigation: "
+              f"{summary['stages']['navigation']['p50']}/{summary['stages']['navigation']['p99']}s, "
+              f"queue wait: {summary['stages']['queue_wait']['p50']}/{summary['stages']['queue_wait']['p99']}s")
         print("Break between batches for 20 seconds.............\n")
         batch_num += 1
-        del results_individual_list, df_final, batch
-        time.sleep(20)
+        journal.set_meta("batch_num", batch_num)
+        del results_individual_list, batch
+        await asyncio.sleep(20)
+
+    await pool.close()
+    sink.close()
+    journal.close()
+    cache.close()
+    metrics.close()
+    metrics.dump_json(METRICS_FILE)
+    print(f"Metrics summary saved to {METRICS_FILE}")
 
 
 # Run the asyncio event loop
@@ -0,0 +1,97 @@
+"""
+A Python script for scraping a year of jpnn.com in one pass: the index pages
+feed the article scraper directly (no index CSV in between).
+
+Links new to the URL index are registered in the crawl journal before they are
+queued, so an interrupted run resumes with the journal's pending links while
+the index crawl starts over.
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import os
+import asyncio
+import time
+import sys
+from browser_pool import BrowserPool
+from crawl_journal import CrawlJournal
+from article_sink import ArticleSink
+from index_scheduler import IndexScheduler, HostRateLimiter
+from pipeline import IndexArticlePipeline
+from resource_blocking import ResourceStats, blocking_hook
+from retry_policy import RetryPolicy, CircuitBreakerRegistry
+from url_filter import UrlIndex
+from scrapping_jppn_index import month_items, scrape_index_page, INDEX_WORKERS, HOST_RATE, HOST_BURST, URL_INDEX_DIR
+from scrapping_jppn_individual import (scrape_and_record, RESULT_DIR, YEAR, JOURNAL_FILE, ARTICLES_DIR,
+                                       SINK_FLUSH_ROWS, SINK_FLUSH_INTERVAL, POOL_SIZE, POOL_BROWSERS, PAGE_MAX_USES)
+
+# Links waiting for the article stage (a full queue pauses the index crawl)
+ARTICLE_QUEUE_SIZE = 1000
+
+
+async def main():
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    journal = CrawlJournal(JOURNAL_FILE)
+    url_index = UrlIndex(URL_INDEX_DIR)
+    # Links left over by an interrupted run are scraped alongside the new index crawl
+    backlog = journal.claim(sys.maxsize)
+    print(f"Resuming {len(backlog)} pending links, progress: {journal.counts()}")
+
+    # Only links never seen before reach the article queue. They are in the journal before the
+    # URL index marks them seen, so a crash in between cannot lose them
+    def new_links(item, links):
+        links = url_index.filter_new(links, record=False)
+        journal.add_urls(links)
+        url_index.add_many(links)
+        return links
+
+    sink = ArticleSink(ARTICLES_DIR, source="jpnn", flush_rows=SINK_FLUSH_ROWS, flush_interval=SINK_FLUSH_INTERVAL,
+                       on_flush=lambda records: journal.mark_done_many(record["url"] for record in records))
+
+    # Index pages & articles get their own browsers, so neither stage starves the other
+    resource_stats = ResourceStats()
+    index_pool = BrowserPool(size=INDEX_WORKERS, on_new_context=blocking_hook("jpnn", resource_stats))
+    article_pool = BrowserPool(size=POOL_SIZE, browsers=POOL_BROWSERS, max_uses=PAGE_MAX_USES,
+                               on_new_context=blocking_hook("jpnn", resource_stats))
+    await index_pool.start()
+    await article_pool.start()
+
+    # Both stages hit jpnn.com, they share its circuit breaker
+    breakers = CircuitBreakerRegistry(max_concurrency=INDEX_WORKERS + POOL_SIZE)
+    scheduler = IndexScheduler(index_pool, scrape_index_page, workers=INDEX_WORKERS,
+                               rate_limiter=HostRateLimiter(rate=HOST_RATE, burst=HOST_BURST),
+                               policy=RetryPolicy(base_delay=2), breakers=breakers, keep_results=False)
+    article_policy = RetryPolicy(max_attempts=3, base_delay=3)
+    pipeline = IndexArticlePipeline(
+        scheduler,
+        lambda url: scrape_and_record(url, article_pool, journal, sink, article_policy, breakers),
+        links_of=new_links,
+        workers=POOL_SIZE,
+        queue_size=ARTICLE_QUEUE_SIZE
+    )
+
+    items = [item for month in range(1, 13) for item in month_items(YEAR, month)]
+    start_time = time.perf_counter()
+    stats = await pipeline.run(items, backlog=backlog, desc=f"Scraping index pages {YEAR}")
+    elapsed_time = time.perf_counter() - start_time
+
+    await index_pool.close()
+    await article_pool.close()
+    sink.close()
+    url_index.close()
+
+    # Final Reporting
+    sys.stdout.flush()
+    sys.stderr.flush()
+    print("-------")
+    print(f"Time taken for scraping the index & individual news pages: {elapsed_time:.2f}s")
+    print(f"Articles scraped: {stats['succeeded']}/{stats['queued']}. Results saved to {ARTICLES_DIR}")
+    print(f"Index pages failed: {len(scheduler.failed_items)}")
+    print(f"Progress: {journal.counts()}")
+    print(resource_stats.summary())
+    journal.close()
+
+
+# Run the asyncio event loop
+if __name__ == "__main__":
+    asyncio.run(main())
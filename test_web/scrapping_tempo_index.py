@@ -6,168 +6,144 @@ Date: 22 September 2024
 """
 import os
 import asyncio
-from playwright.async_api import async_playwright
-import pandas as pd
+from browser_pool import BrowserPool
+from index_scheduler import IndexScheduler, HostRateLimiter, make_item
 from datetime import datetime, timedelta
-import json
 from tqdm.asyncio import tqdm
 import time
 import sys
-from collections import defaultdict
+from tempo_fetcher import TempoFetcher
+from html_cache import HtmlCache
+from article_sink import ArticleSink
+from url_filter import UrlIndex, canonicalize_url
+from pipeline import IndexArticlePipeline
+from resource_blocking import ResourceStats, blocking_hook
+from retry_policy import RetryPolicy, CircuitBreakerRegistry, RetryError, check_response, run_with_retry
 
 # Global Constants
 SCRIPT_DIR = os.path.dirname(__file__)
 RESULT_DIR = f"{SCRIPT_DIR}/scrapping_result/"
-BASE_URL = "https://www.tempo.co/indeks/"
+# Overridable to point the crawl at the local simulator (see fixture_server.py)
+BASE_URL = os.environ.get("TEMPO_INDEX_URL", "https://www.tempo.co/indeks/")
+ARTICLES_DIR = f"{RESULT_DIR}articles"
+# Raw HTML of every fetched article, see scraping_tempo_individual.py --replay
+CACHE_DIR = f"{RESULT_DIR}html_cache"
+CACHE_MAX_BYTES = 20 * 1024**3
+# Every tempo article already written to the dataset
+URL_INDEX_DIR = f"{RESULT_DIR}url_index/tempo"
+
+# Links waiting for the article stage (a full queue pauses the index crawl)
+ARTICLE_QUEUE_SIZE = 500
 
 # Create a semaphore to limit concurrent tasks
-sem = asyncio.Semaphore(10)
-
-# Asynchronous function to scrape articles for a particular month
-async def scrape_article_monthly(url):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        article_links = []
-        summaries_list = []
-        
-        # Extract the year and month from the URL
-        current_date = datetime.strptime(url.split("/")[-2], "%Y-%m-%d")
-        # Getting the last date of the current month (month provided by the URL)
-        next_month = current_date.replace(day=28) + timedelta(days=4)  
-        last_day_of_month = next_month - timedelta(days=next_month.day)
-
-        # Total number of days to scrape (offset +1 for loop)
-        total_days = (last_day_of_month - current_date).days + 1  
-
-        # Extracting month name & year
-        month_name = current_date.strftime('%B')  # Get the full month name
-        year = current_date.strftime('%Y')  # Get the year
-        
-        # Progress bar setup
-        async for _ in tqdm(range(total_days), desc=f"Progress {month_name} {year}".ljust(24)):
-            try:
-                formatted_url = f"{BASE_URL}{current_date.strftime('%Y-%m-%d')}/"
-                await page.goto(formatted_url, timeout=60000, wait_until="domcontentloaded")
-                # Collect all article links on the current page
-                links = page.locator('article.text-card h2.title a')
-                summaries = page.locator('article.text-card p:not([class])')
-                
-                article_links.extend([await link.get_attribute('href') for link in links.all()])
-                summaries_list.extend([await summary.text_content() for summary in summaries.all()])
-                
-                current_date += timedelta(days=1)  # Move to the next day
-            except Exception as e:
-                tqdm.write(f"Timeout error occurred. Retrying after 2 seconds...")
-                await asyncio.sleep(2)
-
-        await browser.close()
-    
-    return article_links, summaries_list
-
-async def scrape_article_content(url):
+MAX_CONCURRENCY = 10
+sem = asyncio.Semaphore(MAX_CONCURRENCY)
+
+# Number of index pages fetched concurrently (across all months)
+INDEX_WORKERS = 12
+# Politeness budget for tempo.co (requests per second & burst size)
+HOST_RATE = 2.0
+HOST_BURST = 4
+
+# Building one work item for every day of a month (ex: https://www.tempo.co/indeks/2023-01-01/)
+def month_items(year, month):
+    current_date = datetime(year, month, 1)
+    items = []
+    while current_date.month == month:
+        formatted_url = f"{BASE_URL}{current_date.strftime('%Y-%m-%d')}/"
+        items.append(make_item(current_date.strftime('%Y-%m-%d'), formatted_url))
+        current_date += timedelta(days=1)  # Move to the next day
+    return items
+
+# Scraping the index page of a single day
+async def scrape_index_page(page, item):
+    response = await page.goto(item["url"], timeout=60000, wait_until="domcontentloaded")
+    check_response(response, item["url"])
+    # Collect all article links on the current page
+    links = page.locator('article.text-card h2.title a')
+    summaries = page.locator('article.text-card p:not([class])')
+
+    article_links = [await link.get_attribute('href') for link in await links.all()]
+    summaries_list = [await summary.text_content() for summary in await summaries.all()]
+    # The tempo index has no pagination
+    return (article_links, summaries_list), None
+
+async def scrape_article_content(url, fetcher, summary=None, sink=None, policy=None, breakers=None):
     async with sem:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
-            while True:
-                try:
-                    await page.goto(url, timeout=60000, wait_until="domcontentloaded")
-
-                    # Get the script tag which contain the desired ld+json data
-                    script_tags = await page.query_selector_all('head > script[type="application/ld+json"]')
-                    script_content = await script_tags[1].inner_text()
-
-                    # Parse the JSON content
-                    json_data = json.loads(script_content)
-
-                    # Extract article's content (Title, article body, date published, keyphrases)
-                    article_title = json_data.get("headline")
-                    article_published = json_data.get("datePublished")
-                    article_body = json_data.get("articleBody")
-                    article_keyphrases = json_data.get("keywords")
-
-                    # Get the genre of the news
-                    article_genre_tags = await page.query_selector_all('span[itemprop="name"]')
-                    article_genre = await article_genre_tags[1].inner_text()
-
-                    # Create a dictionary containing article's content
-                    article_content = {
-                        "url": url,
-                        "title": article_title,
-                        "body": article_body,
-                        "date": article_published,
-                        "genre": article_genre,
-                        "keyphrases": article_keyphrases
-                    }                    
-                    break
-                except Exception as e:
-                    tqdm.write(f"Timeout error occurred. Retrying after 2 seconds...")
-                    await asyncio.sleep(2)
-
-            await browser.close()
-        return article_content
+        try:
+            # Plain HTTP GET first, the browser is only used when the ld+json is not in the raw HTML
+            article_content = await run_with_retry(lambda: fetcher.fetch(url), url, policy, breakers)
+        except RetryError as e:
+            # A dead URL is reported & skipped instead of being retried forever
+            tqdm.write(str(e))
+            return False
+    # Stream the article to disk right away instead of keeping every body in memory
+    if sink is not None:
+        article_content["summary"] = summary
+        sink.write(article_content)
+        return True
+    return article_content
 
 
 async def main():
-    # Base monthly URLs starting with the first date (ex: https://www.tempo.co/indeks/2023-01-01/) in the year 2023.
-    months = [f"{BASE_URL}2023-{month:02d}-01/" for month in range(1, 3)]  
-    
-    # Create task for each month
-    tasks_index = [scrape_article_monthly(url) for url in months] 
-    
-    # Create multiple tasks at once and wait for all of them to complete
-    start_time_index = time.perf_counter()
-    results_index = await asyncio.gather(*tasks_index) 
-    elapsed_time_index = time.perf_counter() - start_time_index
-    sys.stdout.flush()    
-    print("")
-    print("\n")   
-
-    # Combine all results into a single DataFrame (for all months)
-    all_links = []
-    all_summaries = []
-    
-    # Iterating over individual month data
-    for result in results_index:
-        all_links.extend(result[0])
-        all_summaries.extend(result[1])
-    
-    # Create multiple tasks for extracting individual news content
-    start_time_individual = time.perf_counter()
-    tasks_individual = [scrape_article_content(url) for url in all_links] 
-    results_individual_list = await tqdm.gather(*tasks_individual, desc="Scraping Individual Pages", total=len(all_links)) 
-    elapsed_time_individual = time.perf_counter() - start_time_individual
-
-    # Combining list of dictionaries into a single dictionary
-    results_individual = defaultdict(list)
-    for d in results_individual_list:
-        for key, value in d.items():
-            results_individual[key].extend(value)  # Combine the list values
-    results_individual = dict(results_individual)
-
-    # Saving to dataframe
-    file_name = f"{RESULT_DIR}scraped_articles_merged_2023.csv"
-    df = pd.DataFrame({
-        "url": all_links,
-        "title": results_individual["title"],
-        "body": results_individual["body"],
-        "summary": all_summaries,        
-        "date": results_individual["date"],
-        "genre": results_individual["genre"],
-        "keyphrases": results_individual["keyphrases"],        
-    })    
-    df.to_csv(file_name, index=False)
+    # Every day of the months in the year 2023 goes through the same queue
+    items = [item for month in range(1, 3) for item in month_items(2023, month)]
+
+    # Images, fonts, stylesheets, ads & third-party scripts are not loaded at all
+    resource_stats = ResourceStats()
+    pool = BrowserPool(size=INDEX_WORKERS, on_new_context=blocking_hook("tempo", resource_stats))
+    await pool.start()
+    # The links of every index page go straight to the article stage instead of being collected first
+    scheduler = IndexScheduler(pool, scrape_index_page, workers=INDEX_WORKERS,
+                               rate_limiter=HostRateLimiter(rate=HOST_RATE, burst=HOST_BURST),
+                               policy=RetryPolicy(base_delay=2),
+                               breakers=CircuitBreakerRegistry(max_concurrency=INDEX_WORKERS),
+                               keep_results=False)
+
+    # Drop the articles scraped by an earlier run & the links listed twice
+    url_index = UrlIndex(URL_INDEX_DIR)
+    seen = set()
+    def new_links(item, result):
+        links, summaries = result
+        for url, summary in zip(links, summaries):
+            # An anchor without href (ex: a placeholder card) has no article to scrape
+            if not url:
+                continue
+            canonical_url = canonicalize_url(url)
+            if canonical_url not in seen and url not in url_index:
+                seen.add(canonical_url)
+                yield url, summary
+
+    policy = RetryPolicy(base_delay=2)
+    breakers = CircuitBreakerRegistry(max_concurrency=MAX_CONCURRENCY)
+    cache = HtmlCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+    start_time = time.perf_counter()
+    # An article counts as scraped once the sink wrote it to disk
+    with ArticleSink(ARTICLES_DIR, source="tempo",
+                     on_flush=lambda records: url_index.add_many(record["url"] for record in records)) as sink:
+        async with TempoFetcher(resource_stats=resource_stats, cache=cache) as fetcher:
+            pipeline = IndexArticlePipeline(
+                scheduler,
+                lambda work: scrape_article_content(work[0], fetcher, work[1], sink, policy, breakers),
+                links_of=new_links,
+                workers=MAX_CONCURRENCY,
+                queue_size=ARTICLE_QUEUE_SIZE
+            )
+            stats = await pipeline.run(items, desc="Scraping index pages")
+    elapsed_time = time.perf_counter() - start_time
+    await pool.close()
+    cache.close()
+    url_index.close()
 
     # Final Reporting
     sys.stdout.flush()    
     print("")
     print("\n")    
-    print(f"Scraping complete. Total articles scraped: {len(all_links)}")
-    print(f"Time taken for scraping the index page: {elapsed_time_index:.2f}s")      
-    print(f"Time taken for scraping individual news page: {elapsed_time_individual:.2f}s")          
-    print(f"Results saved to {file_name}")
+    print(f"Scraping complete. Total articles scraped: {stats['succeeded']}/{stats['queued']}")
+    print(f"Time taken for scraping the index & individual news pages: {elapsed_time:.2f}s")      
+    print(resource_stats.summary())
+    print(f"Index pages failed: {len(scheduler.failed_items)}")
+    print(f"Results saved to {ARTICLES_DIR}")
 
 # Run the asyncio event loop
 if __name__ == "__main__":
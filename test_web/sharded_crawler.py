@@ -0,0 +1,146 @@
+"""
+Multi-process launcher for the jpnn article crawl.
+
+One asyncio loop tops out at a single core (navigation bookkeeping, JSON/DOM
+decoding, tqdm) at around 20 concurrent pages. This launcher splits the URLs
+into shards and runs every shard in its own process with its own event loop
+and browser pool. The shards share the crawl journal of their year (claims are
+restricted to the shard's URLs) and all write into the same Parquet dataset.
+
+Sharding:
+    --by hash   every year's URLs are split by CRC32 into --workers shards
+    --by year   one shard per year (each year has its own journal)
+
+Usage: python sharded_crawler.py --years 2022 2023 --workers 4 --by hash
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from tqdm.asyncio import tqdm
+from browser_pool import BrowserPool
+from crawl_journal import CrawlJournal
+from article_sink import ArticleSink
+from resource_blocking import ResourceStats, blocking_hook
+from retry_policy import RetryPolicy, CircuitBreakerRegistry
+from scraper_metrics import ScraperMetrics
+from scrapping_jppn_individual import scrape_and_record, RESULT_DIR, ARTICLES_DIR, SINK_FLUSH_ROWS, SINK_FLUSH_INTERVAL, PAGE_MAX_USES
+
+# Concurrent pages per worker process (kept under the point where one loop saturates a core)
+PAGES_PER_WORKER = 7
+# URLs claimed from the journal at once by a worker
+CLAIM_SIZE = 500
+METRICS_FILE = f"{RESULT_DIR}jppn_sharded_metrics.json"
+
+
+def index_file(year):
+    return f"{RESULT_DIR}jppn_index_{year}.csv"
+
+
+def journal_file(year):
+    return f"{RESULT_DIR}jppn_{year}_journal.db"
+
+
+def register_links(years):
+    """Load the index files into the journals once, before the workers start claiming."""
+    for year in years:
+        journal = CrawlJournal(journal_file(year))
+        added = journal.add_urls(pd.read_csv(index_file(year))['url'].tolist())
+        print(f"{year}: new links: {added}, progress: {journal.counts()}")
+        journal.close()
+
+
+async def crawl_shard_async(year, shard, pages, position=0):
+    # The shard owns its URLs only, so recovering its in-flight URLs never touches the other workers
+    journal = CrawlJournal(journal_file(year), shard=shard)
+    sink = ArticleSink(ARTICLES_DIR, source="jpnn", flush_rows=SINK_FLUSH_ROWS, flush_interval=SINK_FLUSH_INTERVAL,
+                       on_flush=lambda records: journal.mark_done_many(record["url"] for record in records))
+    resource_stats = ResourceStats()
+    pool = BrowserPool(size=pages, browsers=1, max_uses=PAGE_MAX_USES, on_new_context=blocking_hook("jpnn", resource_stats))
+    await pool.start()
+    policy = RetryPolicy(max_attempts=3, base_delay=3)
+    # Per process, the total concurrency on jpnn.com is workers * pages
+    breakers = CircuitBreakerRegistry(max_concurrency=pages)
+    metrics = ScraperMetrics(gauges={"bytes_loaded": lambda: resource_stats.bytes_loaded})
+
+    name = f"{year}" if shard is None else f"{year} shard {shard[0] + 1}/{shard[1]}"
+    scraped = 0
+    attempted = 0
+    start_time = time.perf_counter()
+    while True:
+        batch = journal.claim(CLAIM_SIZE)
+        if not batch:
+            break
+        tasks = [scrape_and_record(url, pool, journal, sink, policy, breakers, metrics) for url in batch]
+        results = await tqdm.gather(*tasks, desc=name.ljust(18), position=position, leave=False)
+        scraped += sum(results)
+        attempted += len(batch)
+        sink.flush()
+    elapsed_time = time.perf_counter() - start_time
+
+    # Read before the browsers are gone (memory gauge)
+    metrics_summary = metrics.summary()
+    await pool.close()
+    sink.close()
+    journal.close()
+    return {
+        "shard": name,
+        "scraped": scraped,
+        "attempted": attempted,
+        "elapsed": elapsed_time,
+        "metrics": metrics_summary,
+    }
+
+
+def crawl_shard(task):
+    """Process entry point: a fresh event loop for one (year, shard)."""
+    return asyncio.run(crawl_shard_async(*task))
+
+
+def make_tasks(years, by, workers, pages):
+    """(year, shard, pages, progress bar position) of every shard."""
+    if by == "year":
+        return [(year, None, pages, i % workers) for i, year in enumerate(years)]
+    return [(year, (index, workers), pages, index) for year in years for index in range(workers)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl jpnn articles with one event loop per CPU core")
+    parser.add_argument("--years", type=int, nargs="+", default=[2023])
+    parser.add_argument("--by", choices=["hash", "year"], default="hash")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--pages", type=int, default=PAGES_PER_WORKER, help="concurrent pages per worker")
+    args = parser.parse_args()
+
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    register_links(args.years)
+    tasks = make_tasks(args.years, args.by, args.workers, args.pages)
+
+    start_time = time.perf_counter()
+    # "spawn": a forked child would inherit the parent's event loop & SQLite connections
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        summaries = list(executor.map(crawl_shard, tasks))
+    elapsed_time = time.perf_counter() - start_time
+
+    # Final Reporting
+    print("-------")
+    for summary in summaries:
+        rate = summary["scraped"] / summary["elapsed"] if summary["elapsed"] else 0
+        print(f"{summary['shard'].ljust(18)}: {summary['scraped']}/{summary['attempted']} articles "
+              f"in {summary['elapsed']:.2f}s ({rate:.2f} articles/s)")
+    with open(METRICS_FILE, "w") as f:
+        json.dump(summaries, f, indent=2)
+    total = sum(summary["scraped"] for summary in summaries)
+    print(f"Total: {total} articles in {elapsed_time:.2f}s ({total / elapsed_time:.2f} articles/s) "
+          f"with {args.workers} workers. Results saved to {ARTICLES_DIR}, metrics to {METRICS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+HTTP-first fetcher for tempo.co articles.
+
+Tempo's article pages usually ship the NewsArticle JSON-LD block and the
+breadcrumb in the server-rendered HTML, so there is no need to render them in
+Chromium. The page is downloaded with a pooled async HTTP client (keep-alive
+connections) and extracted with lxml using the `specs/tempo.json` extraction
+spec. Playwright is only used when a required field is missing from the raw
+HTML.
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import asyncio
+import httpx
+from browser_pool import BrowserPool, combine_hooks
+from retry_policy import HttpStatusError, SelectorMissingError
+from extraction_engine import load_spec, extract_static, extract_article
+from html_cache import recording_hook, replay_hook
+from resource_blocking import ResourceStats, blocking_hook
+
+# HTTP/2 needs the optional `h2` package, fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Accept-Language": "id-ID,id;q=0.9,en;q=0.8",
+}
+
+
+class TempoFetcher:
+    """
+    Fetch tempo.co articles over plain HTTP, rendering with Playwright only as a fallback.
+
+    With a `cache` (HtmlCache) every fetched page is stored in full, with
+    `replay=True` the pages are only read from the cache (offline).
+
+    Usage:
+        async with TempoFetcher() as fetcher:
+            article_content = await fetcher.fetch(url)
+    """
+    def __init__(self, max_connections=10, browser_pool_size=2, stealth=False, timeout=60, resource_stats=None,
+                 cache=None, replay=False):
+        self.max_connections = max_connections
+        self.browser_pool_size = browser_pool_size
+        self.stealth = stealth
+        self.timeout = timeout
+        self.cache = cache
+        self.replay = replay
+        self.spec = load_spec("tempo")
+        # Requests blocked/allowed by the fallback browsers
+        self.resource_stats = resource_stats if resource_stats is not None else ResourceStats()
+        self.client = None
+        self.pool = None
+        self._pool_lock = asyncio.Lock()
+        self.stats = {"http": 0, "browser": 0}
+
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=limits,
+            headers=HEADERS,
+            timeout=self.timeout,
+            follow_redirects=True
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
+        if self.pool is not None:
+            await self.pool.close()
+
+    async def fetch(self, url):
+        article_content = await self.fetch_http(url)
+        if article_content is not None:
+            self.stats["http"] += 1
+            return article_content
+        article_content = await self.fetch_browser(url)
+        self.stats["browser"] += 1
+        return article_content
+
+    async def fetch_http(self, url):
+        """Returns the article content or None when a required field is not in the raw HTML."""
+        if self.replay:
+            html = self.cache.get(url)
+            if html is None:
+                raise HttpStatusError(404, url)
+        else:
+            # The whole body is read: stopping a download early would close the keep-alive connection
+            response = await self.client.get(url)
+            response.raise_for_status()
+            html = response.text
+            if self.cache is not None:
+                self.cache.put(url, html)
+        try:
+            return extract_static(url, html, self.spec)
+        except SelectorMissingError:
+            return None
+
+    async def fetch_browser(self, url):
+        # The browsers are only launched when the first fallback is needed
+        async with self._pool_lock:
+            if self.pool is None:
+                on_new_page = None
+                if self.stealth:
+                    from playwright_stealth import stealth_async
+                    on_new_page = stealth_async
+                cache_hook = None
+                if self.cache is not None:
+                    cache_hook = replay_hook(self.cache) if self.replay else recording_hook(self.cache)
+                pool = BrowserPool(size=self.browser_pool_size, on_new_page=on_new_page,
+                                   on_new_context=combine_hooks(blocking_hook("tempo", self.resource_stats), cache_hook))
+                await pool.start()
+                self.pool = pool
+        async with self.pool.page() as page:
+            return await extract_article(page, url, self.spec, timeout=self.timeout * 1000)
@@ -0,0 +1,222 @@
+"""
+Cross-run deduplication of article URLs.
+
+URLs are canonicalized first (scheme, host, "www.", trailing slash, fragment,
+tracking parameters & parameter order no longer matter) and hashed with
+BLAKE2b. Membership is answered by a Bloom filter kept in memory (~1.2 bytes
+per URL at a 1% false positive rate, ex: 24 MB for 20 million URLs) and the
+maybe-seen answers are confirmed against an exact SQLite store of the 128-bit
+digests. A "no" of the Bloom filter never touches the disk.
+
+Usage:
+    with UrlIndex(f"{RESULT_DIR}url_index/jpnn") as url_index:
+        new_links = url_index.filter_new(links)
+
+Author: Kadek Artha Darma Pradnyana
+Date: 18 October 2026
+"""
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import struct
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters which never change the article
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "_ga", "ref", "ref_src", "amp"}
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+BLOOM_MAGIC = b"URLBLOOM"
+BLOOM_HEADER = struct.Struct("<8sQIQ")
+
+
+def canonicalize_url(url):
+    """The canonical form of an article URL, ex: HTTP://www.Jpnn.com/news/x/?utm_source=fb#top -> https://jpnn.com/news/x"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    # http & https serve the same articles
+    if scheme in ("", "http"):
+        scheme = "https"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    netloc = host
+    if parts.port and parts.port not in DEFAULT_PORTS.values():
+        netloc = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ))
+    return urlunsplit((scheme, netloc, path or "/", query, ""))
+
+
+def url_digest(url):
+    """128-bit digest of the canonical URL."""
+    return hashlib.blake2b(canonicalize_url(url).encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """
+    Bloom filter over 128-bit digests. The k bit positions come from double
+    hashing the two 64-bit halves of the digest (h1 + i * h2).
+    """
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest):
+        h1, h2 = struct.unpack("<QQ", digest)
+        # An odd step visits k distinct positions
+        h2 |= 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, digest):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+    @property
+    def nbytes(self):
+        return len(self.bits)
+
+    def save(self, path):
+        # Write to a temporary file first so a crash never leaves a truncated filter behind
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, capacity, error_rate=0.01):
+        """The saved filter, or None when it is missing, corrupt or was sized differently."""
+        bloom = cls(capacity, error_rate)
+        try:
+            with open(path, "rb") as f:
+                magic, num_bits, num_hashes, count = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+                bits = f.read()
+        except (FileNotFoundError, struct.error):
+            return None
+        if magic != BLOOM_MAGIC or num_bits != bloom.num_bits or num_hashes != bloom.num_hashes or len(bits) != len(bloom.bits):
+            return None
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        return bloom
+
+
+class UrlIndex:
+    """
+    Persistent set of canonical URLs: `<index_dir>/urls.db` is the exact
+    store, `<index_dir>/urls.bloom` the saved Bloom filter. The filter is
+    rebuilt from the store when it is missing or out of date (ex: after a
+    crash), and resized when the store outgrows `capacity`.
+    """
+    def __init__(self, index_dir, capacity=20_000_000, error_rate=0.01):
+        self.index_dir = index_dir
+        self.error_rate = error_rate
+        os.makedirs(index_dir, exist_ok=True)
+        self.bloom_path = os.path.join(index_dir, "urls.bloom")
+        self.conn = sqlite3.connect(os.path.join(index_dir, "urls.db"), isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS urls (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        self.stats = {"bloom_negative": 0, "confirmed": 0, "false_positive": 0}
+
+        stored = len(self)
+        capacity = max(capacity, stored * 2)
+        self.bloom = BloomFilter.load(self.bloom_path, capacity, error_rate)
+        if self.bloom is None or self.bloom.count != stored:
+            self._rebuild(capacity)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.save()
+        self.conn.close()
+
+    def save(self):
+        self.bloom.save(self.bloom_path)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+    def _rebuild(self, capacity):
+        self.bloom = BloomFilter(capacity, self.error_rate)
+        for (digest,) in self.conn.execute("SELECT digest FROM urls"):
+            self.bloom.add(digest)
+        self.save()
+
+    def _stored(self, digest):
+        return self.conn.execute("SELECT 1 FROM urls WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def _contains_digest(self, digest):
+        if digest not in self.bloom:
+            self.stats["bloom_negative"] += 1
+            return False
+        if self._stored(digest):
+            self.stats["confirmed"] += 1
+            return True
+        self.stats["false_positive"] += 1
+        return False
+
+    def __contains__(self, url):
+        return self._contains_digest(url_digest(url))
+
+    def add(self, url):
+        """Returns True when the URL was not known yet."""
+        return self.add_many([url]) == 1
+
+    def add_many(self, urls):
+        """Returns the amount of URLs which were not known yet."""
+        return len(self.filter_new(urls))
+
+    def filter_new(self, urls, record=True):
+        """
+        The URLs (in their original form & order) which were never seen before
+        and are not duplicates of an earlier URL of the list. They are recorded
+        as seen in a single transaction, unless record=False (the caller then
+        add_many()s them once they are stored elsewhere).
+        """
+        new_urls = []
+        new_digests = []
+        seen = set()
+        for url in urls:
+            digest = url_digest(url)
+            if digest in seen or self._contains_digest(digest):
+                continue
+            seen.add(digest)
+            new_urls.append(url)
+            new_digests.append(digest)
+        if not record:
+            return new_urls
+
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany("INSERT OR IGNORE INTO urls (digest) VALUES (?)", ((digest,) for digest in new_digests))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        for digest in new_digests:
+            self.bloom.add(digest)
+        if self.bloom.count > self.bloom.capacity:
+            # Over capacity the false positive rate climbs quickly
+            self._rebuild(max(self.bloom.capacity, self.bloom.count) * 2)
+        return new_urls